@@ -11,19 +11,16 @@ import math
 from dataclasses import InitVar, asdict, dataclass
 from typing import Iterable, List, Optional, Tuple, Union
 
-import numpy as np
 import torch
 from pytorch_lightning import (Callback, LightningDataModule, LightningModule,
                                Trainer)
-from sklearn.metrics import log_loss
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.preprocessing import StandardScaler
 from torch import Tensor
 from torch.nn.functional import one_hot
 from torch.utils.data import DataLoader, Dataset
 from simple_parsing import field, mutable_field
 
 from sequoia.common.loss import Loss
+from sequoia.common.metrics import ClassificationMetrics
 # from sequoia.methods.models.base_model.model import LightningModule
 from sequoia.settings import Setting
 from sequoia.settings.sl import ClassIncrementalSetting
@@ -36,11 +33,119 @@ logger = get_logger(__file__)
 class KnnClassifierOptions:
     """ Set of options for configuring the KnnClassifier. """
     n_neighbors: int = field(default=5, alias="n_neighbours") # Number of neighbours.
+    # Distance metric to use. Either "cosine" or "minkowski".
     metric: str = "cosine"
-    algorithm: str = "auto" # See the sklearn docs
-    leaf_size: int = 30  # See the sklearn docs
-    p: int = 2  # see the sklean docs
-    n_jobs: Optional[int] = -1  # see the sklearn docs.
+    p: int = 2  # Power parameter of the minkowski metric.
+    # Number of queries and of reference samples to compare at a time. This bounds
+    # the size of the distance matrices that are computed.
+    block_size: int = 4096
+
+
+class KnnClassifier:
+    """ K-Nearest-Neighbours classifier that runs in torch, on the queries' device.
+
+    The codes are standardized (like with the `StandardScaler` from scikit-learn).
+    The reference codes are kept on the CPU, and are moved to the device of the
+    queries one block of `block_size` codes at a time. The queries are also split
+    into blocks of `block_size`, and the top-k of each block of reference codes is
+    merged with the running top-k, so the size of the distance matrices is at most
+    `block_size ** 2`, regardless of the number of queries and reference codes.
+
+    >>> import torch
+    >>> x = torch.Tensor([[0., 1.], [0., 2.], [1., 0.], [2., 0.]])
+    >>> y = torch.LongTensor([0, 0, 1, 1])
+    >>> knn = KnnClassifier(KnnClassifierOptions(n_neighbors=1, block_size=3))
+    >>> knn = knn.fit(x, y, num_classes=2)
+    >>> knn.predict_proba(torch.Tensor([[0., 3.], [3., 0.]]))
+    tensor([[1., 0.],
+            [0., 1.]])
+    """
+    def __init__(self, options: KnnClassifierOptions = None):
+        self.options = options or KnnClassifierOptions()
+        self.num_classes: int = 0
+        self.x: Optional[Tensor] = None
+        self.y: Optional[Tensor] = None
+        self.mean: Optional[Tensor] = None
+        self.std: Optional[Tensor] = None
+
+    def fit(self, x: Tensor, y: Tensor, num_classes: int) -> "KnnClassifier":
+        x = x.reshape(x.shape[0], -1).float().cpu()
+        self.mean = x.mean(0)
+        std = x.std(0, unbiased=False)
+        # Same as the StandardScaler: Leave the features with no variance unchanged.
+        self.std = torch.where(std == 0, torch.ones_like(std), std)
+        self.x = self._normalize(self.transform(x))
+        self.y = y.reshape(-1).long().cpu()
+        self.num_classes = max(num_classes, int(self.y.max()) + 1)
+        return self
+
+    def transform(self, x: Tensor) -> Tensor:
+        """ Standardizes the (flattened) codes `x`. """
+        x = x.reshape(x.shape[0], -1).float()
+        return (x - self.mean.to(x.device)) / self.std.to(x.device)
+
+    def _normalize(self, x: Tensor) -> Tensor:
+        if self.options.metric == "cosine":
+            return torch.nn.functional.normalize(x, dim=-1)
+        return x
+
+    def _distances(self, queries: Tensor, keys: Tensor) -> Tensor:
+        if self.options.metric == "cosine":
+            # NOTE: Both are already normalized.
+            return 1 - queries @ keys.T
+        if self.options.metric == "minkowski":
+            return torch.cdist(queries, keys, p=self.options.p)
+        raise NotImplementedError(f"Unsupported metric: {self.options.metric}")
+
+    @torch.no_grad()
+    def kneighbors(self, x: Tensor) -> Tuple[Tensor, Tensor]:
+        """ Returns the distances and indices of the nearest neighbours of `x`, on the
+        device of `x`.
+        """
+        assert self.x is not None, "Need to call `fit` first."
+        block_size = self.options.block_size
+        if x.shape[0] <= block_size:
+            return self._kneighbors_block(x)
+        distances, indices = zip(*[
+            self._kneighbors_block(x[start:start + block_size])
+            for start in range(0, x.shape[0], block_size)
+        ])
+        return torch.cat(distances), torch.cat(indices)
+
+    def _kneighbors_block(self, x: Tensor) -> Tuple[Tensor, Tensor]:
+        queries = self._normalize(self.transform(x))
+        k = min(self.options.n_neighbors, self.x.shape[0])
+
+        best_distances: Optional[Tensor] = None
+        best_indices: Optional[Tensor] = None
+        for start in range(0, self.x.shape[0], self.options.block_size):
+            keys = self.x[start:start + self.options.block_size].to(queries.device)
+            distances = self._distances(queries, keys)
+            block_k = min(k, keys.shape[0])
+            distances, indices = distances.topk(block_k, dim=-1, largest=False)
+            indices += start
+            if best_distances is not None:
+                # Merge the top-k of this block with the running top-k.
+                distances = torch.cat([best_distances, distances], dim=-1)
+                indices = torch.cat([best_indices, indices], dim=-1)
+                distances, positions = distances.topk(
+                    min(k, distances.shape[-1]), dim=-1, largest=False
+                )
+                indices = indices.gather(-1, positions)
+            best_distances, best_indices = distances, indices
+        return best_distances, best_indices
+
+    @torch.no_grad()
+    def predict_proba(self, x: Tensor) -> Tensor:
+        """ Returns the fraction of neighbours of each class, for each sample in `x`.
+        """
+        _, indices = self.kneighbors(x)
+        neighbour_labels = self.y[indices.cpu()].to(indices.device)
+        votes = torch.zeros(
+            [x.shape[0], self.num_classes], dtype=torch.float, device=indices.device
+        )
+        votes.scatter_add_(-1, neighbour_labels, torch.ones_like(votes[:, :1]).expand_as(neighbour_labels))
+        return votes / indices.shape[-1]
 
 @dataclass
 class KnnCallback(Callback): 
@@ -169,12 +274,12 @@ class KnnCallback(Callback):
         # NOTE: we shortened each of the dataloaders just to be sure that we get at least
         train_loader = roundrobin(*train_loaders)
 
-        h_x, y = get_hidden_codes_array(
+        h_x, y = get_hidden_codes(
             model=model,
             dataloader=train_loader,
             description="KNN (Train)"
         )
-        train_loss, scaler, knn_classifier = fit_knn(
+        train_loss, knn_classifier = fit_knn(
             x=h_x,
             y=y,
             options=self.knn_options,
@@ -195,7 +300,6 @@ class KnnCallback(Callback):
                 model=model,
                 dataloader=dataloader,
                 loss_name=f"[{i}]",
-                scaler=scaler,
                 knn_classifier=knn_classifier,
                 num_classes=setting.num_classes_in_task(i)
             )
@@ -225,7 +329,6 @@ class KnnCallback(Callback):
                 model=model,
                 dataloader=dataloader,
                 loss_name=f"[{i}]",
-                scaler=scaler,
                 knn_classifier=knn_classifier,
                 num_classes=num_classes,
             )
@@ -244,56 +347,47 @@ class KnnCallback(Callback):
 def evaluate(model: LightningModule,
              dataloader: DataLoader,
              loss_name: str,
-             scaler: StandardScaler,
-             knn_classifier: KNeighborsClassifier,
+             knn_classifier: KnnClassifier,
              num_classes: int) -> Loss:
     """Evaluates the 'quality of representations' using a KNN.
 
     Assumes that the knn classifier was fitted on the same classes as
     the ones present in the dataloader.
 
+    The batches from the dataloader are encoded and evaluated one at a time, and
+    only the (summed) metrics are kept, rather than all the hidden codes.
+
     Args:
         model (Classifier): a Classifier model to use to encode samples.
         dataloader (DataLoader): a dataloader.
         loss_name (str): name to give to the resulting loss.
-        scaler (StandardScaler): the scaler used during fitting.
-        knn_classifier (KNeighborsClassifier): The KNN classifier.
+        knn_classifier (KnnClassifier): The KNN classifier.
 
     Returns:
         Loss: The loss object containing metrics and a 'total loss'
-        which isn't a tensor in this case (since passing through the KNN
+        which isn't differentiable in this case (since passing through the KNN
         isn't a differentiable operation).
     """
-    h_x_test, y_test = get_hidden_codes_array(
-        model,
-        dataloader,
-        description=f"KNN ({loss_name})",
-    )
-    train_classes = set(knn_classifier.classes_)
-    test_classes = set(y_test)
-    # Check that the same classes were used.
-    assert test_classes.issubset(train_classes), (
-        f"y and y_test should contain the same classes: "
-        f"(train classes: {train_classes}, "
-        f"test classes: {test_classes})."
-    )
-    test_loss = get_knn_performance(
-        x_t=h_x_test, y_t=y_test,
-        loss_name=loss_name,
-        scaler=scaler,
-        knn_classifier=knn_classifier,
-        num_classes=num_classes,
-    )
-    test_loss.loss = torch.as_tensor(test_loss.loss)
+    test_loss = Loss(loss_name)
+    for h_x, y in iterate_hidden_codes(model, dataloader, description=f"KNN ({loss_name})"):
+        test_loss += get_knn_performance(
+            x_t=h_x, y_t=y,
+            loss_name=loss_name,
+            knn_classifier=knn_classifier,
+            num_classes=num_classes,
+        )
+    n_samples = test_loss.metric.n_samples if test_loss.metric else 0
+    # The losses of each batch are the sum of the nce of each sample.
+    test_loss.loss = torch.as_tensor(test_loss.loss) / max(n_samples, 1)
     logger.info(f"{loss_name} Acc: {test_loss.accuracy:.2%}")
     return test_loss
 
 
-def get_hidden_codes_array(model: LightningModule, dataloader: DataLoader, description: str="KNN") -> Tuple[np.ndarray, np.ndarray]:
-    """ Gets the hidden vectors and corresponding labels. """
-    h_x_list: List[np.ndarray] = []
-    y_list: List[np.ndarray] = []
-
+@torch.no_grad()
+def iterate_hidden_codes(model: LightningModule, dataloader: DataLoader, description: str="KNN") -> Iterable[Tuple[Tensor, Tensor]]:
+    """ Yields the (flattened) hidden vectors and labels for each batch, on the
+    model's device.
+    """
     for batch in pbar(dataloader, description, leave=False):
         # TODO: Debug this, make sure this callback still works.
         x, y = batch
@@ -306,82 +400,69 @@ def get_hidden_codes_array(model: LightningModule, dataloader: DataLoader, descr
             # the model's encoder to encode stuff when using DataParallel or
             # DistributedDataParallel, as PL might be interfering somehow.
             h_x = model.encode(x.to(model.device))
-            h_x_list.append(h_x.detach().cpu().numpy())
-            y_list.append(y.detach().cpu().numpy())
-    codes = np.concatenate(h_x_list)
-    labels = np.concatenate(y_list)
-    return codes.reshape(codes.shape[0], -1), labels
+            y = torch.as_tensor(y, device=h_x.device)
+            yield h_x.reshape(h_x.shape[0], -1), y
+
 
+def get_hidden_codes(model: LightningModule, dataloader: DataLoader, description: str="KNN") -> Tuple[Tensor, Tensor]:
+    """ Gets the hidden vectors and corresponding labels, on the CPU. """
+    h_x_list, y_list = zip(*[
+        (h_x.cpu(), y.cpu())
+        for h_x, y in iterate_hidden_codes(model, dataloader, description=description)
+    ])
+    return torch.cat(h_x_list), torch.cat(y_list)
 
-def fit_knn(x: np.ndarray,
-            y: np.ndarray,
+
+def fit_knn(x: Tensor,
+            y: Tensor,
             num_classes: int,
             options: KnnClassifierOptions=None,
-            loss_name: str="knn") -> Tuple[Loss, StandardScaler, KNeighborsClassifier]:
-    # print(x.shape, y.shape, x_t.shape, y_t.shape)
+            loss_name: str="knn") -> Tuple[Loss, KnnClassifier]:
     options = options or KnnClassifierOptions()
-   
-    scaler = StandardScaler()
-    x_s = scaler.fit_transform(x)
-    # Create and train the Knn Classifier using the options as the kwargs
-    knn_classifier = KNeighborsClassifier(**asdict(options)).fit(x_s, y)
+    # Create and 'train' the Knn Classifier using the options.
+    knn_classifier = KnnClassifier(options).fit(x, y, num_classes=num_classes)
     train_loss = get_knn_performance(
         x_t=x,
         y_t=y,
-        scaler=scaler,
         knn_classifier=knn_classifier,
         num_classes=num_classes,
+        loss_name=loss_name,
     )
-    return train_loss, scaler, knn_classifier
+    train_loss.loss = train_loss.loss / x.shape[0]
+    return train_loss, knn_classifier
 
 
-def get_knn_performance(x_t: np.ndarray,
-                        y_t: np.ndarray,
-                        scaler: StandardScaler,
-                        knn_classifier: KNeighborsClassifier,
+@torch.no_grad()
+def get_knn_performance(x_t: Tensor,
+                        y_t: Tensor,
+                        knn_classifier: KnnClassifier,
                         num_classes: int,
                         loss_name: str="KNN",) -> Loss:
-    # Flatten the inputs to two dimensions only.
-    x_t = x_t.reshape(x_t.shape[0], -1)
-    assert len(x_t.shape) == 2
-    x_t = scaler.transform(x_t)
-    y_t_prob = knn_classifier.predict_proba(x_t)
-
-    classes = knn_classifier.classes_
-    # make sure the classes are sorted:
-    assert np.array_equal(sorted(classes), classes)
-
-    if y_t_prob.shape[-1] == num_classes:
-        y_t_logits = y_t_prob
-    else:
-        # Not all classes were encountered, so we need to 'expand' the predicted
-        # logits to the right shape.
-        logger.info(f"{y_t_prob.shape} {num_classes}")
-        num_classes = max(num_classes, y_t_prob.shape[-1])
+    """ Evaluates the KNN classifier on a batch of codes.
 
-        y_t_logits = np.zeros([y_t_prob.shape[0], num_classes], dtype=y_t_prob.dtype)
-        
-        for i, logits in enumerate(y_t_prob):
-            for label, logit in zip(classes, logits):
-                y_t_logits[i][label-1] = logit
-    
-    ## We were constructing this to reorder the classes in case the ordering was
-    ## not the same between the KNN's internal `classes_` attribute and the task
-    ## classes, However I'm not sure if this is necessary anymore.
-
-    # y_t_logits = np.zeros((y_t.size, y_t.max() + 1))
-    # for i, label in enumerate(classes):
-    #     y_t_logits[:, label] = y_t_prob[:, i]
-    
-    # We get the Negative Cross Entropy using the scikit-learn function, but we
-    # could instead get it using pytorch's function (maybe even inside the
-    # Loss object!
-    nce_t = log_loss(y_true=y_t, y_pred=y_t_prob, labels=classes)
-    # BUG: There is sometimes a case where some classes aren't present in
-    # `classes_`, and as such the ClassificationMetrics object created in the
-    # Loss constructor has an error. 
-    test_loss = Loss(loss_name, loss=nce_t, y_pred=y_t_logits, y=y_t)
-    return test_loss
+    NOTE: The `loss` of the returned Loss is the *sum* of the negative cross-entropy
+    over the batch, so that the losses of different batches can be added together.
+    """
+    y_t_prob = knn_classifier.predict_proba(x_t)
+    y_t = y_t.reshape(-1).long().to(y_t_prob.device)
+    # Not all classes might have been encountered.
+    num_classes = max(num_classes, y_t_prob.shape[-1], int(y_t.max()) + 1)
+    if y_t_prob.shape[-1] < num_classes:
+        y_t_prob = torch.nn.functional.pad(y_t_prob, [0, num_classes - y_t_prob.shape[-1]])
+
+    # Negative Cross Entropy (same clipping as `sklearn.metrics.log_loss`).
+    eps = 1e-15
+    y_t_prob_clipped = y_t_prob.clamp(eps, 1 - eps)
+    y_t_prob_clipped = y_t_prob_clipped / y_t_prob_clipped.sum(-1, keepdim=True)
+    nce_t = -y_t_prob_clipped.gather(-1, y_t.view(-1, 1)).log().sum()
+
+    # Create the confusion matrix directly on the device.
+    y_t_pred = y_t_prob.argmax(-1)
+    confusion_matrix = torch.bincount(
+        y_t * num_classes + y_t_pred, minlength=num_classes ** 2
+    ).view(num_classes, num_classes).float()
+    metrics = ClassificationMetrics(n_samples=y_t.shape[0], confusion_matrix=confusion_matrix)
+    return Loss(loss_name, loss=nce_t, metrics={loss_name: metrics})
 
 
 from simple_parsing.helpers.serialization import register_decoding_fn
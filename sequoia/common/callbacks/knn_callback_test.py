@@ -0,0 +1,40 @@
+import pytest
+import torch
+
+from .knn_callback import KnnClassifierOptions, fit_knn, get_knn_performance
+
+
+@pytest.mark.parametrize("metric", ["cosine", "minkowski"])
+@pytest.mark.parametrize("block_size", [1, 7, 64])
+def test_chunked_predictions_match_unchunked(metric: str, block_size: int):
+    """ Splitting the queries and reference codes into blocks shouldn't change the
+    neighbours, predictions or metrics.
+    """
+    torch.manual_seed(123)
+    num_classes = 4
+    x = torch.randn(150, 3, 4)
+    y = torch.randint(0, num_classes, [150])
+    x_test = torch.randn(90, 3, 4)
+    y_test = torch.randint(0, num_classes, [90])
+
+    results = {}
+    for block_size_ in [block_size, 10_000]:
+        options = KnnClassifierOptions(n_neighbors=5, metric=metric, block_size=block_size_)
+        train_loss, knn = fit_knn(x, y, num_classes=num_classes, options=options)
+        test_loss = get_knn_performance(
+            x_test, y_test, knn_classifier=knn, num_classes=num_classes
+        )
+        results[block_size_] = (
+            knn.kneighbors(x_test), knn.predict_proba(x_test), train_loss, test_loss
+        )
+
+    (distances, indices), probs, train_loss, test_loss = results[block_size]
+    (expected_distances, expected_indices), expected_probs, expected_train_loss, expected_test_loss = results[10_000]
+
+    assert indices.shape == (90, 5)
+    assert (indices == expected_indices).all()
+    assert torch.allclose(distances, expected_distances, atol=1e-5)
+    assert torch.allclose(probs, expected_probs)
+    for loss, expected_loss in [(train_loss, expected_train_loss), (test_loss, expected_test_loss)]:
+        assert torch.allclose(loss.loss, expected_loss.loss)
+        assert (loss.metric.confusion_matrix == expected_loss.metric.confusion_matrix).all()
@@ -3,12 +3,13 @@
 @author Fabrice Normandin (@lebrice)
 """
 import os
+import random
 import sys
 import warnings
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import ClassVar, List, Optional, Type, Union
+from typing import Any, ClassVar, Dict, List, Optional, Type, Union
 import numpy as np
 import torch
 import wandb
@@ -53,6 +54,18 @@ class Config(Serializable, Parseable):
     seed: Optional[int] = None
     # Which device to use. Defaults to 'cuda' if available.
     device: torch.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    # Directory where the state of a run is saved after each task. When a run with
+    # the same configuration is launched again, it resumes after the last task that
+    # was completed.
+    checkpoint_dir: Optional[Path] = None
+    # Directory where a trace of the time spent in the env, the wrappers, the Method
+    # and the metrics at each step of a run is saved (see `sequoia.utils.tracing`).
+    # The trace files can be opened with chrome://tracing or https://ui.perfetto.dev
+    trace_dir: Optional[Path] = None
+    # Only check that one out of every N actions is in the action space, in the
+    # per-step checks of the envs and Methods. Values greater than 1 reduce the
+    # overhead of these checks during long runs.
+    space_check_every: int = 1
 
     def __post_init__(self):
         self.seed_everything()
@@ -60,6 +73,10 @@ class Config(Serializable, Parseable):
         self.rng = np.random.default_rng(self.seed)
         self.log_dir = Path(self.log_dir)
         self.data_dir = Path(self.data_dir)
+        if self.checkpoint_dir is not None:
+            self.checkpoint_dir = Path(self.checkpoint_dir)
+        if self.trace_dir is not None:
+            self.trace_dir = Path(self.trace_dir)
 
     def __del__(self):
         if self._display:
@@ -87,3 +104,26 @@ class Config(Serializable, Parseable):
     def seed_everything(self) -> None:
         if self.seed is not None:
             seed_everything(self.seed)
+
+    def get_rng_state(self) -> Dict[str, Any]:
+        """ Returns the state of all the random number generators, so it can be
+        restored later with `set_rng_state`.
+        """
+        state = {
+            "random": random.getstate(),
+            "numpy": np.random.get_state(),
+            "torch": torch.get_rng_state(),
+            "rng": self.rng.bit_generator.state,
+        }
+        if torch.cuda.is_available():
+            state["torch_cuda"] = torch.cuda.get_rng_state_all()
+        return state
+
+    def set_rng_state(self, state: Dict[str, Any]) -> None:
+        """ Restores the state of the random number generators. """
+        random.setstate(state["random"])
+        np.random.set_state(state["numpy"])
+        torch.set_rng_state(state["torch"])
+        self.rng.bit_generator.state = state["rng"]
+        if "torch_cuda" in state and torch.cuda.is_available():
+            torch.cuda.set_rng_state_all(state["torch_cuda"])
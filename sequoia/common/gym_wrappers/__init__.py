@@ -10,4 +10,5 @@ from .batch_env import AsyncVectorEnv, BatchedVectorEnv, SyncVectorEnv
 from .env_dataset import EnvDataset
 from .convert_tensors import ConvertToFromTensors
 from .transform_wrappers import TransformObservation, TransformAction, TransformReward
-from .policy_env import PolicyEnv
\ No newline at end of file
+from .policy_env import PolicyEnv
+from .trace import TraceWrapper, add_trace_wrapper
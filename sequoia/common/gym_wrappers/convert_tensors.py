@@ -10,6 +10,7 @@ from torch import Tensor
 from sequoia.common.spaces.image import Image, ImageTensorSpace
 from sequoia.common.spaces.named_tuple import NamedTupleSpace
 from sequoia.common.spaces.typed_dict import TypedDictSpace
+from sequoia.common.spaces.validation import SpaceChecker
 from sequoia.utils.generic_functions import from_tensor, move, to_tensor
 from sequoia.utils.logging_utils import get_logger
 from collections import abc
@@ -38,9 +39,16 @@ class ConvertToFromTensors(IterableWrapper):
     Tensors as an input.
 
     If `device` is given, created Tensors are moved to the provided device.
+    When `space_check_every` is greater than 1, only one out of every
+    `space_check_every` actions is checked to be in the action space.
     """
 
-    def __init__(self, env: gym.Env, device: Union[torch.device, str] = None):
+    def __init__(
+        self,
+        env: gym.Env,
+        device: Union[torch.device, str] = None,
+        space_check_every: int = 1,
+    ):
         super().__init__(env=env)
         self.device = device
         self.observation_space: Space = add_tensor_support(
@@ -61,6 +69,9 @@ class ConvertToFromTensors(IterableWrapper):
                 reward_range[0], reward_range[1], reward_shape, np.float32
             )
         self.reward_space = add_tensor_support(self.reward_space, device=device)
+        # Compiled check used on the actions at each step. When `space_check_every` is
+        # greater than 1, only one out of every `space_check_every` actions is checked.
+        self._action_checker = SpaceChecker(check_every=space_check_every)
 
     def reset(self, *args, **kwargs):
         obs = self.env.reset(*args, **kwargs)
@@ -89,7 +100,10 @@ class ConvertToFromTensors(IterableWrapper):
 
     def step(self, action: Tensor) -> StepResult:
         action = self.action(action)
-        assert action in self.env.action_space, (action, self.env.action_space)
+        assert self._action_checker(action, self.env.action_space), (
+            action,
+            self.env.action_space,
+        )
 
         result = self.env.step(action)
         observation, reward, done, info = result
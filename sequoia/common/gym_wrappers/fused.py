@@ -0,0 +1,215 @@
+""" Collapses the observation/action/reward transforms of a chain of wrappers.
+
+The environments of the RL settings are wrapped in a lot of thin wrappers, most of
+which only transform the observations, actions or rewards. Calling `step` on such a
+chain goes through each wrapper's `step` method, with its attribute lookups and its
+own call to `self.env.step`.
+
+`fuse_wrappers` finds the runs of consecutive wrappers whose `step` and `reset` only
+apply their `observation`, `action` or `reward` methods, and adds a `FusedWrapper` on
+top of each run. The `FusedWrapper` calls the env below the run directly, applying a
+single precomputed callable per direction. The original wrappers are still part of the
+chain, so `has_wrapper`, attribute lookups and the spaces are unchanged.
+"""
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import gym
+
+from sequoia.utils.logging_utils import get_logger
+
+from .transform_wrappers import TransformAction
+from .utils import IterableWrapper, MayCloseEarly
+
+logger = get_logger(__file__)
+
+
+class StepTransforms(NamedTuple):
+    """ Which of the `action`, `observation` and `reward` methods of a wrapper are
+    applied by its `step` method.
+    """
+
+    action: bool = False
+    observation: bool = False
+    reward: bool = False
+
+
+# Implementations of `step` for which we know exactly which transforms are applied.
+_fusible_steps: Dict[Callable, StepTransforms] = {
+    gym.Wrapper.step: StepTransforms(),
+    MayCloseEarly.step: StepTransforms(),
+    gym.ObservationWrapper.step: StepTransforms(observation=True),
+    gym.RewardWrapper.step: StepTransforms(reward=True),
+    gym.ActionWrapper.step: StepTransforms(action=True),
+    TransformAction.step: StepTransforms(action=True),
+}
+# Implementations of `reset`, and wether they apply the `observation` method.
+_fusible_resets: Dict[Callable, bool] = {
+    gym.Wrapper.reset: False,
+    MayCloseEarly.reset: False,
+}
+for _wrapper_type in [gym.ObservationWrapper, gym.RewardWrapper, gym.ActionWrapper]:
+    if "reset" in vars(_wrapper_type):
+        _reset = vars(_wrapper_type)["reset"]
+        _fusible_resets[_reset] = _wrapper_type is gym.ObservationWrapper
+
+
+def register_fusible_step(
+    step: Callable,
+    reset: Callable = None,
+    action: bool = False,
+    observation: bool = False,
+    reward: bool = False,
+) -> None:
+    """ Registers the `step` (and `reset`) method of a wrapper class as being fusible.
+
+    The `step` must only apply the `action` method of the wrapper to the action, call
+    `self.env.step` and apply the `observation` and `reward` methods to the results,
+    depending on the values of `action`, `observation` and `reward`. When given, the
+    `reset` must only call `self.env.reset`, applying the `observation` method if
+    `observation` is True.
+    """
+    _fusible_steps[step] = StepTransforms(
+        action=action, observation=observation, reward=reward
+    )
+    if reset is not None:
+        _fusible_resets[reset] = observation
+
+
+def get_step_transforms(wrapper: gym.Env) -> Optional[StepTransforms]:
+    """ Returns which transforms the `step` of this wrapper applies, or None if the
+    wrapper can't be fused (e.g. because it keeps some state in `step` or `reset`).
+    """
+    if not isinstance(wrapper, gym.Wrapper):
+        return None
+    if "step" in vars(wrapper) or "reset" in vars(wrapper):
+        # The methods were replaced on the instance.
+        return None
+    wrapper_type = type(wrapper)
+    transforms = _fusible_steps.get(wrapper_type.step)
+    reset_applies_observation = _fusible_resets.get(wrapper_type.reset)
+    if transforms is None or reset_applies_observation is None:
+        return None
+    if reset_applies_observation != transforms.observation:
+        return None
+    return transforms
+
+
+def _chain(functions: Sequence[Callable[[Any], Any]]) -> Optional[Callable[[Any], Any]]:
+    if not functions:
+        return None
+    if len(functions) == 1:
+        return functions[0]
+    functions = tuple(functions)
+
+    def _chained(value: Any) -> Any:
+        for function in functions:
+            value = function(value)
+        return value
+
+    return _chained
+
+
+class FusedWrapper(IterableWrapper):
+    """ Wrapper placed on top of a run of fusible wrappers, which calls the env below
+    them directly, and applies their transforms with a single callable per direction.
+
+    NOTE: The `is_closed` checks of the fused wrappers are skipped, but the env below
+    them still raises an error if it is closed.
+    """
+
+    def __init__(self, env: gym.Wrapper, inner_env: gym.Env):
+        super().__init__(env)
+        self.inner_env = inner_env
+        self.fused_wrappers: List[gym.Wrapper] = []
+        wrapper = env
+        while wrapper is not inner_env:
+            self.fused_wrappers.append(wrapper)
+            wrapper = wrapper.env
+
+        observation_fns: List[Callable] = []
+        action_fns: List[Callable] = []
+        reward_fns: List[Callable] = []
+        # NOTE: The actions go down through the wrappers, starting with the outermost
+        # one, while the observations and rewards come up from the innermost wrapper.
+        for wrapper in self.fused_wrappers:
+            transforms = get_step_transforms(wrapper)
+            assert transforms is not None, f"Wrapper {wrapper} can't be fused."
+            if transforms.action:
+                action_fns.append(wrapper.action)
+        for wrapper in reversed(self.fused_wrappers):
+            transforms = get_step_transforms(wrapper)
+            if transforms.observation:
+                observation_fns.append(wrapper.observation)
+            if transforms.reward:
+                reward_fns.append(wrapper.reward)
+        self._action_fn = _chain(action_fns)
+        self._observation_fn = _chain(observation_fns)
+        self._reward_fn = _chain(reward_fns)
+
+    def reset(self, **kwargs):
+        observation = self.inner_env.reset(**kwargs)
+        if self._observation_fn is not None:
+            observation = self._observation_fn(observation)
+        return observation
+
+    def step(self, action):
+        if self._action_fn is not None:
+            action = self._action_fn(action)
+        observation, reward, done, info = self.inner_env.step(action)
+        if self._observation_fn is not None:
+            observation = self._observation_fn(observation)
+        if self._reward_fn is not None:
+            reward = self._reward_fn(reward)
+        return observation, reward, done, info
+
+    def observation(self, observation):
+        if self._observation_fn is None:
+            return observation
+        return self._observation_fn(observation)
+
+    def action(self, action):
+        if self._action_fn is None:
+            return action
+        return self._action_fn(action)
+
+    def reward(self, reward):
+        if self._reward_fn is None:
+            return reward
+        return self._reward_fn(reward)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}({len(self.fused_wrappers)} wrappers){self.env}>"
+
+
+def fuse_wrappers(env: gym.Env, min_wrappers: int = 2) -> gym.Env:
+    """ Adds a `FusedWrapper` on top of each run of at least `min_wrappers` fusible
+    wrappers in the chain of wrappers of `env`.
+
+    Returns the new outermost wrapper, which is either `env` or a `FusedWrapper`
+    around it.
+    """
+    # The wrappers, from the outermost to the innermost.
+    chain: List[gym.Env] = [env]
+    while isinstance(chain[-1], gym.Wrapper) and chain[-1].env is not chain[-1]:
+        chain.append(chain[-1].env)
+
+    # Find the runs of fusible wrappers, as (start, end) indices in `chain`.
+    runs: List[Tuple[int, int]] = []
+    start: Optional[int] = None
+    for i, wrapper in enumerate(chain + [None]):
+        fusible = wrapper is not None and get_step_transforms(wrapper) is not None
+        if fusible and start is None:
+            start = i
+        elif not fusible and start is not None:
+            if i - start >= min_wrappers:
+                runs.append((start, i))
+            start = None
+
+    for start, end in runs:
+        fused = FusedWrapper(chain[start], inner_env=chain[end])
+        logger.debug(f"Fused {end - start} wrappers: {fused.fused_wrappers}")
+        if start == 0:
+            env = fused
+        else:
+            chain[start - 1].env = fused
+    return env
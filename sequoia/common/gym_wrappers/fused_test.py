@@ -0,0 +1,56 @@
+import gym
+import numpy as np
+from gym.wrappers import TimeLimit
+
+from .fused import FusedWrapper, fuse_wrappers, get_step_transforms
+from .transform_wrappers import TransformAction, TransformObservation, TransformReward
+from .utils import has_wrapper
+
+
+def make_env(fuse: bool) -> gym.Env:
+    env = gym.make("CartPole-v0")
+    env = TransformObservation(env, f=lambda obs: obs * 2)
+    env = TransformReward(env, f=lambda reward: reward + 1)
+    env = TimeLimit(env, max_episode_steps=10)
+    env = TransformObservation(env, f=lambda obs: obs + 1)
+    env = TransformAction(env, f=lambda action: 1 - action)
+    env = TransformReward(env, f=lambda reward: reward * 10)
+    if fuse:
+        env = fuse_wrappers(env)
+    return env
+
+
+def test_fusible_wrappers():
+    env = gym.make("CartPole-v0")
+    assert get_step_transforms(TransformObservation(env, f=abs)).observation
+    assert get_step_transforms(TransformReward(env, f=abs)).reward
+    assert get_step_transforms(TransformAction(env, f=abs)).action
+    assert get_step_transforms(TimeLimit(env, max_episode_steps=10)) is None
+
+
+def test_same_results_as_unfused_env():
+    env = make_env(fuse=False)
+    fused_env = make_env(fuse=True)
+    assert isinstance(fused_env, FusedWrapper)
+    assert len(fused_env.fused_wrappers) == 3
+    # The wrappers below the TimeLimit also got fused.
+    assert has_wrapper(fused_env, TimeLimit)
+    assert isinstance(fused_env.inner_env.env, FusedWrapper)
+    assert fused_env.observation_space == env.observation_space
+
+    env.seed(123)
+    fused_env.seed(123)
+    assert np.array_equal(env.reset(), fused_env.reset())
+    done = False
+    while not done:
+        obs, reward, done, info = env.step(0)
+        fused_obs, fused_reward, fused_done, fused_info = fused_env.step(0)
+        assert np.array_equal(obs, fused_obs)
+        assert reward == fused_reward == 20
+        assert done == fused_done
+
+
+def test_short_runs_arent_fused():
+    env = gym.make("CartPole-v0")
+    env = TransformObservation(TimeLimit(env, max_episode_steps=10), f=abs)
+    assert fuse_wrappers(env) is env
@@ -260,6 +260,14 @@ class MultiTaskEnvironment(MayCloseEarly):
         self._episodes: int = 0
 
         self._current_task: Dict = {}
+        # Sorted steps of the task schedule, compiled from the schedule whenever it is
+        # replaced, along with the [start, end) steps of the last task that was looked
+        # up, so that looking up the task id is O(1) except at the task boundaries.
+        self._task_steps: List[int] = []
+        self._task_index_by_id: Dict[int, int] = {}
+        self._cached_task_index: int = -1
+        self._cached_task_start: int = 0
+        self._cached_task_end: int = 0
         self._task_schedule: Dict[int, Dict[str, Any]] = task_schedule or {}
 
         self.task_params: List[str] = task_params or []
@@ -302,12 +310,49 @@ class MultiTaskEnvironment(MayCloseEarly):
             return self._current_task_id
         current_step = self._steps
         assert current_step >= 0
-        task_steps: List[int] = sorted(self.task_schedule.keys())
-        assert 0 in task_steps
-        insertion_index = bisect.bisect_right(task_steps, current_step)
+        return self._task_index_at(current_step)
+
+    def _compile_task_schedule(self) -> None:
+        """ Compiles the sorted steps of the task schedule, and clears the cached task.
+        """
+        self._task_steps = sorted(self._task_schedule.keys())
+        assert 0 in self._task_steps
+        # Index of the first task equal to each task of the schedule (by identity), so
+        # that setting a task from the schedule doesn't need to compare it with all
+        # the other tasks.
+        first_index_for_key: Dict[Any, int] = {}
+        self._task_index_by_id = {}
+        for index, task in enumerate(self._task_schedule.values()):
+            key: Any = ("id", id(task))
+            if isinstance(task, dict):
+                items = tuple(sorted(task.items()))
+                try:
+                    hash(items)
+                    key = items
+                except TypeError:
+                    pass
+            self._task_index_by_id[id(task)] = first_index_for_key.setdefault(
+                key, index
+            )
+        self._cached_task_index = -1
+        self._cached_task_start = 0
+        self._cached_task_end = 0
+
+    def _task_index_at(self, step: int) -> int:
+        """ Returns the index of the task at step `step` within the task schedule. """
+        if len(self._task_steps) != len(self._task_schedule):
+            # The task schedule dict was modified in-place.
+            self._compile_task_schedule()
+        if self._cached_task_start <= step < self._cached_task_end:
+            return self._cached_task_index
         # The current task id is the insertion index - 1
-        current_task_index = insertion_index - 1
-        return current_task_index
+        index = bisect.bisect_right(self._task_steps, step) - 1
+        self._cached_task_index = index
+        self._cached_task_start = self._task_steps[index]
+        self._cached_task_end = (
+            self._task_steps[index + 1] if index + 1 < len(self._task_steps) else np.inf
+        )
+        return index
 
     @current_task_id.setter
     def current_task_id(self, value: int) -> None:
@@ -330,13 +375,16 @@ class MultiTaskEnvironment(MayCloseEarly):
         # if self._closed:
         #     raise gym.error.ClosedEnvironmentError("Can't step in closed env.")
 
-        if self.steps in self.task_schedule and not self.new_random_task_on_reset:
-            self.current_task = self.task_schedule[self.steps]
-            logger.debug(f"New task at step {self.steps}: {self.current_task}")
-            # Adding this on_task_switch, since it could maybe be easier than
-            # having to add a callback wrapper to use.
-            task_id = sorted(self.task_schedule.keys()).index(self.steps)
-            self.on_task_switch(task_id)
+        if not self.new_random_task_on_reset:
+            # NOTE: Equivalent to `self.steps in self.task_schedule`, but O(1) for the
+            # steps which aren't at a task boundary.
+            task_id = self._task_index_at(self._steps)
+            if self._steps == self._task_steps[task_id]:
+                self.current_task = self.task_schedule[self._steps]
+                logger.debug(f"New task at step {self.steps}: {self.current_task}")
+                # Adding this on_task_switch, since it could maybe be easier than
+                # having to add a callback wrapper to use.
+                self.on_task_switch(task_id)
 
         # elif self.new_random_task_on_reset:
         #     self.current_task_id
@@ -443,7 +491,9 @@ class MultiTaskEnvironment(MayCloseEarly):
             for k, value in zip(self.task_params, task):
                 task_dict[k] = value
             task = task_dict
-        if task in self.task_schedule.values():
+        if id(task) in self._task_index_by_id:
+            self._current_task_id = self._task_index_by_id[id(task)]
+        elif task in self.task_schedule.values():
             self._current_task_id = [
                 i for i, (k, v) in enumerate(self.task_schedule.items()) if v == task
             ][0]
@@ -563,5 +613,6 @@ class MultiTaskEnvironment(MayCloseEarly):
                 )
             self._task_schedule[step] = task
 
+        self._compile_task_schedule()
         if self._steps in self._task_schedule:
             self.current_task = self._task_schedule[self._steps]
@@ -604,3 +604,46 @@ def test_iteration():
     length_schedule = {k: v["length"] for k, v in task_schedule.items()}
     assert list(actual_task_schedule.values()) == list(length_schedule.values())
     # assert False, actual_task_schedule
+
+
+@pytest.mark.parametrize("nb_tasks", [1_000, 5_000])
+def test_long_task_schedule_throughput(nb_tasks: int, monkeypatch):
+    """ Checks that the task id lookups are only done through the task schedule at the
+    task boundaries, even when the schedule has thousands of tasks.
+    """
+    import bisect
+
+    from . import multi_task_environment
+
+    steps_per_task = 3
+    task_schedule = {
+        i * steps_per_task: dict(length=0.1 + (i % 10) * 0.1) for i in range(nb_tasks)
+    }
+    env = MultiTaskEnvironment(
+        gym.make("CartPole-v0"), task_schedule=task_schedule, add_task_id_to_obs=True
+    )
+    env.seed(123)
+    env.reset()
+    task_steps = sorted(task_schedule)
+
+    n_lookups = 0
+    bisect_right = bisect.bisect_right
+
+    def counting_bisect_right(*args, **kwargs):
+        nonlocal n_lookups
+        n_lookups += 1
+        return bisect_right(*args, **kwargs)
+
+    monkeypatch.setattr(
+        multi_task_environment.bisect, "bisect_right", counting_bisect_right
+    )
+    n_steps = nb_tasks * steps_per_task
+    for step in range(n_steps):
+        obs, _, done, _ = env.step(env.action_space.sample())
+        expected_task_id = bisect_right(task_steps, step) - 1
+        assert obs["task_labels"] == expected_task_id
+        assert env.length == task_schedule[task_steps[expected_task_id]]["length"]
+        if done:
+            env.reset()
+    # At most one lookup per task.
+    assert n_lookups <= nb_tasks
@@ -0,0 +1,64 @@
+""" Wrapper that reports the time spent in the `reset`, `step` and `send` methods of the
+wrapped env, as well as the time taken to get each batch when iterating over it, to the
+active tracer (see `sequoia.utils.tracing`).
+"""
+from typing import Iterator
+
+import gym
+
+from sequoia.utils.tracing import get_tracer, trace
+
+from .utils import IterableWrapper
+
+
+class TraceWrapper(IterableWrapper):
+    """ Records the time spent in the wrapped env as spans named "<name>/<method>".
+
+    Adding one of these wrappers directly around the env and another one around all
+    the other wrappers gives the overhead of these wrappers at each step.
+    """
+
+    def __init__(self, env: gym.Env, name: str = "env"):
+        super().__init__(env=env)
+        self.name = name
+        self._step_name = f"{name}/step"
+        self._reset_name = f"{name}/reset"
+        self._send_name = f"{name}/send"
+        self._next_name = f"{name}/next"
+
+    def reset(self, **kwargs):
+        with trace(self._reset_name):
+            return self.env.reset(**kwargs)
+
+    def step(self, action):
+        with trace(self._step_name):
+            return self.env.step(action)
+
+    def send(self, action):
+        if not self.wrapping_passive_env:
+            # NOTE: This calls `self.step`, which is already traced.
+            return super().send(action)
+        with trace(self._send_name):
+            return self.env.send(action)
+
+    def __iter__(self) -> Iterator:
+        if not self.wrapping_passive_env:
+            yield from super().__iter__()
+            return
+        iterator = iter(self.env)
+        while True:
+            with trace(self._next_name):
+                try:
+                    batch = next(iterator)
+                except StopIteration:
+                    return
+            yield batch
+
+
+def add_trace_wrapper(env: gym.Env, name: str = "env") -> gym.Env:
+    """ Wraps `env` with a `TraceWrapper` if there is an active tracer, otherwise
+    returns it unchanged.
+    """
+    if get_tracer() is None:
+        return env
+    return TraceWrapper(env, name=name)
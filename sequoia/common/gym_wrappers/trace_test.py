@@ -0,0 +1,44 @@
+import gym
+import torch
+from torch.utils.data import TensorDataset
+
+from sequoia.common.spaces import Image
+from sequoia.utils.tracing import StepTracer, tracing
+
+from .trace import TraceWrapper, add_trace_wrapper
+
+
+def test_trace_active_env():
+    env = TraceWrapper(gym.make("CartPole-v0"))
+    with tracing(StepTracer()) as tracer:
+        env.reset()
+        for _ in range(5):
+            env.step(env.action_space.sample())
+    # Not recorded, since the tracer isn't active anymore.
+    env.step(env.action_space.sample())
+    summary = tracer.summary()
+    assert summary["env/reset"]["count"] == 1
+    assert summary["env/step"]["count"] == 5
+
+
+def test_trace_passive_env():
+    from sequoia.settings.sl.environment import PassiveEnvironment
+
+    dataset = TensorDataset(torch.rand(20, 1, 28, 28), torch.randint(0, 10, [20]))
+    obs_space = Image(0, 1, (1, 28, 28))
+    env = PassiveEnvironment(
+        dataset, batch_size=4, n_classes=10, observation_space=obs_space,
+    )
+    env = TraceWrapper(env, name="dataloader")
+    with tracing(StepTracer()) as tracer:
+        batches = list(env)
+    assert len(batches) == 5
+    # NOTE: The last span is the time taken to reach the end of the dataloader.
+    assert tracer.summary()["dataloader/next"]["count"] == 6
+
+
+def test_add_trace_wrapper_only_when_tracing():
+    env = gym.make("CartPole-v0")
+    assert add_trace_wrapper(env) is env
+    with tracing():
+        assert isinstance(add_trace_wrapper(env), TraceWrapper)
@@ -120,7 +120,8 @@ class Loss(Serializable, MappingABC):
                 setattr(self, k, v)
         
         assert self.name, "Loss objects should be given a name!"
-        if self.name not in self.metrics:
+        has_metric_tensors = not (x is None and h_x is None and y_pred is None and y is None)
+        if has_metric_tensors and self.name not in self.metrics:
             # Create a Metrics object if given the necessary tensors.
             metrics = get_metrics(x=x, h_x=h_x, y_pred=y_pred, y=y)
             if metrics:
@@ -136,6 +137,32 @@ class Loss(Serializable, MappingABC):
         if "_field_names" not in type(self).__dict__:
             type(self)._field_names = tuple(f.name for f in fields(self))
 
+    @classmethod
+    def _create(
+        cls,
+        name: str,
+        loss: Union[Tensor, float],
+        losses: Dict[str, "Loss"],
+        metrics: Dict[str, Union[Metrics, Tensor]],
+        tensors: Dict[str, Tensor],
+        _coefficient: Union[float, Tensor],
+    ) -> "Loss":
+        """ Creates a Loss from values that are already valid, without going through
+        `__init__` and `__post_init__`.
+
+        This is used on the hot path of the training loop (`__mul__`, `to`, `detach`),
+        where the Loss objects are created from existing ones.
+        """
+        result = object.__new__(cls)
+        result.name = name
+        result.loss = loss
+        result.losses = losses
+        result.tensors = tensors
+        result.metrics = metrics
+        result._coefficient = _coefficient
+        result._device = None
+        return result
+
     def __contains__(self, key: str) -> bool:
         if isinstance(key, str):
             return key in type(self)._field_names
@@ -231,7 +258,7 @@ class Loss(Serializable, MappingABC):
             # TODO: setting in the 'metrics' dict, we are duplicating the
             # metrics, since they now reside in the `self.metrics[other.name]`
             # and `self.losses[other.name].metrics` attributes.
-            metrics = self.metrics
+            metrics = self.metrics.copy()
             # metrics = add_dicts(self.metrics, {other.name: other.metrics})
         
         tensors = add_dicts(self.tensors, other.tensors, add_values=False)
@@ -257,22 +284,25 @@ class Loss(Serializable, MappingABC):
             loss += model.get_loss(x=x, y=y)
         ```
         
+        NOTE: The dicts of `self` are updated in-place rather than re-created, so
+        that adding the losses of N auxiliary tasks doesn't copy them N times.
+
         Returns
         -------
         Loss
             `self`: The merged/summed up Loss.
         """
         self.loss = self.loss + other.loss
-        
+
         if self.name == other.name:
-            self.losses  = add_dicts(self.losses, other.losses)
-            self.metrics = add_dicts(self.metrics, other.metrics)
+            _add_into(self.losses, other.losses)
+            _add_into(self.metrics, other.metrics)
         else:
             # IDEA: when the names don't match, store the entire Loss
             # object into the 'losses' dict, rather than a single loss tensor.
-            self.losses = add_dicts(self.losses, {other.name: other})
-        
-        self.tensors = add_dicts(self.tensors, other.tensors, add_values=False)
+            _add_into(self.losses, {other.name: other})
+
+        self.tensors.update(other.tensors)
         return self
 
     def __radd__(self, other: Any):
@@ -298,14 +328,14 @@ class Loss(Serializable, MappingABC):
         Loss
             returns a scaled Loss instance.
         """
-        result = Loss(
+        result = self._create(
             name=self.name,
             loss=self.loss * factor,
             losses={
                 k: value * factor for k, value in self.losses.items()
             },
-            metrics=self.metrics,
-            tensors=self.tensors,
+            metrics=self.metrics.copy(),
+            tensors=self.tensors.copy(),
             _coefficient=self._coefficient * factor,
         )
         return result
@@ -317,6 +347,31 @@ class Loss(Serializable, MappingABC):
     def __truediv__(self, coefficient: Union[float, Tensor]) -> "Loss":
         return self * (1 / coefficient)
 
+    def to(self, device: Union[str, torch.device]) -> "Loss":
+        """ Returns a new Loss with all the tensors moved to `device`. """
+        return self._create(
+            name=self.name,
+            loss=move(self.loss, device),
+            losses={k: loss.to(device) for k, loss in self.losses.items()},
+            metrics={k: move(metric, device) for k, metric in self.metrics.items()},
+            tensors={k: move(tensor, device) for k, tensor in self.tensors.items()},
+            _coefficient=self._coefficient,
+        )
+
+    def detach(self) -> "Loss":
+        """ Returns a new Loss with the tensors detached from the graph.
+
+        NOTE: Like when serializing, the `tensors` aren't kept.
+        """
+        return self._create(
+            name=self.name,
+            loss=detach(self.loss),
+            losses={k: loss.detach() for k, loss in self.losses.items()},
+            metrics={k: detach(metric) for k, metric in self.metrics.items()},
+            tensors={},
+            _coefficient=self._coefficient,
+        )
+
     @property
     def unscaled_losses(self):
         """ Recovers the 'unscaled' version of this loss.
@@ -446,6 +501,22 @@ class Loss(Serializable, MappingABC):
         return result
 
 
+@detach.register(Loss)
+def _detach_loss(loss: Loss) -> Loss:
+    return loss.detach()
+
+
+def _add_into(d1: Dict, d2: Dict) -> None:
+    """ In-place version of `add_dicts(d1, d2)`, where `d1` gets updated. """
+    for key, v2 in d2.items():
+        if key not in d1:
+            d1[key] = v2
+        elif isinstance(v2, dict):
+            d1[key] = add_dicts(d1[key], v2)
+        else:
+            d1[key] = d1[key] + v2
+
+
 if __name__ == "__main__":
     import doctest
     doctest.testmod()
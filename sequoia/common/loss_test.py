@@ -1,6 +1,13 @@
 """
 TODO: Write some tests that also help illustrate how the Loss class works.
 """
+import statistics
+import time
+
+import torch
+
+from sequoia.conftest import slow
+
 from .loss import Loss
 
 
@@ -46,4 +53,57 @@ def test_to_log_dict_order():
         'total/task_a/accuracy': 0.95,
         'total/task_b/loss': 2.1,
         'total/task_c/loss': 3.0
-    }
\ No newline at end of file
+    }
+
+
+def training_step_loss(y_pred: torch.Tensor, y: torch.Tensor, n_aux_tasks: int) -> Loss:
+    """ Same bookkeeping as in the `get_loss` and `shared_step_end` of the BaseModel. """
+    loss = Loss("train")
+    loss += Loss("output_head", loss=y_pred.sum(), y_pred=y_pred, y=y)
+    for i in range(n_aux_tasks):
+        aux_loss = Loss(f"aux_{i}", loss=y_pred.mean())
+        loss += 0.5 * aux_loss.to(y_pred.device)
+    return loss.detach()
+
+
+def test_operations_dont_modify_inputs():
+    aux_loss = Loss("aux", loss=torch.ones(1), metrics={"accuracy": 0.5})
+    scaled = 0.5 * aux_loss
+    scaled += Loss("aux", loss=torch.ones(1), metrics={"accuracy": 0.25})
+    scaled += Loss("other", loss=torch.ones(1))
+    assert aux_loss.metrics == {"accuracy": 0.5}
+    assert not aux_loss.losses
+    assert scaled.metrics == {"accuracy": 0.75}
+    assert set(scaled.losses) == {"other"}
+    assert scaled._coefficient == 0.5
+
+    detached = scaled.detach()
+    assert detached.to_log_dict() == scaled.to_log_dict()
+    assert detached.losses["other"] is not scaled.losses["other"]
+
+
+@slow
+def test_training_step_overhead():
+    """ Micro-benchmark of the per-step loss bookkeeping: The cost of each auxiliary
+    task shouldn't grow with the number of auxiliary tasks.
+    """
+    y_pred = torch.rand(32, 10, requires_grad=True)
+    y = torch.randint(0, 10, (32,))
+    n_steps = 50
+    n_repeats = 11
+
+    def time_per_aux_task(n_aux_tasks: int) -> float:
+        training_step_loss(y_pred, y, n_aux_tasks)
+        start_time = time.perf_counter()
+        for _ in range(n_steps):
+            training_step_loss(y_pred, y, n_aux_tasks)
+        step_time = (time.perf_counter() - start_time) / n_steps
+        return step_time / n_aux_tasks
+
+    # NOTE: Alternating between the two, so that a slowdown of the machine affects
+    # both in the same way.
+    few_tasks, many_tasks = [], []
+    for _ in range(n_repeats):
+        few_tasks.append(time_per_aux_task(4))
+        many_tasks.append(time_per_aux_task(64))
+    assert statistics.median(many_tasks) < 2 * statistics.median(few_tasks)
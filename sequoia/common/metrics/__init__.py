@@ -4,4 +4,4 @@ from .metrics import Metrics, MetricsType
 from .metrics_utils import (accuracy, class_accuracy, get_class_accuracy,
                             get_confusion_matrix)
 from .regression import RegressionMetrics
-from .rl_metrics import EpisodeMetrics, GradientUsageMetric
+from .rl_metrics import EpisodeMetrics, GradientUsageMetric, UpdateFrequencyMetric
@@ -163,3 +163,32 @@ class GradientUsageMetric(Metrics):
 
     def to_pbar_message(self) -> Dict[str, Union[str, float]]:
         return {"used_fraction": self.used_gradients_fraction}
+
+
+@dataclass
+class UpdateFrequencyMetric(Metrics):
+    """ Small Metrics to report the number of model updates per environment step,
+    i.e. how sample-efficient the updates of an RL output head are.
+    """
+
+    updates: int = 0
+    env_steps: int = 0
+    updates_per_env_step: float = 0.0
+
+    def __post_init__(self):
+        self.n_samples = self.env_steps
+        if self.env_steps:
+            self.updates_per_env_step = self.updates / self.env_steps
+
+    def __add__(
+        self, other: Union["UpdateFrequencyMetric", Any]
+    ) -> "UpdateFrequencyMetric":
+        if not isinstance(other, UpdateFrequencyMetric):
+            return NotImplemented
+        return UpdateFrequencyMetric(
+            updates=self.updates + other.updates,
+            env_steps=self.env_steps + other.env_steps,
+        )
+
+    def to_pbar_message(self) -> Dict[str, Union[str, float]]:
+        return {"updates_per_step": self.updates_per_env_step}
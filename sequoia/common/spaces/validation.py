@@ -0,0 +1,263 @@
+""" 'Compiled' versions of the `contains` method of spaces, for the per-step checks.
+
+Checking that an action or an observation is in a space happens at every step, in
+multiple wrappers. For nested spaces like `TypedDictSpace` or `Sparse`, the `contains`
+method recurses through Python on each call, and the spaces with tensor support first
+convert the tensors to numpy arrays.
+
+`compile_contains` instead creates, once per space, a function which checks the shape
+and bounds of a value in a single vectorized numpy (or torch, for tensors) operation.
+`SpaceChecker` can also only check a fraction of the values, which is useful to reduce
+the overhead of these checks during long runs.
+"""
+from dataclasses import is_dataclass
+from functools import singledispatch
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import torch
+from gym import Space, spaces
+from torch import Tensor
+
+from .named_tuple import NamedTupleSpace
+from .sparse import Sparse
+from .typed_dict import TypedDictSpace
+
+_MISSING = object()
+
+
+@singledispatch
+def compile_contains(space: Space) -> Callable[[Any], bool]:
+    """ Returns a function equivalent to `space.contains`, but faster to call.
+
+    When there isn't a faster version for a given type of space, this returns the
+    `contains` method of the space.
+
+    >>> import numpy as np
+    >>> from gym import spaces
+    >>> contains = compile_contains(spaces.Box(0, 1, shape=(2,), dtype=np.float32))
+    >>> contains(np.array([0.5, 1.0])), contains(np.array([0.5, 2.0]))
+    (True, False)
+    >>> contains(np.zeros(3))
+    False
+    """
+    return space.contains
+
+
+@compile_contains.register(spaces.Box)
+def _compile_box_contains(space: spaces.Box) -> Callable[[Any], bool]:
+    # NOTE: Same as `Box.contains`, this only checks the shape and the bounds, not the
+    # dtype of the values.
+    shape = tuple(space.shape)
+    low = np.asarray(space.low)
+    high = np.asarray(space.high)
+    # Use scalar bounds when possible, and skip the unbounded sides entirely.
+    if low.size and (low == low.flat[0]).all():
+        low = low.flat[0]
+    if high.size and (high == high.flat[0]).all():
+        high = high.flat[0]
+    check_low = not np.all(np.isneginf(low))
+    check_high = not np.all(np.isposinf(high))
+    # Bounds as tensors, for each device on which we receive tensors.
+    tensor_bounds: Dict[torch.device, Tuple[Tensor, Tensor]] = {}
+
+    def _contains_tensor(x: Tensor) -> bool:
+        if tuple(x.shape) != shape:
+            return False
+        if x.device not in tensor_bounds:
+            tensor_bounds[x.device] = (
+                torch.as_tensor(low, device=x.device),
+                torch.as_tensor(high, device=x.device),
+            )
+        low_tensor, high_tensor = tensor_bounds[x.device]
+        if check_low and check_high:
+            return bool(((x >= low_tensor) & (x <= high_tensor)).all())
+        if check_low:
+            return bool((x >= low_tensor).all())
+        if check_high:
+            return bool((x <= high_tensor).all())
+        return True
+
+    def _contains(x: Any) -> bool:
+        if isinstance(x, Tensor):
+            return _contains_tensor(x)
+        if not isinstance(x, np.ndarray):
+            x = np.asarray(x)
+        if x.shape != shape or x.dtype.kind not in "biuf":
+            return False
+        if check_low and check_high:
+            return bool(np.all((x >= low) & (x <= high)))
+        if check_low:
+            return bool(np.all(x >= low))
+        if check_high:
+            return bool(np.all(x <= high))
+        return True
+
+    return _contains
+
+
+@compile_contains.register(spaces.Discrete)
+def _compile_discrete_contains(space: spaces.Discrete) -> Callable[[Any], bool]:
+    n = int(space.n)
+    start = int(getattr(space, "start", 0))
+
+    def _contains(x: Any) -> bool:
+        if isinstance(x, Tensor):
+            if x.shape != () or x.is_floating_point() or x.dtype is torch.bool:
+                return False
+            x = int(x)
+        elif isinstance(x, (np.ndarray, np.generic)):
+            if x.shape != () or x.dtype.kind not in "iu":
+                return False
+            x = int(x)
+        elif not isinstance(x, int) or isinstance(x, bool):
+            return False
+        return start <= x < start + n
+
+    return _contains
+
+
+@compile_contains.register(spaces.MultiDiscrete)
+def _compile_multidiscrete_contains(space: spaces.MultiDiscrete) -> Callable[[Any], bool]:
+    nvec = np.asarray(space.nvec)
+    shape = tuple(nvec.shape)
+    tensor_nvecs: Dict[torch.device, Tensor] = {}
+
+    def _contains(x: Any) -> bool:
+        if isinstance(x, Tensor):
+            if tuple(x.shape) != shape or x.is_floating_point():
+                return False
+            if x.device not in tensor_nvecs:
+                tensor_nvecs[x.device] = torch.as_tensor(nvec, device=x.device)
+            return bool(((x >= 0) & (x < tensor_nvecs[x.device])).all())
+        if not isinstance(x, np.ndarray):
+            x = np.asarray(x)
+        if x.shape != shape or x.dtype.kind not in "iu":
+            return False
+        return bool(np.all((x >= 0) & (x < nvec)))
+
+    return _contains
+
+
+@compile_contains.register(spaces.MultiBinary)
+def _compile_multibinary_contains(space: spaces.MultiBinary) -> Callable[[Any], bool]:
+    shape = tuple(np.atleast_1d(space.n))
+
+    def _contains(x: Any) -> bool:
+        if isinstance(x, Tensor):
+            return tuple(x.shape) == shape and bool(((x == 0) | (x == 1)).all())
+        if not isinstance(x, np.ndarray):
+            x = np.asarray(x)
+        return x.shape == shape and bool(np.all((x == 0) | (x == 1)))
+
+    return _contains
+
+
+@compile_contains.register(Sparse)
+def _compile_sparse_contains(space: Sparse) -> Callable[[Any], bool]:
+    base_contains = compile_contains(space.base)
+
+    def _contains(x: Any) -> bool:
+        return x is None or base_contains(x)
+
+    return _contains
+
+
+@compile_contains.register(spaces.Tuple)
+def _compile_tuple_contains(space: spaces.Tuple) -> Callable[[Any], bool]:
+    item_contains = [compile_contains(item_space) for item_space in space.spaces]
+
+    def _contains(x: Any) -> bool:
+        if isinstance(x, (list, np.ndarray)):
+            x = tuple(x)
+        return (
+            isinstance(x, tuple)
+            and len(x) == len(item_contains)
+            and all(contains(item) for contains, item in zip(item_contains, x))
+        )
+
+    return _contains
+
+
+@compile_contains.register(NamedTupleSpace)
+def _compile_named_tuple_contains(space: NamedTupleSpace) -> Callable[[Any], bool]:
+    return space.contains
+
+
+@compile_contains.register(spaces.Dict)
+def _compile_dict_contains(space: spaces.Dict) -> Callable[[Any], bool]:
+    item_contains = [(key, compile_contains(s)) for key, s in space.spaces.items()]
+
+    def _contains(x: Any) -> bool:
+        if not isinstance(x, dict) or len(x) != len(item_contains):
+            return False
+        for key, contains in item_contains:
+            if key not in x or not contains(x[key]):
+                return False
+        return True
+
+    return _contains
+
+
+@compile_contains.register(TypedDictSpace)
+def _compile_typed_dict_contains(space: TypedDictSpace) -> Callable[[Any], bool]:
+    item_contains = [(key, compile_contains(s)) for key, s in space.spaces.items()]
+    dataclass_type = space.dtype if is_dataclass(space.dtype) else None
+
+    def _contains(x: Any) -> bool:
+        if is_dataclass(x):
+            if dataclass_type is not None and not isinstance(x, dataclass_type):
+                return False
+            get_item = lambda key: getattr(x, key, _MISSING)
+        elif isinstance(x, dict):
+            # NOTE: Same as in `TypedDictSpace.contains`, we allow samples with more
+            # values, as long as they have all the required keys.
+            get_item = lambda key: x.get(key, _MISSING)
+        else:
+            return False
+        for key, contains in item_contains:
+            item = get_item(key)
+            if item is _MISSING or not contains(item):
+                return False
+        return True
+
+    return _contains
+
+
+class SpaceChecker:
+    """ Checks if values are in a space, using a 'compiled' version of its `contains`.
+
+    When `check_every` is greater than 1, only the first value and then one out of
+    every `check_every` values are actually checked, and the other calls return True.
+    The settings and Methods use the `space_check_every` field of the `Config`.
+
+    >>> from gym import spaces
+    >>> checker = SpaceChecker(spaces.Discrete(3), check_every=2)
+    >>> [checker(5) for _ in range(4)]
+    [False, True, False, True]
+    """
+
+    def __init__(self, space: Space = None, check_every: int = 1):
+        self.check_every = check_every
+        self.space: Optional[Space] = None
+        self._contains: Optional[Callable[[Any], bool]] = None
+        self._n_calls = 0
+        if space is not None:
+            self.set_space(space)
+
+    def set_space(self, space: Space) -> None:
+        self.space = space
+        self._contains = compile_contains(space)
+
+    def __call__(self, x: Any, space: Space = None) -> bool:
+        """ Returns whether `x` is in the space.
+
+        When `space` is passed and isn't the current space (e.g. when the space of an
+        env changes), the check for the new space is compiled first.
+        """
+        if space is not None and space is not self.space:
+            self.set_space(space)
+        self._n_calls += 1
+        if self.check_every > 1 and (self._n_calls - 1) % self.check_every:
+            return True
+        return self._contains(x)
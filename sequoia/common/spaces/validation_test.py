@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+import torch
+from gym import spaces
+
+from .sparse import Sparse
+from .tensor_spaces import TensorBox, TensorDiscrete
+from .typed_dict import TypedDictSpace
+from .validation import SpaceChecker, compile_contains
+
+spaces_and_values = [
+    (
+        spaces.Box(0, 1, shape=(2, 3), dtype=np.float32),
+        [
+            np.full((2, 3), 0.5, dtype=np.float32),
+            np.full((2, 3), 1.5, dtype=np.float32),
+            np.zeros((3, 2), dtype=np.float32),
+            [[0, 0, 0], [1, 1, 1]],
+        ],
+    ),
+    (
+        spaces.Box(np.array([0, -1]), np.array([1, 0]), dtype=np.float32),
+        [
+            np.array([0.5, -0.5], dtype=np.float32),
+            np.array([-0.5, -0.5], dtype=np.float32),
+            np.array([0.5, 0.5], dtype=np.float32),
+        ],
+    ),
+    (
+        spaces.Box(-np.inf, np.inf, shape=(4,), dtype=np.float32),
+        [
+            np.zeros(4, dtype=np.float32),
+            np.full(4, 1e10, dtype=np.float32),
+            np.zeros(5, dtype=np.float32),
+        ],
+    ),
+    (spaces.Discrete(3), [0, 2, 3, -1, np.int64(1), np.array(2), np.array([1])]),
+    (
+        spaces.MultiDiscrete([2, 3]),
+        [np.array([1, 2]), np.array([2, 2]), np.array([1, 2, 0]), np.array([-1, 0])],
+    ),
+    (
+        spaces.Tuple([spaces.Discrete(2), spaces.Box(0, 1, (2,), dtype=np.float32)]),
+        [
+            (1, np.zeros(2, dtype=np.float32)),
+            (2, np.zeros(2, dtype=np.float32)),
+            (1,),
+            [0, np.ones(2, dtype=np.float32)],
+        ],
+    ),
+    (
+        spaces.Dict({"a": spaces.Discrete(2), "b": spaces.Discrete(3)}),
+        [{"a": 1, "b": 2}, {"a": 1, "b": 3}, {"a": 1}, {"a": 1, "c": 2}],
+    ),
+    (
+        Sparse(spaces.Discrete(2), sparsity=0.5),
+        [None, 0, 1, 2],
+    ),
+]
+
+
+@pytest.mark.parametrize("space, values", spaces_and_values)
+def test_same_as_contains(space: spaces.Space, values):
+    contains = compile_contains(space)
+    for value in values:
+        assert contains(value) == space.contains(value), value
+
+
+def test_typed_dict_space():
+    space = TypedDictSpace(
+        x=spaces.Box(0, 1, shape=(2,), dtype=np.float32),
+        t=Sparse(spaces.Discrete(2), sparsity=0.5),
+    )
+    contains = compile_contains(space)
+    assert contains(space.sample())
+    assert contains({"x": np.zeros(2), "t": None})
+    assert not contains({"x": np.zeros(2), "t": 2})
+    assert not contains({"x": np.zeros(2)})
+
+
+def test_tensors():
+    box = TensorBox(0, 1, shape=(2,), dtype=np.float32)
+    contains = compile_contains(box)
+    assert contains(torch.as_tensor([0.5, 1.0]))
+    assert not contains(torch.as_tensor([0.5, 1.5]))
+    assert not contains(torch.zeros(3))
+    # The numpy arrays are still accepted.
+    assert contains(np.zeros(2))
+
+    discrete = TensorDiscrete(3)
+    contains = compile_contains(discrete)
+    assert contains(torch.as_tensor(2))
+    assert not contains(torch.as_tensor(3))
+    assert not contains(torch.as_tensor(1.0))
+    assert not contains(torch.as_tensor([1]))
+
+
+def test_checker_recompiles_when_space_changes():
+    checker = SpaceChecker()
+    assert checker(2, spaces.Discrete(3))
+    assert not checker(2, spaces.Discrete(2))
+    assert checker(np.zeros(2), spaces.Box(0, 1, (2,), dtype=np.float32))
+
+
+@pytest.mark.parametrize("check_every", [1, 3])
+def test_checker_sampling(check_every: int):
+    checker = SpaceChecker(spaces.Discrete(2), check_every=check_every)
+    results = [checker(5) for _ in range(7)]
+    n_checked = results.count(False)
+    assert not results[0]
+    assert n_checked == len(range(0, 7, check_every))
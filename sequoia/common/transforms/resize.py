@@ -50,11 +50,15 @@ def _(x: Image.Image, size: Tuple[int, ...], **kwargs) -> Image.Image:
 def _resize_array_or_tensor(
     x: np.ndarray, size: Tuple[int, ...], **kwargs
 ) -> np.ndarray:
-    """ TODO: This resizes numpy arrays by converting them to tensors and then
-    using the `interpolate` function. There is for sure a more efficient way to
-    do this.
+    """ Resizes an image or a batch of images with the `interpolate` function.
+
+    Numpy arrays are viewed as tensors (without copying them), and images which
+    already have the right size are returned as-is.
     """
     original = x
+    height_width = x.shape[-3:-1] if has_channels_last(x) else x.shape[-2:]
+    if tuple(height_width) == ((size, size) if isinstance(size, int) else tuple(size)):
+        return x
     if isinstance(original, np.ndarray):
         # Need to convert to tensor (for interpolate to work).
         x = torch.as_tensor(x)
@@ -83,29 +83,27 @@ def _(image: Union[Image, np.ndarray]) -> Tensor:
     """    
     from .channels import (channels_first_if_needed, channels_last_if_needed,
                            has_channels_first, has_channels_last)
-    image = copy_if_negative_strides(image)
+    if isinstance(image, Image):
+        image = np.array(image)
 
     if len(image.shape) == 2:
-        return F.to_tensor(image)
+        return F.to_tensor(copy_if_negative_strides(image))
 
     if isinstance(image, np.ndarray):
-        # Convert to channels last if needed, because ToTensor expects to
-        # receive that.
+        # Convert to channels first if needed (as a view), and then copy the array
+        # only once, while converting it to a contiguous float tensor.
         image = channels_first_if_needed(image)
-        image = torch.from_numpy(image).contiguous()
+        if any(s < 0 for s in image.strides):
+            image = np.ascontiguousarray(image)
+        tensor = torch.from_numpy(image)
         # backward compatibility
-        if isinstance(image, torch.ByteTensor):
-            image = image.float().div(255)
-        return image
-
-
-    if len(image.shape) == 4:
-        return channels_first_if_needed(
-            torch.stack(list(map(image_to_tensor, image)))
-        )
+        if tensor.dtype == torch.uint8:
+            result = torch.empty(tensor.shape, dtype=torch.float32)
+            result.copy_(tensor)
+            return result.div_(255)
+        return tensor.contiguous()
 
-    if not isinstance(image, Tensor):
-        image = F.to_tensor(image)
+    # NOTE: Batches of images (4-dimensional tensors) are converted all at once.
     return channels_first_if_needed(image)
 
 
@@ -165,6 +165,31 @@ def test_channels_first_transform_on_gym_env():
     assert obs.shape == (3, 400, 600)
 
 
+@pytest.mark.parametrize(
+    "transforms",
+    [
+        [Transforms.to_tensor],
+        [Transforms.to_tensor, Transforms.three_channels, Transforms.resize_32x32],
+        [Transforms.channels_first, Transforms.channels_last_if_needed],
+    ],
+)
+@pytest.mark.parametrize("input_shape", [(28, 28, 1), (64, 48, 3)])
+def test_transforms_on_batch_match_applying_on_each_item(transforms, input_shape):
+    batch = np.random.randint(0, 255, (8, *input_shape), dtype=np.uint8)
+    compose = Compose(transforms)
+    expected = torch.stack([torch.as_tensor(compose(item)) for item in batch])
+    assert torch.allclose(torch.as_tensor(compose(batch)), expected)
+
+
+def test_to_tensor_negative_strides():
+    x = np.random.randint(0, 255, (2, 9, 12, 3), dtype=np.uint8)[:, ::-1]
+    y = Transforms.to_tensor(x)
+    assert y.shape == (2, 3, 9, 12)
+    assert y.dtype == torch.float32
+    assert y.is_contiguous()
+    assert torch.allclose(y, torch.as_tensor(x.copy()).permute(0, 3, 1, 2) / 255)
+
+
 def test_preserves_device_when_possible():
     # TODO: Write a test that checks which transforms can be run on GPU, and checks
     # that they preserve the `device` attribute of a space when it's applied on a space.
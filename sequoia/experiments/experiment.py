@@ -12,7 +12,6 @@ from inspect import isabstract, isclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar, Union
 
-import sequoia.methods
 from simple_parsing import (
     ArgumentParser,
     ConflictResolution,
@@ -23,7 +22,7 @@ from simple_parsing import (
 )
 
 from sequoia.common.config import Config, WandbConfig
-from sequoia.methods import Method, get_all_methods
+from sequoia.methods import Method, get_method, get_method_names
 from sequoia.settings import (
     Results,
     Setting,
@@ -40,13 +39,6 @@ logger = get_logger(__file__)
 source_dir = Path(os.path.dirname(__file__))
 
 
-def get_method_names() -> Dict[str, Type[Method]]:
-    all_methods = get_all_methods()
-    return {
-        method.get_full_name(): method for method in all_methods
-    }
-
-
 @dataclass
 class Experiment(Parseable, Serializable):
     """ Applies a Method to an experimental Setting to obtain Results.
@@ -72,7 +64,10 @@ class Experiment(Parseable, Serializable):
 
     # Which experimental method to use. When left unset, will evaluate all
     # compatible methods on the provided setting.
-    method: Optional[Union[str, Method, Type[Method]]] = choice(get_method_names(), default=None)
+    # NOTE: Only the chosen Method is imported (see `sequoia.methods.get_method`).
+    method: Optional[Union[str, Method, Type[Method]]] = choice(
+        *get_method_names(), default=None, type=str
+    )
 
     # All the other configuration options, which are independant of the choice
     # of Setting or of Method, go in this next dataclass here! For example,
@@ -91,7 +86,7 @@ class Experiment(Parseable, Serializable):
 
         # Each Method also has a unique name.
         if isinstance(self.method, str):
-            self.method = get_class_with_name(self.method, all_methods)
+            self.method = get_method(self.method)
 
         if self.benchmark:
             # If the provided benchmark isn't a path, try to get the value from
@@ -505,8 +500,8 @@ def main():
     logger.debug("Registered Settings: \n" + "\n".join(
         f"- {setting.get_name()}: {setting} ({setting.get_path_to_source_file()})" for setting in all_settings
     ))
-    logger.debug("Registered Methods: \n" + "\n".join(
-        f"- {method.get_name()}: {method} ({method.get_path_to_source_file()})" for method in get_all_methods()
+    logger.debug("Available Methods: \n" + "\n".join(
+        f"- {method_name}" for method_name in get_method_names()
     ))
 
     Experiment.main()
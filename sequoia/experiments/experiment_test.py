@@ -13,8 +13,7 @@ from sequoia.methods.base_method import BaseMethod
 from sequoia.methods.random_baseline import RandomBaselineMethod
 from sequoia.settings import Results, Setting, all_settings
 
-from .experiment import Experiment, get_method_names
-method_names = get_method_names()
+from .experiment import Experiment
 
 
 @pytest.mark.xfail(
@@ -77,7 +76,7 @@ def test_experiment_from_args(
     names.
     """
     # method = method_type.get_name()
-    method_name = [k for k, v in method_names.items() if v is method_type][0]
+    method_name = method_type.get_full_name()
     setting = setting_type.get_name()
     if not method_type.is_applicable(setting_type):
         pytest.skip(
@@ -1,7 +1,6 @@
 """Runs an experiment, which consist in applying a Method to a Setting.
 """
-import sequoia.methods
-from sequoia.methods import get_all_methods
+from sequoia.methods import get_method_names
 from sequoia.settings import all_settings
 from sequoia.utils import get_logger
 from sequoia.experiments import Experiment
@@ -12,8 +11,8 @@ def main():
     logger.debug("Registered Settings: \n" + "\n".join(
         f"- {setting.get_name()}: {setting} ({setting.get_path_to_source_file()})" for setting in all_settings
     ))
-    logger.debug("Registered Methods: \n" + "\n".join(
-        f"- {method.get_full_name()}: {method} ({method.get_path_to_source_file()})" for method in get_all_methods()
+    logger.debug("Available Methods: \n" + "\n".join(
+        f"- {method_name}" for method_name in get_method_names()
     ))
 
     return Experiment.main()
@@ -19,24 +19,16 @@ goodies associated with Pytorch-Lightning.
 You can also easily add callbacks to measure your own metrics and such as you would in
 Pytorch-Lightning.
 """
-import glob
-import inspect
-import os
-import warnings
-from importlib import import_module
-from os.path import basename, dirname, isfile, join
-from pathlib import Path
-from typing import List, Type
-from os.path import abspath
-
-import pkg_resources
-from pkg_resources import EntryPoint
-from typing import Dict
-from setuptools import find_packages
 from functools import lru_cache
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Type
 
 from sequoia.settings.base import Method
 from sequoia.utils.logging_utils import get_logger
+
+if TYPE_CHECKING:
+    from pkg_resources import EntryPoint
+
 logger = get_logger(__file__)
 
 
@@ -93,6 +85,147 @@ def register_method(method_class: Type[Method] = None, *, name: str = None, fami
     return wrap(method_class)
 
 
+# Full name and location ("module:attribute") of the Methods included in Sequoia.
+# NOTE: These are only imported when they are used (see `get_method` and
+# `get_all_methods`), since some of them depend on large packages (avalanche,
+# stable-baselines3, etc.) which take a long time to import.
+_builtin_methods: Dict[str, str] = {
+    "random_baseline": "sequoia.methods.random_baseline:RandomBaselineMethod",
+    "base": "sequoia.methods.base_method:BaseMethod",
+    "pnn": "sequoia.methods.pnn:PnnMethod",
+    "experience_replay": "sequoia.methods.experience_replay:ExperienceReplayMethod",
+    "hat": "sequoia.methods.hat:HatMethod",
+    "ewc": "sequoia.methods.ewc_method:EwcMethod",
+    "avalanche.agem": "sequoia.methods.avalanche:AGEMMethod",
+    "avalanche.ar1": "sequoia.methods.avalanche:AR1Method",
+    "avalanche.cwr_star": "sequoia.methods.avalanche:CWRStarMethod",
+    "avalanche.ewc": "sequoia.methods.avalanche:EWCMethod",
+    "avalanche.gem": "sequoia.methods.avalanche:GEMMethod",
+    "avalanche.gdumb": "sequoia.methods.avalanche:GDumbMethod",
+    "avalanche.lwf": "sequoia.methods.avalanche:LwFMethod",
+    "avalanche.replay": "sequoia.methods.avalanche:ReplayMethod",
+    "avalanche.synaptic_intelligence": "sequoia.methods.avalanche:SynapticIntelligenceMethod",
+    "sb3.a2c": "sequoia.methods.stable_baselines3_methods:A2CMethod",
+    "sb3.ddpg": "sequoia.methods.stable_baselines3_methods:DDPGMethod",
+    "sb3.dqn": "sequoia.methods.stable_baselines3_methods:DQNMethod",
+    "sb3.ppo": "sequoia.methods.stable_baselines3_methods:PPOMethod",
+    "sb3.sac": "sequoia.methods.stable_baselines3_methods:SACMethod",
+    "sb3.td3": "sequoia.methods.stable_baselines3_methods:TD3Method",
+}
+
+# TODO: Eventually these could become external repos, with their own tests / etc, based
+# on a 'cookiecutter' repo of some sort. This would make it easier to maintain and to
+# delegate work!
+
+# IDEA: Could also do the same for the datasets somehow? Like have an extendable
+# `sequoia.datasets` cookiecutter repo? How would that work with Settings?
+# Assumption + Assumption -> Assumption (combined)
+# Setting := fn(dataset, **kwargs) -> Callable[[Method], Results]
+
+# Module where each of the attributes that can be imported from `sequoia.methods` is
+# defined. These modules are only imported when the attribute is first accessed.
+_lazy_attributes: Dict[str, str] = {
+    "RandomBaselineMethod": "sequoia.methods.random_baseline",
+    "BaseMethod": "sequoia.methods.base_method",
+    "BaseModel": "sequoia.methods.base_method",
+    "PnnMethod": "sequoia.methods.pnn",
+    "ExperienceReplayMethod": "sequoia.methods.experience_replay",
+    "HatMethod": "sequoia.methods.hat",
+    "EwcMethod": "sequoia.methods.ewc_method",
+}
+_lazy_attributes.update(
+    (name, "sequoia.methods.avalanche")
+    for name in [
+        "AvalancheMethod",
+        "AGEMMethod",
+        "AR1Method",
+        "CWRStarMethod",
+        "EWCMethod",
+        "GEMMethod",
+        "GDumbMethod",
+        "LwFMethod",
+        "NaiveMethod",
+        "ReplayMethod",
+        "SynapticIntelligenceMethod",
+    ]
+)
+_lazy_attributes.update(
+    (name, "sequoia.methods.stable_baselines3_methods")
+    for name in [
+        "StableBaselines3Method",
+        "SB3BaseHParams",
+        "OnPolicyMethod",
+        "OnPolicyModel",
+        "OffPolicyMethod",
+        "OffPolicyModel",
+        "PolicyWrapper",
+        "DQNMethod",
+        "DQNModel",
+        "A2CMethod",
+        "A2CModel",
+        "DDPGMethod",
+        "DDPGModel",
+        "TD3Method",
+        "TD3Model",
+        "SACMethod",
+        "SACModel",
+        "PPOMethod",
+        "PPOModel",
+    ]
+)
+
+
+def __getattr__(name: str) -> Any:
+    """ Imports the Methods (and related classes) the first time they are accessed,
+    e.g. with `from sequoia.methods import BaseMethod`.
+    """
+    if name == "BaselineMethod":
+        # Keeping a pointer to the old name, just to help with backward-compatibility.
+        return __getattr__("BaseMethod")
+    if name not in _lazy_attributes:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_lazy_attributes[name]), name)
+    globals()[name] = value
+    return value
+
+
+def _load(target: str) -> Any:
+    """ Imports the object at the given location (in "module:attribute" format). """
+    module_name, _, attribute = target.partition(":")
+    return getattr(import_module(module_name), attribute)
+
+
+@lru_cache(1)
+def get_external_method_entry_points() -> Dict[str, "EntryPoint"]:
+    """ Returns the `Method` entry-points of the packages installed, without loading
+    them (see `get_external_methods`).
+    """
+    # NOTE: Importing `pkg_resources` is quite slow, so it's only done when needed.
+    import pkg_resources
+
+    return {
+        entry_point.name: entry_point
+        for entry_point in pkg_resources.iter_entry_points("Method")
+    }
+
+
+def _load_entry_point(entry_point: "EntryPoint") -> Optional[Type[Method]]:
+    try:
+        method_class = entry_point.load()
+    except Exception as exc:
+        logger.error(
+            f"Unable to load external Method: '{entry_point.name}', from package "
+            f"{entry_point.dist.project_name}, version={entry_point.dist.version}: "
+            f"{exc}"
+        )
+        return None
+    logger.debug(
+        f"Imported an external Method: '{entry_point.name}', from package "
+        f"{entry_point.dist.project_name}, (version = {entry_point.dist.version})."
+    )
+    return method_class
+
+
 @lru_cache(1)
 def get_external_methods() -> Dict[str, Type[Method]]:
     """ Returns a dictionary of the Methods defined outside of Sequoia.
@@ -127,63 +260,13 @@ def get_external_methods() -> Dict[str, Type[Method]]:
     ```
     """
     methods: Dict[str, Type[Method]] = {}
-    for entry_point in pkg_resources.iter_entry_points("Method"):
-        entry_point: EntryPoint
-        try:
-            method_class = entry_point.load()
-        except Exception as exc:
-            logger.error(
-                f"Unable to load external Method: '{entry_point.name}', from package "
-                f"{entry_point.dist.project_name}, version={entry_point.dist.version}: "
-                f"{exc}"
-            )
-        else:
-            logger.debug(
-                f"Imported an external Method: '{entry_point.name}', from package "
-                f"{entry_point.dist.project_name}, (version = {entry_point.dist.version})."
-            )
-            methods[entry_point.name] = method_class
+    for name, entry_point in get_external_method_entry_points().items():
+        method_class = _load_entry_point(entry_point)
+        if method_class is not None:
+            methods[name] = method_class
     return methods
 
 
-from sequoia.methods.random_baseline import RandomBaselineMethod
-from sequoia.methods.base_method import BaseMethod, BaseModel
-# Keeping a pointer to the old name, just to help with backward-compatibility a bit.
-BaselineMethod = BaseMethod
-
-from sequoia.methods.pnn import PnnMethod
-from sequoia.methods.experience_replay import ExperienceReplayMethod
-from sequoia.methods.hat import HatMethod
-from sequoia.methods.ewc_method import EwcMethod
-
-# TODO: Eventually these could become external repos, with their own tests / etc, based
-# on a 'cookiecutter' repo of some sort. This would make it easier to maintain and to
-# delegate work!
-
-# IDEA: Could also do the same for the datasets somehow? Like have an extendable
-# `sequoia.datasets` cookiecutter repo? How would that work with Settings?
-# Assumption + Assumption -> Assumption (combined)
-# Setting := fn(dataset, **kwargs) -> Callable[[Method], Results]
-
-
-try:
-    from sequoia.methods.avalanche import *
-except ImportError:
-    pass
-
-try:
-    from sequoia.methods.stable_baselines3_methods import *
-except ImportError:
-    pass
-
-
-try:
-    from sequoia.methods.pl_bolts_methods import *
-except ImportError:
-    pass
-
-
-
 def add_external_methods(all_methods: List[Type[Method]]) -> List[Type[Method]]:
     for name, method_class in get_external_methods().items():
         if method_class not in all_methods:
@@ -192,7 +275,49 @@ def add_external_methods(all_methods: List[Type[Method]]) -> List[Type[Method]]:
     return all_methods
 
 
+def get_method_names() -> List[str]:
+    """ Returns the (full) names of all the available Methods, without importing them.
+
+    NOTE: The external Methods are listed with the name of their entry-point.
+    """
+    names = list(_builtin_methods)
+    names.extend(method.get_full_name() for method in _registered_methods)
+    names.extend(get_external_method_entry_points())
+    return sorted(set(names))
+
+
+def get_method(name: str) -> Type[Method]:
+    """ Returns the Method with the given (full) name, importing only its module.
+
+    The name can be that of a Method included in Sequoia, of a Method registered with
+    `register_method`, or of a `Method` entry-point of another package.
+    """
+    if name in _builtin_methods:
+        return _load(_builtin_methods[name])
+    for method in _registered_methods:
+        if method.get_full_name() == name:
+            return method
+    entry_points = get_external_method_entry_points()
+    if name in entry_points:
+        method_class = _load_entry_point(entry_points[name])
+        if method_class is not None:
+            return method_class
+    raise RuntimeError(
+        f"Couldn't find a Method with name {name}! (available methods: "
+        f"{get_method_names()})"
+    )
+
+
 def get_all_methods() -> List[Type[Method]]:
+    """ Returns all the available Methods, importing them if needed.
+
+    Methods whose dependencies aren't installed are skipped.
+    """
+    for name, target in _builtin_methods.items():
+        try:
+            _load(target)
+        except ImportError as exc:
+            logger.debug(f"Method {name} isn't available: {exc}")
     # This may change over time, and includes ALL subclasses of 'Method'.
     # methods = Method.__subclasses__()
     # This includes all registered methods, e.g. not any base classes.
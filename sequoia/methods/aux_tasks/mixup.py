@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Set, Tuple, ClassVar
+from typing import Any, ClassVar, Dict, List, Optional, Set, Tuple
 
 import numpy as np
 import torch
@@ -89,6 +89,7 @@ from copy import deepcopy
 from sequoia.utils.utils import add_dicts
 
 
+@torch.no_grad()
 def average_models(old: nn.Module, new: nn.Module, old_frac: float = 0.1) -> None:
     """ Updates the old model weights with an exponential moving average of the new.
 
@@ -97,31 +98,34 @@ def average_models(old: nn.Module, new: nn.Module, old_frac: float = 0.1) -> Non
     otherwise, if the weight is only present in either, keeps the value as-is.
 
     Returns nothing, as it modifies the `old` module in-place.
+
+    NOTE: The weights of `old` are updated in-place with a single fused operation
+    per group of tensors (using `torch._foreach_mul_` and `torch._foreach_add_`),
+    rather than creating new tensors and loading them with `load_state_dict`.
+    Non-floating-point buffers (e.g. `num_batches_tracked`) are copied over.
     """
+    # NOTE: The tensors in the state dicts share their storage with the parameters
+    # and buffers of the modules.
     old_state = old.state_dict()
     new_state = new.state_dict()
 
-    all_keys: Set[str] = set(old_state.keys()).union(set(new_state.keys()))
-
-    result: Dict[str, Tensor] = {}
-    for k in all_keys:
-        v_old = old_state.get(k)
+    # Group the tensors by device and dtype, since this is required by the
+    # `_foreach` functions.
+    groups: Dict[Tuple[torch.device, torch.dtype], Tuple[List[Tensor], List[Tensor]]] = {}
+    for k, v_old in old_state.items():
         v_new = new_state.get(k)
-
-        new_value: Tensor
-        if v_old is not None and v_new is not None:
-            new_value = old_frac * v_old + (1 - old_frac) * v_new
-        elif v_old is not None:
-            new_value = v_old
-        elif v_new is not None:
-            new_value = v_new
-        result[k] = new_value
-
-    missing, unexpected = old.load_state_dict(result, strict=False)
-    if missing:
-        logger.debug(f"Missing keys: {missing}")
-    if unexpected:
-        logger.debug(f"Unexpected keys: {unexpected}")
+        if v_new is None:
+            continue
+        if not v_old.is_floating_point():
+            v_old.copy_(v_new)
+            continue
+        old_tensors, new_tensors = groups.setdefault((v_old.device, v_old.dtype), ([], []))
+        old_tensors.append(v_old)
+        new_tensors.append(v_new.to(device=v_old.device, dtype=v_old.dtype))
+
+    for old_tensors, new_tensors in groups.values():
+        torch._foreach_mul_(old_tensors, old_frac)
+        torch._foreach_add_(old_tensors, new_tensors, alpha=1 - old_frac)
 
 
 class MixupTask(AuxiliaryTask):
@@ -0,0 +1,184 @@
+""" Batched version of the augmentations used by SimCLR, which runs on the device of
+the images.
+
+Applies the same augmentations as `SimCLRAugment` from the falr submodule (random
+resized crop, horizontal flip, colour jitter and random grayscale) to a whole batch of
+image tensors at once, with different random parameters for each image, rather than
+converting each image to PIL and augmenting them one at a time on the CPU.
+"""
+import math
+from typing import Tuple
+
+import torch
+from torch import Tensor, nn
+from torch.nn import functional as F
+
+
+class BatchedSimCLRAugment(nn.Module):
+    """ Creates `n_views` randomly augmented views of each image in a batch.
+
+    The images are expected to be float tensors with values in [0, 1], of shape
+    [B, C, H, W]. The output has shape [n_views * B, C, image_size, image_size], with
+    the views of each image next to each other, which is the order expected by
+    `SimCLRLoss`.
+    """
+
+    def __init__(
+        self,
+        image_size: int,
+        colour_distortion: float = 0.5,
+        n_views: int = 2,
+        scale: Tuple[float, float] = (0.08, 1.0),
+        ratio: Tuple[float, float] = (3 / 4, 4 / 3),
+        flip_p: float = 0.5,
+        colour_jitter_p: float = 0.8,
+        grayscale_p: float = 0.2,
+    ):
+        super().__init__()
+        self.image_size = image_size
+        self.n_views = n_views
+        self.scale = scale
+        self.log_ratio = (math.log(ratio[0]), math.log(ratio[1]))
+        self.flip_p = flip_p
+        s = colour_distortion
+        # Same as `ColorJitter(0.8 * s, 0.8 * s, 0.8 * s, 0.2 * s)`.
+        self.brightness = 0.8 * s
+        self.contrast = 0.8 * s
+        self.saturation = 0.8 * s
+        self.hue = 0.2 * s
+        self.colour_jitter_p = colour_jitter_p
+        self.grayscale_p = grayscale_p
+
+    def forward(self, x: Tensor) -> Tensor:
+        x = x.repeat_interleave(self.n_views, dim=0)
+        x = self.random_resized_crop_and_flip(x)
+        x = self.colour_jitter(x)
+        x = self.random_grayscale(x)
+        return x
+
+    def random_resized_crop_and_flip(self, x: Tensor) -> Tensor:
+        """ Crops a random region of each image, flips it horizontally with probability
+        `flip_p` and resizes it to `image_size`, all with a single `grid_sample`.
+        """
+        n, c, height, width = x.shape
+        area = _uniform(n, *self.scale, device=x.device)
+        aspect_ratio = torch.exp(_uniform(n, *self.log_ratio, device=x.device))
+        # Width and height of the crops, as a fraction of the width and height of the
+        # images.
+        # NOTE: Rather than sampling again like `RandomResizedCrop` when the crop doesn't
+        # fit in the image, we clip its width or height.
+        crop_w = torch.sqrt(area * aspect_ratio * height / width).clamp(max=1.0)
+        crop_h = torch.sqrt(area / aspect_ratio * width / height).clamp(max=1.0)
+        # Centers of the crops, in the normalized [-1, 1] coordinates of `grid_sample`.
+        center_x = (1 - crop_w) * _uniform(n, -1.0, 1.0, device=x.device)
+        center_y = (1 - crop_h) * _uniform(n, -1.0, 1.0, device=x.device)
+        flip = torch.rand(n, device=x.device) < self.flip_p
+
+        theta = torch.zeros(n, 2, 3, device=x.device, dtype=x.dtype)
+        theta[:, 0, 0] = torch.where(flip, -crop_w, crop_w)
+        theta[:, 0, 2] = center_x
+        theta[:, 1, 1] = crop_h
+        theta[:, 1, 2] = center_y
+        grid = F.affine_grid(
+            theta, [n, c, self.image_size, self.image_size], align_corners=False
+        )
+        return F.grid_sample(
+            x, grid, mode="bilinear", padding_mode="border", align_corners=False
+        )
+
+    def colour_jitter(self, x: Tensor) -> Tensor:
+        """ Randomly changes the brightness, contrast, saturation and hue of each image,
+        with probability `colour_jitter_p`.
+
+        NOTE: Like `ColorJitter`, the four adjustments are applied in a random order,
+        but that order is shared by all the images of the batch.
+        """
+        n = x.shape[0]
+        apply = torch.rand(n, device=x.device) < self.colour_jitter_p
+
+        def _factors(identity: float, low: float, high: float) -> Tensor:
+            factors = _uniform(n, low, high, device=x.device)
+            return torch.where(apply, factors, torch.full_like(factors, identity))
+
+        b, c, s = self.brightness, self.contrast, self.saturation
+        brightness = _factors(1.0, max(0.0, 1 - b), 1 + b)
+        contrast = _factors(1.0, max(0.0, 1 - c), 1 + c)
+        saturation = _factors(1.0, max(0.0, 1 - s), 1 + s)
+        hue = _factors(0.0, -self.hue, self.hue)
+
+        is_rgb = x.shape[1] == 3
+        for i in torch.randperm(4).tolist():
+            if i == 0 and b > 0:
+                x = (x * brightness[:, None, None, None]).clamp(0, 1)
+            elif i == 1 and c > 0:
+                mean = _grayscale(x).mean(dim=(-3, -2, -1), keepdim=True)
+                x = _blend(x, mean, contrast)
+            elif i == 2 and s > 0 and is_rgb:
+                x = _blend(x, _grayscale(x), saturation)
+            elif i == 3 and self.hue > 0 and is_rgb:
+                x = _adjust_hue(x, hue)
+        return x
+
+    def random_grayscale(self, x: Tensor) -> Tensor:
+        """ Converts each image to grayscale with probability `grayscale_p`. """
+        if x.shape[1] != 3 or self.grayscale_p <= 0:
+            return x
+        to_gray = torch.rand(x.shape[0], device=x.device) < self.grayscale_p
+        gray = _grayscale(x).expand_as(x)
+        return torch.where(to_gray[:, None, None, None], gray, x)
+
+
+def _uniform(n: int, low: float, high: float, device: torch.device) -> Tensor:
+    return torch.empty(n, device=device).uniform_(low, high)
+
+
+def _grayscale(x: Tensor) -> Tensor:
+    """ Returns the luminance of the images, with a single channel. """
+    if x.shape[-3] == 1:
+        return x
+    r, g, b = x.unbind(dim=-3)
+    return (0.299 * r + 0.587 * g + 0.114 * b).unsqueeze(-3)
+
+
+def _blend(x: Tensor, other: Tensor, factors: Tensor) -> Tensor:
+    factors = factors[:, None, None, None]
+    return (factors * x + (1 - factors) * other).clamp(0, 1)
+
+
+def _adjust_hue(x: Tensor, hue_shifts: Tensor) -> Tensor:
+    h, s, v = _rgb_to_hsv(x).unbind(dim=-3)
+    h = (h + hue_shifts[:, None, None]) % 1.0
+    return _hsv_to_rgb(torch.stack([h, s, v], dim=-3))
+
+
+def _rgb_to_hsv(x: Tensor) -> Tensor:
+    r, g, b = x.unbind(dim=-3)
+    max_c = x.max(dim=-3).values
+    min_c = x.min(dim=-3).values
+    delta = max_c - min_c
+    ones = torch.ones_like(delta)
+    s = delta / torch.where(max_c == 0, ones, max_c)
+    safe_delta = torch.where(delta == 0, ones, delta)
+    r_c = (max_c - r) / safe_delta
+    g_c = (max_c - g) / safe_delta
+    b_c = (max_c - b) / safe_delta
+    h = torch.where(
+        max_c == r, b_c - g_c, torch.where(max_c == g, 2.0 + r_c - b_c, 4.0 + g_c - r_c)
+    )
+    h = torch.where(delta == 0, torch.zeros_like(h), (h / 6.0) % 1.0)
+    return torch.stack([h, s, max_c], dim=-3)
+
+
+def _hsv_to_rgb(x: Tensor) -> Tensor:
+    h, s, v = x.unbind(dim=-3)
+    i = torch.floor(h * 6.0)
+    f = h * 6.0 - i
+    i = i.long().remainder(6).unsqueeze(-3)
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    # Values of each channel for each of the 6 sectors of the hue circle.
+    r = torch.stack([v, q, p, p, t, v], dim=-3).gather(-3, i)
+    g = torch.stack([t, v, v, q, p, p], dim=-3).gather(-3, i)
+    b = torch.stack([p, p, t, v, v, q], dim=-3).gather(-3, i)
+    return torch.cat([r, g, b], dim=-3)
@@ -0,0 +1,74 @@
+import colorsys
+
+import pytest
+import torch
+
+from .augment import BatchedSimCLRAugment, _hsv_to_rgb, _rgb_to_hsv
+
+
+def identity_augment(**kwargs) -> BatchedSimCLRAugment:
+    """ Returns an augmentation whose random parameters all leave the images as-is. """
+    options = dict(
+        image_size=16,
+        scale=(1.0, 1.0),
+        ratio=(1.0, 1.0),
+        flip_p=0.0,
+        colour_jitter_p=0.0,
+        grayscale_p=0.0,
+    )
+    options.update(kwargs)
+    return BatchedSimCLRAugment(**options)
+
+
+@pytest.mark.parametrize("channels", [1, 3])
+def test_output_shape_and_range(channels: int):
+    torch.manual_seed(123)
+    x = torch.rand(5, channels, 32, 28)
+    augment = BatchedSimCLRAugment(image_size=24, n_views=3)
+    views = augment(x)
+    assert views.shape == (15, channels, 24, 24)
+    assert views.dtype == x.dtype
+    assert 0 <= views.min() and views.max() <= 1
+
+
+def test_identity_parameters_return_the_input():
+    torch.manual_seed(123)
+    x = torch.rand(4, 3, 16, 16)
+    views = identity_augment(n_views=2)(x)
+    # The views of each image are next to each other.
+    assert torch.allclose(views[0::2], x, atol=1e-5)
+    assert torch.allclose(views[1::2], x, atol=1e-5)
+
+
+def test_flip():
+    torch.manual_seed(123)
+    x = torch.rand(4, 3, 16, 16)
+    views = identity_augment(n_views=1, flip_p=1.0)(x)
+    assert torch.allclose(views, x.flip(-1), atol=1e-5)
+
+
+def test_hsv_conversions_match_colorsys():
+    torch.manual_seed(123)
+    rgb = torch.rand(2, 3, 8, 8, dtype=torch.float64)
+    # Also check the pixels of each hue sector boundary, and the grays.
+    rgb[0, :, 0, :6] = torch.tensor(
+        [[1, 1, 0, 0, 0, 1], [0, 1, 1, 1, 0, 0], [0, 0, 0, 1, 1, 1]],
+        dtype=torch.float64,
+    )
+    rgb[1, :, 0, :3] = torch.tensor([0.0, 0.5, 1.0], dtype=torch.float64)
+
+    hsv = _rgb_to_hsv(rgb)
+    pixels = rgb.permute(0, 2, 3, 1).reshape(-1, 3).tolist()
+    expected_hsv = torch.tensor(
+        [colorsys.rgb_to_hsv(*pixel) for pixel in pixels], dtype=torch.float64
+    )
+    assert torch.allclose(hsv.permute(0, 2, 3, 1).reshape(-1, 3), expected_hsv)
+
+    hsv_pixels = expected_hsv.tolist()
+    expected_rgb = torch.tensor(
+        [colorsys.hsv_to_rgb(*pixel) for pixel in hsv_pixels], dtype=torch.float64
+    )
+    assert torch.allclose(
+        _hsv_to_rgb(hsv).permute(0, 2, 3, 1).reshape(-1, 3), expected_rgb
+    )
+    assert torch.allclose(_hsv_to_rgb(hsv), rgb)
@@ -9,16 +9,15 @@ from typing import ClassVar, Dict
 
 import torch
 from torch import Tensor
-from torchvision.transforms import Compose, Lambda, ToPILImage
 from simple_parsing import mutable_field
 from simple_parsing.helpers import Serializable
 
 from sequoia.common.loss import Loss
 from ..auxiliary_task import AuxiliaryTask
+from .augment import BatchedSimCLRAugment
 
 try:
     from .falr.config import HParams, ExperimentType
-    from .falr.data import SimCLRAugment
     from .falr.losses import SimCLRLoss
     from .falr.models import Projector
 except ImportError as e:
@@ -49,22 +48,20 @@ class SimCLRTask(AuxiliaryTask):
         self.hparams.double_augmentation = True
         self.hparams.repr_dim = AuxiliaryTask.hidden_size
 
-        self.augment = Compose([
-            ToPILImage(),
-            SimCLRAugment(self.hparams),
-            Lambda(lambda tup: torch.stack([tup[0], tup[1]]))
-        ])
+        # Creates two augmented views of each image in the batch, on its device.
+        self.augment = BatchedSimCLRAugment(
+            image_size=self.hparams.image_size,
+            colour_distortion=self.hparams.colour_distortion,
+            n_views=2,
+        )
         self.projector = Projector(self.hparams)
         self.i = 0
         self.loss = SimCLRLoss(self.hparams.proj_dim)
 
     def get_loss(self, forward_pass: Dict[str, Tensor], y: Tensor = None) -> Loss:
         x = forward_pass["x"]
-        # TODO: is there a more efficient way to do this than with a list
-        # comprehension? (torch multiprocessing-ish?)
-        # concat all the x's into a single list.
-        x_t = torch.cat([self.augment(x_i) for x_i in x.cpu()], dim=0)   # [2*B, C, H, W]
-        h_t = self.encode(x_t.to(self.device)).flatten(start_dim=1)  # [2*B, repr_dim]
+        x_t = self.augment(x.to(self.device))  # [2*B, C, H, W]
+        h_t = self.encode(x_t).flatten(start_dim=1)  # [2*B, repr_dim]
         z = self.projector(h_t)  # [2*B, proj_dim]
         loss = self.loss(z, self.hparams.xent_temp)
         loss_object = Loss(name=self.name, loss=loss)
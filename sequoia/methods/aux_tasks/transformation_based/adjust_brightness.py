@@ -7,7 +7,22 @@ from torchvision import transforms as T
 from torchvision.transforms import functional as TF
 
 from ..auxiliary_task import AuxiliaryTask
-from .bases import RegressTransformationTask, wrap_pil_transform
+from .bases import RegressTransformationTask
+
+
+def adjust_brightness(x: Tensor, brightness_factor: float) -> Tensor:
+    """Adjusts the brightness of a batch of images with values in the [0, 1] range.
+
+    Tensor equivalent of `TF.adjust_brightness` on PIL images, applied to the whole
+    batch at once, on the same device as `x`.
+
+    >>> import torch
+    >>> x = torch.Tensor([[[[0.0, 0.25], [0.5, 1.0]]]])
+    >>> adjust_brightness(x, 2.0)
+    tensor([[[[0.0000, 0.5000],
+              [1.0000, 1.0000]]]])
+    """
+    return (x * brightness_factor).clamp_(0, 1)
 
 
 class AdjustBrightnessTask(RegressTransformationTask):
@@ -24,7 +39,7 @@ class AdjustBrightnessTask(RegressTransformationTask):
                  name: str="adjust_brightness",
                  options: RegressTransformationTask.Options=None):
         super().__init__(
-            function=wrap_pil_transform(TF.adjust_brightness),
+            function=adjust_brightness,
             function_args=brightness_values,
             function_arg_range=(min_brightness, max_brightness),
             n_calls=n_calls,
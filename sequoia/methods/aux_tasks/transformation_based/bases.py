@@ -18,6 +18,11 @@ from ..auxiliary_task import AuxiliaryTask
 logger = get_logger(__file__)
 
 def wrap_pil_transform(function: Callable):
+    """ Wraps a transform on PIL images so it can be applied to a batch of tensors.
+
+    NOTE: This is slow, since each image is moved to the CPU and transformed
+    individually. Prefer using functions that operate on batched tensors directly.
+    """
     def _transform(img_x, arg):
         x = TF.to_pil_image(img_x.cpu())
         x = function(x, arg)
@@ -96,16 +101,13 @@ class TransformationBasedTask(AuxiliaryTask):
             )
 
     def get_loss(self, x: Tensor, h_x: Tensor, y_pred: Tensor=None, y: Tensor=None) -> Loss:
-        loss_info = Loss(self.name)
-        batch_size = x.shape[0]
         assert self.alphas is not None, "set the `self.alphas` attribute in the base class."
         assert self.function_args is not None, "set the `self.function_args` attribute in the base class."
 
         # Get the loss for each transformation argument.
-        for fn_arg, alpha in zip(self.function_args, self.alphas):
-            loss_i = self.get_loss_for_arg(x=x, h_x=h_x, fn_arg=fn_arg, alpha=alpha)
-            loss_info += loss_i
-            # print(f"{self.name}_{fn_arg}", loss_i.metrics)
+        loss_info = self.get_loss_for_args(
+            x=x, h_x=h_x, fn_args=self.function_args, alphas=self.alphas
+        )
 
         # Fuse all the sub-metrics into a total metric.
         # For instance, all the "rotate_0", "rotate_90", "rotate_180", etc.
@@ -116,36 +118,53 @@ class TransformationBasedTask(AuxiliaryTask):
         metrics[self.name] = total_metrics
         return loss_info
 
-    def get_loss_for_arg(self, x: Tensor, h_x: Tensor, fn_arg: Any, alpha: Tensor) -> Loss:
-        alpha = alpha.to(x.device)
+    def get_loss_for_args(self, x: Tensor, h_x: Tensor, fn_args: List[Any], alphas: Tensor) -> Loss:
+        """Gets the loss for all the transformation arguments at once.
+
+        The transformed views of `x` (one per argument) are concatenated into a
+        single batch, so that the encoder and the auxiliary layer are only called
+        once, rather than once per argument.
+        """
+        alphas = alphas.to(x.device)
+        batch_size = x.shape[0]
         # TODO: Transform before or after the `preprocess_inputs` function?
         x = fix_channels(x)
-        # Transform X using the function.
-        x_t = self.function(x, fn_arg)
-        # Get the code for the transformed x.
-        h_x_t = self.encode(x_t)
+        # Transform X using the function, once per argument.
+        x_ts: List[Tensor] = [self.function(x, fn_arg) for fn_arg in fn_args]
+        # Get the codes for all the transformed x's.
+        if all(x_t.shape == x_ts[0].shape for x_t in x_ts):
+            h_x_t = self.encode(torch.cat(x_ts))
+        else:
+            # NOTE: Can't concatenate the views when the function changes the shape of
+            # some of the inputs (e.g. when rotating a non-square image).
+            h_x_t = torch.cat([self.encode(x_t) for x_t in x_ts])
 
         aux_layer_input = h_x_t
         if self.options.compare_with_original:
+            h_x = h_x.repeat(len(fn_args), *[1 for _ in h_x.shape[1:]])
             aux_layer_input = torch.cat([h_x, h_x_t], dim=-1)
 
-        # Get the predicted argument of the transformation.
-        alpha_t = self.auxiliary_layer(aux_layer_input)
-        
-        # get the metrics for this particular argument (accuracy, mse, etc.)
-        if isinstance(fn_arg, int):
-            name = f"{fn_arg}"
-        else:
-            name = f"{fn_arg:.3f}"
-        loss = Loss(name)
-        loss.loss = self.loss(alpha_t, alpha)
-        loss.metrics[name] = get_metrics(x=x_t, h_x=h_x_t, y_pred=alpha_t, y=alpha)
-        
-        # Save some tensors for debugging purposes:
-        loss.tensors["x_t"] = x_t
-        loss.tensors["h_x_t"] = h_x_t
-        loss.tensors["alpha_t"] = alpha_t
-        return loss
+        # Get the predicted argument of the transformations.
+        alpha_ts = self.auxiliary_layer(aux_layer_input).split(batch_size)
+        h_x_ts = h_x_t.split(batch_size)
+
+        loss_info = Loss(self.name)
+        for fn_arg, alpha, x_t, h_x_t, alpha_t in zip(fn_args, alphas, x_ts, h_x_ts, alpha_ts):
+            # get the metrics for this particular argument (accuracy, mse, etc.)
+            if isinstance(fn_arg, int):
+                name = f"{fn_arg}"
+            else:
+                name = f"{fn_arg:.3f}"
+            loss = Loss(name)
+            loss.loss = self.loss(alpha_t, alpha)
+            loss.metrics[name] = get_metrics(x=x_t, h_x=h_x_t, y_pred=alpha_t, y=alpha)
+
+            # Save some tensors for debugging purposes:
+            loss.tensors["x_t"] = x_t
+            loss.tensors["h_x_t"] = h_x_t
+            loss.tensors["alpha_t"] = alpha_t
+            loss_info += loss
+        return loss_info
 
 
 class ClassifyTransformationTask(TransformationBasedTask):
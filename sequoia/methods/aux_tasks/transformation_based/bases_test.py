@@ -0,0 +1,107 @@
+from typing import Any, List, Tuple
+
+import pytest
+import torch
+from torch import Tensor, nn
+
+from sequoia.common.loss import Loss
+from sequoia.common.metrics import get_metrics
+from sequoia.utils.utils import fix_channels
+
+from ..auxiliary_task import AuxiliaryTask
+from .bases import TransformationBasedTask
+from .rotation import RotationTask
+
+
+def get_loss_for_each_arg(
+    task: TransformationBasedTask, x: Tensor, h_x: Tensor, fn_args: List[Any], alphas: Tensor
+) -> Loss:
+    """ Reference implementation: Encodes and evaluates each transformed view on its
+    own, like `get_loss_for_args` did before the views were concatenated.
+    """
+    x = fix_channels(x)
+    loss_info = Loss(task.name)
+    for fn_arg, alpha in zip(fn_args, alphas):
+        x_t = task.function(x, fn_arg)
+        h_x_t = task.encode(x_t)
+        aux_layer_input = h_x_t
+        if task.options.compare_with_original:
+            aux_layer_input = torch.cat([h_x, h_x_t], dim=-1)
+        alpha_t = task.auxiliary_layer(aux_layer_input)
+        name = f"{fn_arg}" if isinstance(fn_arg, int) else f"{fn_arg:.3f}"
+        loss = Loss(name)
+        loss.loss = task.loss(alpha_t, alpha)
+        loss.metrics[name] = get_metrics(x=x_t, h_x=h_x_t, y_pred=alpha_t, y=alpha)
+        loss_info += loss
+    return loss_info
+
+
+@pytest.fixture()
+def encoder(monkeypatch) -> nn.Module:
+    """ Sets a small encoder (with BatchNorm) as the encoder of the auxiliary tasks. """
+    torch.manual_seed(123)
+    encoder = nn.Sequential(
+        nn.Conv2d(3, 4, kernel_size=3, padding=1),
+        nn.BatchNorm2d(4),
+        nn.ReLU(),
+        nn.AdaptiveAvgPool2d(2),
+        nn.Flatten(),
+    )
+    # Give the BatchNorm some non-trivial running statistics.
+    with torch.no_grad():
+        encoder(torch.rand(16, 3, 8, 8))
+    encoder.eval()
+    monkeypatch.setattr(AuxiliaryTask, "encoder", encoder, raising=False)
+    monkeypatch.setattr(AuxiliaryTask, "hidden_size", 16)
+    return encoder
+
+
+@pytest.mark.parametrize("compare_with_original", [True, False])
+@pytest.mark.parametrize(
+    "input_shape",
+    [
+        (3, 8, 8),
+        # Rotating non-square images changes their shape, so the views can't be
+        # concatenated, and are encoded separately.
+        (3, 8, 12),
+    ],
+)
+def test_same_losses_and_metrics_as_per_view_loop(
+    encoder: nn.Module, input_shape: Tuple[int, ...], compare_with_original: bool
+):
+    task = RotationTask(
+        options=RotationTask.Options(compare_with_original=compare_with_original)
+    )
+    task.eval()
+    batch_size = 5
+    x = torch.rand(batch_size, *input_shape)
+    h_x = encoder(x)
+    alphas = task.labels.view(-1, 1).repeat(1, batch_size)
+
+    n_calls = 0
+
+    def _count_calls(*args):
+        nonlocal n_calls
+        n_calls += 1
+
+    handle = encoder.register_forward_hook(_count_calls)
+    with torch.no_grad():
+        loss = task.get_loss_for_args(x, h_x, fn_args=task.function_args, alphas=alphas)
+        handle.remove()
+        expected = get_loss_for_each_arg(
+            task, x, h_x, fn_args=task.function_args, alphas=alphas
+        )
+
+    square = input_shape[-1] == input_shape[-2]
+    assert n_calls == (1 if square else len(task.function_args))
+
+    assert torch.allclose(loss.loss, expected.loss, atol=1e-6)
+    assert loss.losses.keys() == expected.losses.keys()
+    for name, expected_loss in expected.losses.items():
+        loss_i = loss.losses[name]
+        assert torch.allclose(loss_i.loss, expected_loss.loss, atol=1e-6)
+        assert loss_i.metric.n_samples == expected_loss.metric.n_samples == batch_size
+        assert loss_i.metric.accuracy == expected_loss.metric.accuracy
+        assert (
+            loss_i.metric.confusion_matrix == expected_loss.metric.confusion_matrix
+        ).all()
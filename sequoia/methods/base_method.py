@@ -292,10 +292,12 @@ class BaseMethod(Method, Serializable, Parseable, target_setting=Setting):
             "Setting should have been called method.configure(setting=self) "
             "before calling `fit`!"
         )
-        # TODO: Figure out if there is a smarter way to reset the state of the Trainer,
-        # rather than just creating a new one every time.
-        self.trainer = self.create_trainer(self.setting)
-        
+        if self.trainer_options.reuse_trainer and isinstance(self.trainer, Trainer):
+            # Reuse the Trainer, only resetting the state from the previous task.
+            self.trainer.reset()
+        else:
+            self.trainer = self.create_trainer(self.setting)
+
         # NOTE: It doesn't seem sufficient to just do this, since for instance the
         # early-stopping callback would prevent training on future tasks, since they
         # have higher validation loss:
@@ -309,6 +311,42 @@ class BaseMethod(Method, Serializable, Parseable, target_setting=Setting):
 
         return success
 
+    def save_checkpoint(self, path: Path) -> None:
+        """Saves the weights of the model in the directory at `path`, including those
+        of the output heads created for each task.
+        """
+        torch.save(
+            {
+                "model": self.model.state_dict(),
+                "output_heads": list(self.model.output_heads.keys()),
+                "current_task": self.model.current_task,
+            },
+            path / "model.pt",
+        )
+
+    def load_checkpoint(self, path: Path) -> None:
+        """Restores the model saved with `save_checkpoint`, after `configure`.
+
+        The output heads of the tasks that were already trained on are created before
+        loading the weights, so that they can be loaded strictly.
+        """
+        state = torch.load(path / "model.pt", map_location=self.config.device)
+        for key in state["output_heads"]:
+            if key not in self.model.output_heads:
+                task_id = None if key == "None" else int(key)
+                output_head = self.model.create_output_head(task_id=task_id)
+                self.model.output_heads[key] = output_head.to(self.config.device)
+        current_task = state["current_task"]
+        if self.model.hp.multihead and str(current_task) in self.model.output_heads:
+            self.model.output_head = self.model.output_heads[str(current_task)]
+        missing_keys, unexpected_keys = self.model.load_state_dict(state["model"])
+        if missing_keys or unexpected_keys:
+            raise RuntimeError(
+                f"Unable to load the weights of the model: missing keys: "
+                f"{missing_keys}, unexpected keys: {unexpected_keys}"
+            )
+        self.model.current_task = current_task
+
     def get_actions(
         self, observations: Observations, action_space: gym.Space
     ) -> Actions:
@@ -1,4 +1,4 @@
-from typing import Type, ClassVar, Dict
+from typing import ClassVar, Dict, Optional, Type
 
 import numpy as np
 import pytest
@@ -145,3 +145,54 @@ def test_weird_pl_bug():
     assert replica_device is not None
 
 BaseMethodTests = TestBaseMethod
+
+
+@pytest.mark.timeout(300)
+def test_resume_from_checkpoint_with_output_heads(tmp_path, monkeypatch):
+    """ A multi-head BaseMethod resumes with the output heads of the tasks it was
+    trained on before being interrupted, and with the same weights.
+    """
+    from sequoia.settings.rl import TaskIncrementalRLSetting
+
+    def make_setting() -> TaskIncrementalRLSetting:
+        return TaskIncrementalRLSetting(
+            dataset="cartpole", nb_tasks=3, train_max_steps=300, test_max_steps=300
+        )
+
+    def make_method() -> BaseMethod:
+        return BaseMethod(
+            trainer_options=TrainerConfig(max_epochs=1, default_root_dir=tmp_path)
+        )
+
+    config = Config(debug=True, seed=123, checkpoint_dir=tmp_path / "checkpoints")
+    fit = BaseMethod.fit
+    state_when_fit_is_called: Dict[int, Dict[str, torch.Tensor]] = {}
+    interrupt_on_task: Optional[int] = 2
+
+    def interrupted_fit(self: BaseMethod, train_env, valid_env):
+        task_id = self.model.current_task
+        state_when_fit_is_called[task_id] = {
+            k: v.clone() for k, v in self.model.state_dict().items()
+        }
+        if task_id == interrupt_on_task:
+            raise RuntimeError("Interrupted!")
+        return fit(self, train_env, valid_env)
+
+    monkeypatch.setattr(BaseMethod, "fit", interrupted_fit)
+    method = make_method()
+    with pytest.raises(RuntimeError, match="Interrupted!"):
+        make_setting().apply(method, config=config)
+    assert {"0", "1", "2"} <= set(method.model.output_heads.keys())
+    interrupted_state = state_when_fit_is_called.pop(2)
+    state_when_fit_is_called.clear()
+
+    interrupt_on_task = None
+    method = make_method()
+    make_setting().apply(method, config=config)
+    # Only the last task was trained on, starting from the weights of the model
+    # (including all the output heads) after the second task.
+    assert list(state_when_fit_is_called) == [2]
+    resumed_state = state_when_fit_is_called[2]
+    assert resumed_state.keys() == interrupted_state.keys()
+    for key, value in interrupted_state.items():
+        assert torch.equal(resumed_state[key], value), key
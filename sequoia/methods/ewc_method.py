@@ -8,6 +8,7 @@ the `sequoia.methods.aux_tasks.ewc.EwcTask`.
 """
 import warnings
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Optional
 
 from gym.utils import colorize
@@ -88,6 +89,13 @@ class EwcMethod(BaseMethod, target_setting=IncrementalAssumption):
     def on_task_switch(self, task_id: Optional[int]):
         super().on_task_switch(task_id)
 
+    def save_checkpoint(self, path: Path) -> None:
+        # NOTE: The state of the EWC task (the weights and the fisher information
+        # matrices of the previous tasks) isn't part of the model's state dict.
+        raise NotImplementedError(
+            "Can't save the state of the EWC auxiliary task in a checkpoint yet."
+        )
+
     def create_model(self, setting: Setting) -> EwcModel:
         """Create the Model to use for the given Setting.
 
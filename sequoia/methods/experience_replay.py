@@ -5,6 +5,7 @@ the Replay.
 """
 from collections.abc import Iterable
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Optional, Tuple, Dict, Type, Any, List
 from argparse import ArgumentParser, Namespace
 
@@ -194,6 +195,33 @@ class ExperienceReplayMethod(Method, target_setting=ClassIncrementalSetting):
         if self.training:
             self.task = task_id
 
+    def save_checkpoint(self, path: Path) -> None:
+        """ Saves the network, the optimizer, the replay buffer and the state of the
+        random number generator in the directory at `path`.
+        """
+        state = {
+            "net": self.net.state_dict(),
+            "optim": self.optim.state_dict(),
+            "task": self.task,
+            "rng": self.rng.bit_generator.state,
+        }
+        if self.buffer:
+            state["buffer"] = self.buffer.state_dict()
+            state["buffer_counters"] = self.buffer.get_counters()
+        torch.save(state, path / "method.pt")
+
+    def load_checkpoint(self, path: Path) -> None:
+        """ Restores the state saved with `save_checkpoint`, after `configure`. """
+        state = torch.load(path / "method.pt", map_location=self.device)
+        self.net.load_state_dict(state["net"])
+        self.optim.load_state_dict(state["optim"])
+        self.task = state["task"]
+        # NOTE: The buffer shares this generator, so this also restores its state.
+        self.rng.bit_generator.state = state["rng"]
+        if self.buffer:
+            self.buffer.load_state_dict(state["buffer"])
+            self.buffer.set_counters(state["buffer_counters"])
+
     @classmethod
     def add_argparse_args(cls, parser: ArgumentParser, dest: str = "") -> None:
         """Add the command-line arguments for this Method to the given parser.
@@ -332,6 +360,22 @@ class Buffer(nn.Module):
         self.arange_like = lambda x: torch.arange(x.size(0)).to(x.device)
         self.shuffle = lambda x: x[torch.randperm(x.size(0))]
 
+    def get_counters(self) -> Dict[str, int]:
+        """ Returns the number of items in the buffer and the number of items seen so
+        far, which aren't part of the `state_dict`.
+        """
+        return {
+            "current_index": self.current_index,
+            "n_seen_so_far": self.n_seen_so_far,
+            "is_full": self.is_full,
+        }
+
+    def set_counters(self, counters: Dict[str, int]) -> None:
+        """ Restores the counters returned by `get_counters`. """
+        self.current_index = counters["current_index"]
+        self.n_seen_so_far = counters["n_seen_so_far"]
+        self.is_full = counters["is_full"]
+
     @property
     def x(self):
         return self.bx[: self.current_index]
@@ -1,5 +1,6 @@
 from sequoia.settings.sl import ClassIncrementalSetting, TaskIncrementalSLSetting
 import pytest
+import torch
 from .experience_replay import ExperienceReplayMethod
 from sequoia.common.config import Config
 from sequoia.methods import Method
@@ -45,3 +46,41 @@ class TestExperienceReplay(MethodTests):
         assert 0.70 <= results.final_performance_metrics[4].objective
 
         assert 0.80 <= results.average_final_performance.objective
+
+
+def test_checkpoint_restores_the_buffer(tmp_path):
+    """ The replay buffer (its contents, counters and random number generator) is
+    restored along with the network and the optimizer.
+    """
+    setting = ClassIncrementalSetting(dataset="mnist")
+
+    method = ExperienceReplayMethod(buffer_capacity=20)
+    method.configure(setting)
+    for task_id in range(2):
+        method.buffer.add_reservoir(
+            {
+                "x": torch.rand(16, *method.buffer.bx.shape[1:]),
+                "y": torch.randint(10, [16]),
+                "t": task_id,
+            }
+        )
+    loss = method.net(torch.rand(4, 3, 28, 28)).sum()
+    loss.backward()
+    method.optim.step()
+    method.task = 1
+    method.save_checkpoint(tmp_path)
+
+    resumed = ExperienceReplayMethod(buffer_capacity=20)
+    resumed.configure(setting)
+    resumed.load_checkpoint(tmp_path)
+
+    assert resumed.task == 1
+    assert resumed.buffer.current_index == method.buffer.current_index == 20
+    assert resumed.buffer.n_seen_so_far == method.buffer.n_seen_so_far
+    for name, value in method.net.state_dict().items():
+        assert torch.equal(resumed.net.state_dict()[name], value)
+    assert resumed.optim.state_dict()["state"].keys() == method.optim.state_dict()["state"].keys()
+    samples = method.buffer.sample(8)
+    resumed_samples = resumed.buffer.sample(8)
+    for key, value in samples.items():
+        assert torch.equal(resumed_samples[key], value)
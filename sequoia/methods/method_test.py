@@ -292,3 +292,39 @@ def test_is_applicable_also_works_on_instances():
     assert not MethodA().is_applicable(SettingB)
     assert not MethodA.is_applicable(SettingB())
     assert not MethodA().is_applicable(SettingB())
+
+
+def test_builtin_method_names_match_the_methods():
+    """ The names in the registry of `sequoia.methods` are the full names of the
+    Methods they point to.
+    """
+    from sequoia.methods import _builtin_methods, get_method
+
+    for name in _builtin_methods:
+        try:
+            method = get_method(name)
+        except ImportError:
+            continue
+        assert method.get_full_name() == name
+
+
+def test_methods_are_imported_lazily():
+    """ Importing `sequoia.methods` doesn't import the modules of the Methods. """
+    import subprocess
+    import sys
+
+    method_modules = [
+        "sequoia.methods.base_method",
+        "sequoia.methods.pnn",
+        "sequoia.methods.hat",
+        "sequoia.methods.avalanche",
+        "sequoia.methods.stable_baselines3_methods",
+    ]
+    code = (
+        "import sys; import sequoia.methods; "
+        f"print([m for m in {method_modules} if m in sys.modules])"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip().splitlines()[-1] == "[]"
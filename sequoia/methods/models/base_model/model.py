@@ -3,6 +3,7 @@
 This model is basically just an encoder and an output head. Both of these can be
 switched out/customized as needed.
 """
+from collections import defaultdict
 from dataclasses import dataclass
 from typing import (
     Any,
@@ -17,6 +18,7 @@ from typing import (
     Union,
 )
 import dataclasses
+from pathlib import Path
 
 import gym
 import numpy as np
@@ -47,6 +49,7 @@ from simple_parsing.helpers.serialization import register_decoding_fn
 from torch import Tensor, nn, optim
 from torch.optim.optimizer import Optimizer  # type: ignore
 
+from ..cached_encoder import CachedEncoder
 from ..fcnet import FCNet
 from ..forward_pass import ForwardPass
 from ..output_heads import (
@@ -139,6 +142,16 @@ class Model(LightningModule, Generic[SettingType]):
         train_from_scratch: bool = False
         # Wether we should keep the weights of the pretrained encoder frozen.
         freeze_pretrained_encoder_weights: bool = False
+        # Cache the outputs of the frozen pretrained encoder, so that it only gets run
+        # once on each input, rather than at every epoch. Only used when
+        # `freeze_pretrained_encoder_weights` is set.
+        cache_encoder_features: bool = False
+        # Directory where the cached encoder features are stored in memory-mapped
+        # files, and re-used across runs. When unset, they are kept in memory.
+        encoder_features_cache_dir: Optional[Path] = None
+        # Maximum number of samples whose features are cached. The oldest samples are
+        # evicted first once the cache is full. No limit when unset.
+        encoder_features_cache_size: Optional[int] = 100_000
 
         # Settings for the output head.
         # TODO: This could be overwritten in a subclass to do classification or
@@ -165,6 +178,11 @@ class Model(LightningModule, Generic[SettingType]):
             default=EpisodicA2C,
         )
 
+        # Number of steps over which the losses and metrics are accumulated (on the
+        # device) before being logged. Any accumulated values are also logged at the
+        # end of each epoch.
+        log_every_n_steps: int = 10
+
     def __init__(self, setting: SettingType, hparams: HParams, config: Config):
         super().__init__()
         self.setting: SettingType = setting
@@ -186,6 +204,9 @@ class Model(LightningModule, Generic[SettingType]):
         self.reward_shape = self.reward_space.shape
 
         self.config: Config = config
+        # Detached losses from the last steps of each phase that haven't been logged
+        # yet. See `shared_step_end` and `log_accumulated_losses`.
+        self._unlogged_losses: Dict[str, List[Loss]] = defaultdict(list)
         # NOTE: do NOT set the `datamodule` property, otherwise the trainer will ignore
         # the passed train/val/test dataloader from the Setting.
         # self.datamodule: LightningDataModule = setting
@@ -254,12 +275,34 @@ class Model(LightningModule, Generic[SettingType]):
         # 1. Instantiate the model (with pretrained weights if desired)
         # 2. Infer the output size of the model
         # 3. Remove the output fully-connected layer, if present.
+        cache_features = (
+            self.hp.cache_encoder_features
+            and self.hp.freeze_pretrained_encoder_weights
+            and not self.hp.train_from_scratch
+        )
+        if self.hp.cache_encoder_features and not cache_features:
+            logger.warning(
+                "Can only cache the features of a frozen pretrained encoder, ignoring "
+                "`cache_encoder_features`."
+            )
         encoder, hidden_size = get_pretrained_encoder(
             encoder_model=encoder_type,
             pretrained=not self.hp.train_from_scratch,
             freeze_pretrained_weights=self.hp.freeze_pretrained_encoder_weights,
-            new_hidden_size=self.hp.new_hidden_size,
+            # NOTE: The new (trainable) layer is added after the cached encoder.
+            new_hidden_size=None if cache_features else self.hp.new_hidden_size,
         )
+        if cache_features:
+            encoder = CachedEncoder(
+                encoder,
+                cache_dir=self.hp.encoder_features_cache_dir,
+                max_cached_samples=self.hp.encoder_features_cache_size,
+            )
+            if self.hp.new_hidden_size is not None:
+                encoder = nn.Sequential(
+                    encoder, nn.Linear(hidden_size, self.hp.new_hidden_size)
+                )
+                hidden_size = self.hp.new_hidden_size
         return encoder, hidden_size
 
     def forward(self, observations: IncrementalAssumption.Observations) -> ForwardPass:
@@ -580,9 +623,31 @@ class Model(LightningModule, Generic[SettingType]):
         # Now that we have the rewards, we calculate the loss.
 
         loss: Loss = self.get_loss(forward_pass, rewards, loss_name=phase)
-        loss_tensor: Tensor = loss.loss
-        if loss_tensor == 0.:
-            return loss
+        # NOTE: Logging isn't done at every step: The (detached) losses are kept on the
+        # device, and only get merged and logged every `log_every_n_steps` steps (or
+        # at the end of the epoch). This avoids a device-to-host sync at every step,
+        # as well as creating the log dicts from the whole Loss tree each time.
+        # NOTE: Losses where `loss.loss` isn't a tensor are 'empty' (e.g. in RL when
+        # no episode has ended yet), and don't need to be logged.
+        if isinstance(loss.loss, Tensor):
+            unlogged_losses = self._unlogged_losses[phase]
+            unlogged_losses.append(loss.detach())
+            if len(unlogged_losses) >= self.hp.log_every_n_steps:
+                self.log_accumulated_losses(phase)
+        return loss
+
+    def log_accumulated_losses(self, phase: str) -> None:
+        """ Merges the losses accumulated for the given phase, and logs the result.
+
+        The loss tensors are averaged over the accumulated steps, while the metrics
+        are summed (e.g. the confusion matrices of the `ClassificationMetrics`).
+        """
+        unlogged_losses = self._unlogged_losses.pop(phase, None)
+        if not unlogged_losses:
+            return
+        loss: Loss = sum(unlogged_losses[1:], unlogged_losses[0])
+        loss = loss / len(unlogged_losses)
+
         loss_pbar_dict = loss.to_pbar_message()
         for key, value in loss_pbar_dict.items():
             assert not isinstance(value, dict), "shouldn't be nested at this point!"
@@ -593,7 +658,15 @@ class Model(LightningModule, Generic[SettingType]):
         for key, value in loss_log_dict.items():
             assert not isinstance(value, dict), "shouldn't be nested at this point!"
             self.log(key, value, prog_bar=False, logger=True)
-        return loss
+
+    def on_epoch_end(self) -> None:
+        """ Logs any losses that were accumulated and not yet logged.
+
+        NOTE: This hook is called at the end of the train, val and test epochs.
+        """
+        super().on_epoch_end()
+        for phase in list(self._unlogged_losses.keys()):
+            self.log_accumulated_losses(phase)
 
     def split_batch(self, batch: Any) -> Tuple[Observations, Optional[Rewards]]:
         """ Splits the batch into the observations and the rewards.
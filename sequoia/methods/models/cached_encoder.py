@@ -0,0 +1,272 @@
+""" Wrapper around a frozen encoder which caches its outputs.
+
+When the weights of the (pretrained) encoder are frozen, its output for a given input
+never changes, so there is no need to re-encode the same samples at every epoch, or
+every time the test data is evaluated. The `CachedEncoder` only runs the encoder on
+the inputs it hasn't seen before, and reads the features of the other inputs from a
+cache, so the cost of an epoch becomes the cost of the layers after the encoder.
+
+The cache is keyed on the *contents* of the inputs (after the transforms) and on the
+weights of the encoder: changing the dataset, the transforms or the encoder therefore
+invalidates the cache automatically. Note that inputs with random augmentations will
+(almost) never be found in the cache, which is why the number of cached samples can be
+bounded with `max_cached_samples`.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import torch
+from torch import Tensor, nn
+
+from sequoia.utils.logging_utils import get_logger
+
+logger = get_logger(__file__)
+
+
+class CachedEncoder(nn.Module):
+    """ Wraps a frozen encoder and caches its outputs.
+
+    The features are kept in memory, or in memory-mapped files in a sub-directory of
+    `cache_dir` (named after the fingerprint of the encoder) when `cache_dir` is set,
+    in which case they are also re-used across runs.
+
+    When `max_cached_samples` is set, the cache holds at most that many samples, and
+    the oldest samples are evicted first (FIFO) to make room for the new ones.
+
+    The wrapped encoder is always kept in evaluation mode, since its outputs
+    couldn't be cached if they depended on the statistics of each batch (e.g. with
+    BatchNorm layers in training mode).
+    """
+
+    def __init__(
+        self,
+        encoder: nn.Module,
+        cache_dir: Union[str, Path] = None,
+        max_cached_samples: Optional[int] = None,
+    ):
+        super().__init__()
+        trainable_params = [
+            name for name, param in encoder.named_parameters() if param.requires_grad
+        ]
+        if trainable_params:
+            raise ValueError(
+                f"Can only cache the outputs of a frozen encoder, but some of the "
+                f"parameters of the encoder are trainable: {trainable_params}"
+            )
+        if max_cached_samples is not None and max_cached_samples <= 0:
+            raise ValueError(
+                f"`max_cached_samples` should be positive, got {max_cached_samples}"
+            )
+        self.encoder = encoder.eval()
+        self.cache_dir: Optional[Path] = Path(cache_dir) if cache_dir else None
+        self.max_cached_samples = max_cached_samples
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._store: Optional[_FeatureStore] = None
+        # Versions of the parameters and buffers of the encoder when the store was
+        # created. These are incremented whenever a tensor is modified in-place (e.g.
+        # in `load_state_dict`), and are cheaper to check than the weights themselves.
+        self._tensor_versions: Optional[List[Tuple[int, int]]] = None
+
+    def train(self, mode: bool = True) -> "CachedEncoder":
+        super().train(mode)
+        self.encoder.eval()
+        return self
+
+    def forward(self, x: Tensor) -> Tensor:
+        store = self._get_store()
+        keys = _sample_keys(x)
+        rows = [store.index.get(key, -1) for key in keys]
+
+        # Indices of the first occurence of each input that isn't in the cache.
+        missing: Dict[bytes, int] = {}
+        for i, (key, row) in enumerate(zip(keys, rows)):
+            if row == -1 and key not in missing:
+                missing[key] = i
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+
+        if not missing:
+            features = store.get(rows)
+        else:
+            with torch.no_grad():
+                new_features = self.encoder(x[list(missing.values())])
+            if isinstance(new_features, list) and len(new_features) == 1:
+                new_features = new_features[0]
+            new_features = new_features.detach().cpu().numpy()
+
+            features = np.empty(
+                (len(keys), *new_features.shape[1:]), dtype=new_features.dtype
+            )
+            hit_indices = [i for i, row in enumerate(rows) if row != -1]
+            miss_indices = [i for i, row in enumerate(rows) if row == -1]
+            # NOTE: The cached features have to be read before adding the new ones,
+            # since this can evict some of them.
+            if hit_indices:
+                features[hit_indices] = store.get([rows[i] for i in hit_indices])
+            new_feature_indices = {key: j for j, key in enumerate(missing)}
+            features[miss_indices] = new_features[
+                [new_feature_indices[keys[i]] for i in miss_indices]
+            ]
+            store.add(list(missing), new_features)
+
+        return torch.from_numpy(features).to(device=x.device, dtype=x.dtype)
+
+    def _get_store(self) -> "_FeatureStore":
+        tensor_versions = [
+            (id(t), t._version)
+            for t in list(self.encoder.parameters()) + list(self.encoder.buffers())
+        ]
+        if self._store is None or tensor_versions != self._tensor_versions:
+            if self._store is not None:
+                logger.info("The weights of the encoder changed, discarding the cache.")
+            self._tensor_versions = tensor_versions
+            fingerprint = encoder_fingerprint(self.encoder)
+            directory = self.cache_dir / fingerprint if self.cache_dir else None
+            self._store = _FeatureStore(
+                directory=directory, max_size=self.max_cached_samples
+            )
+        return self._store
+
+
+def encoder_fingerprint(encoder: nn.Module) -> str:
+    """ Returns a hash of the type and of the weights of the encoder. """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(type(encoder).__qualname__.encode())
+    for name, tensor in encoder.state_dict().items():
+        digest.update(f"{name}:{tuple(tensor.shape)}:{tensor.dtype}".encode())
+        digest.update(tensor.detach().cpu().contiguous().numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _sample_keys(x: Tensor) -> List[bytes]:
+    """ Returns the hash of the contents of each sample of the batch `x`. """
+    array = np.ascontiguousarray(x.detach().cpu().numpy())
+    header = f"{array.shape[1:]}:{array.dtype}".encode()
+    keys: List[bytes] = []
+    for sample in array:
+        digest = hashlib.blake2b(header, digest_size=16)
+        digest.update(sample)
+        keys.append(digest.digest())
+    return keys
+
+
+class _FeatureStore:
+    """ Growable array of features, with an index from sample keys to rows.
+
+    When `directory` is set, the keys and features are stored in `.npy` files in
+    that directory, and the features already present are loaded when created.
+
+    When `max_size` is set, the array stops growing once it holds `max_size` samples,
+    and the rows of the oldest samples are then re-used for the new ones.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, max_size: Optional[int] = None):
+        self.directory = directory
+        self.max_size = max_size
+        self.index: Dict[bytes, int] = {}
+        self.size: int = 0
+        # Row of the oldest sample, which is the next one to be evicted once full.
+        self.oldest: int = 0
+        self.features: Optional[np.ndarray] = None
+        self.keys: Optional[np.ndarray] = None
+        if directory and (directory / "meta.json").exists():
+            self._load()
+
+    def get(self, rows: List[int]) -> np.ndarray:
+        return self.features[rows]
+
+    def add(self, keys: List[bytes], features: np.ndarray) -> List[int]:
+        """ Adds the features of the given samples, and returns their rows.
+
+        When the store is full, the oldest samples are evicted to make room for the
+        new ones.
+        """
+        if self.max_size is not None and len(keys) > self.max_size:
+            # Only the last samples fit in the store.
+            keys, features = keys[-self.max_size :], features[-self.max_size :]
+        n = len(keys)
+        n_appended = n
+        if self.max_size is not None:
+            n_appended = min(n, max(self.max_size - self.size, 0))
+
+        if n_appended:
+            capacity = self.size + n_appended
+            if self.features is None:
+                capacity = max(capacity, 1024)
+            elif capacity > len(self.features):
+                capacity = max(capacity, 2 * len(self.features))
+            if self.max_size is not None:
+                capacity = min(capacity, self.max_size)
+            if self.features is None or capacity > len(self.features):
+                self._allocate(capacity, features.shape[1:], features.dtype)
+        rows = list(range(self.size, self.size + n_appended))
+        self.size += n_appended
+
+        n_evicted = n - n_appended
+        if n_evicted:
+            evicted_rows = [(self.oldest + i) % self.size for i in range(n_evicted)]
+            for row in evicted_rows:
+                del self.index[self.keys[row].tobytes()]
+            self.oldest = (self.oldest + n_evicted) % self.size
+            rows.extend(evicted_rows)
+
+        self.features[rows] = features
+        self.keys[rows] = np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(n, -1)
+        self.index.update(zip(keys, rows))
+        if self.directory:
+            self._save_meta()
+        return rows
+
+    def _allocate(self, capacity: int, shape: Tuple[int, ...], dtype: np.dtype) -> None:
+        """ Creates (or grows) the arrays, so they can hold `capacity` samples. """
+        old_features, old_keys = self.features, self.keys
+        self.features = self._create_array("features", (capacity, *shape), dtype)
+        self.keys = self._create_array("keys", (capacity, 16), np.uint8)
+        if old_features is not None:
+            self.features[: self.size] = old_features[: self.size]
+            self.keys[: self.size] = old_keys[: self.size]
+
+    def _create_array(
+        self, name: str, shape: Tuple[int, ...], dtype: np.dtype
+    ) -> np.ndarray:
+        if not self.directory:
+            return np.empty(shape, dtype=dtype)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # NOTE: Creating a new file rather than overwriting the one being copied from.
+        path = self.directory / f"{name}_{shape[0]}.npy"
+        return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+
+    def _save_meta(self) -> None:
+        self.features.flush()
+        self.keys.flush()
+        meta = {
+            "size": self.size,
+            "capacity": len(self.features),
+            "oldest": self.oldest,
+        }
+        with open(self.directory / "meta.json", "w") as f:
+            json.dump(meta, f)
+        # Remove the files of the smaller arrays that were copied into the new ones.
+        for path in self.directory.glob("*.npy"):
+            if not path.stem.endswith(f"_{meta['capacity']}"):
+                path.unlink()
+
+    def _load(self) -> None:
+        with open(self.directory / "meta.json") as f:
+            meta = json.load(f)
+        capacity = meta["capacity"]
+        self.features = np.load(self.directory / f"features_{capacity}.npy", mmap_mode="r+")
+        self.keys = np.load(self.directory / f"keys_{capacity}.npy", mmap_mode="r+")
+        self.size = meta["size"]
+        self.oldest = meta.get("oldest", 0)
+        self.index = {
+            key.tobytes(): row for row, key in enumerate(self.keys[: self.size])
+        }
+        logger.info(
+            f"Loaded the cached features of {self.size} samples from {self.directory}"
+        )
@@ -0,0 +1,98 @@
+from pathlib import Path
+
+import pytest
+import torch
+from torch import nn
+
+from .cached_encoder import CachedEncoder
+
+
+def frozen_encoder(seed: int = 123) -> nn.Module:
+    torch.manual_seed(seed)
+    encoder = nn.Sequential(
+        nn.Conv2d(3, 4, kernel_size=3),
+        nn.BatchNorm2d(4),
+        nn.ReLU(),
+        nn.AdaptiveAvgPool2d(1),
+        nn.Flatten(),
+    )
+    for param in encoder.parameters():
+        param.requires_grad = False
+    return encoder
+
+
+@pytest.mark.parametrize("on_disk", [False, True])
+def test_same_outputs_as_encoder(tmp_path: Path, on_disk: bool):
+    encoder = frozen_encoder().eval()
+    cached_encoder = CachedEncoder(frozen_encoder(), cache_dir=tmp_path if on_disk else None)
+    cached_encoder.train()
+    x = torch.rand(2000, 3, 8, 8)
+
+    for epoch in range(2):
+        for batch in x.split(32):
+            assert torch.allclose(cached_encoder(batch), encoder(batch), atol=1e-6)
+    assert cached_encoder.misses == len(x)
+    assert cached_encoder.hits == len(x)
+
+    # Duplicates within a batch are only encoded once.
+    y = torch.rand(1, 3, 8, 8).expand(4, 3, 8, 8)
+    assert torch.allclose(cached_encoder(y), encoder(y), atol=1e-6)
+    assert cached_encoder.misses == len(x) + 1
+
+
+def test_reused_across_runs(tmp_path: Path):
+    x = torch.rand(10, 3, 8, 8)
+    first = CachedEncoder(frozen_encoder(), cache_dir=tmp_path)
+    expected = first(x)
+
+    second = CachedEncoder(frozen_encoder(), cache_dir=tmp_path)
+    assert torch.allclose(second(x), expected)
+    assert second.hits == len(x) and second.misses == 0
+
+    # A different encoder doesn't use the same cache.
+    third = CachedEncoder(frozen_encoder(seed=456), cache_dir=tmp_path)
+    third(x)
+    assert third.misses == len(x)
+
+
+def test_cache_is_invalidated_when_weights_change():
+    cached_encoder = CachedEncoder(frozen_encoder())
+    x = torch.rand(10, 3, 8, 8)
+    cached_encoder(x)
+    cached_encoder.encoder.load_state_dict(frozen_encoder(seed=456).state_dict())
+    assert torch.allclose(cached_encoder(x), frozen_encoder(seed=456).eval()(x))
+    assert cached_encoder.misses == 2 * len(x)
+
+
+def test_trainable_encoder_raises_error():
+    with pytest.raises(ValueError):
+        CachedEncoder(nn.Linear(4, 4))
+
+
+@pytest.mark.parametrize("on_disk", [False, True])
+def test_max_cached_samples(tmp_path: Path, on_disk: bool):
+    encoder = frozen_encoder().eval()
+    cached_encoder = CachedEncoder(
+        frozen_encoder(), cache_dir=tmp_path if on_disk else None, max_cached_samples=50
+    )
+    x = torch.rand(120, 3, 8, 8)
+    for batch in x.split(32):
+        assert torch.allclose(cached_encoder(batch), encoder(batch), atol=1e-6)
+    store = cached_encoder._store
+    assert store.size == len(store.index) == 50
+    assert len(store.features) == 50
+
+    # Only the last samples are still in the cache.
+    misses = cached_encoder.misses
+    assert torch.allclose(cached_encoder(x[-50:]), encoder(x[-50:]), atol=1e-6)
+    assert cached_encoder.misses == misses
+    # The first ones were evicted. Batches with both hits and evicted samples still
+    # give the right outputs.
+    assert torch.allclose(cached_encoder(x[-60:]), encoder(x[-60:]), atol=1e-6)
+    assert cached_encoder.misses == misses + 10
+    assert store.size == len(store.index) == 50
+
+    # Batches larger than the cache are also encoded correctly.
+    y = torch.rand(80, 3, 8, 8)
+    assert torch.allclose(cached_encoder(y), encoder(y), atol=1e-6)
+    assert store.size == len(store.index) == 50
@@ -4,7 +4,7 @@ the end of the episode, rather than at each step.
 
 from collections import deque
 from dataclasses import dataclass
-from typing import ClassVar, Deque, List, Optional
+from typing import ClassVar, Deque, Dict, List, Optional, Tuple
 
 import gym
 import numpy as np
@@ -22,7 +22,8 @@ from sequoia.settings import ContinualRLSetting
 from sequoia.settings.base import Rewards
 from sequoia.utils import get_logger
 from sequoia.utils.generic_functions import detach, get_slice, set_slice, stack
-from .policy_head import Categorical, PolicyHead, PolicyHeadOutput, normalize
+from .policy_head import (Categorical, PolicyHead, PolicyHeadOutput,
+                          bootstrapped_returns, normalize)
 
 logger = get_logger(__file__)
 
@@ -35,13 +36,15 @@ class A2CHeadOutput(PolicyHeadOutput):
     value: Tensor
 
 class EpisodicA2C(PolicyHead):
-    """ Advantage-Actor-Critic output head that produces a loss only at end of
-    episode.
-    
-    TODO: This could actually produce a loss every N steps, rather than just at
-    the end of the episode.
+    """ Advantage-Actor-Critic output head that produces a loss at the end of
+    episodes.
+
+    When `max_steps_between_updates` is set, the in-progress episodes also produce a
+    loss every `max_steps_between_updates` steps, by bootstrapping the returns from
+    the critic's value at the cut point (n-step returns).
     """
     name: ClassVar[str] = "episodic_a2c"
+    supports_bootstrap: ClassVar[bool] = True
 
     @dataclass
     class HParams(PolicyHead.HParams):
@@ -87,6 +90,9 @@ class EpisodicA2C(PolicyHead):
         self._current_state: Optional[Tensor] = None
         self._previous_state: Optional[Tensor] = None
         self._step = 0
+        # Sum of rewards and number of steps of the truncated rollouts of the current
+        # episode in each env, used to report the metrics of the full episode.
+        self._truncated_rollouts: Dict[int, Tuple[float, int]] = {}
 
     @property
     def actor(self) -> nn.Module:
@@ -119,20 +125,27 @@ class EpisodicA2C(PolicyHead):
             return None
         return len(self.actions[env_index])
 
-    def get_episode_loss(self, env_index: int, done: bool) -> Optional[Loss]:
-        # IDEA: Actually, now that I think about it, instead of detaching the
-        # tensors, we could instead use the critic's 'value' estimate and get a
-        # loss for that incomplete episode using the tensors in the buffer,
-        # rather than detaching them!
+    def on_episode_end(self, env_index: int) -> None:
+        self._truncated_rollouts.pop(env_index, None)
+        super().on_episode_end(env_index)
 
-        if not done:
+    def get_bootstrap_value(self, actions: A2CHeadOutput, env_index: int) -> Optional[Tensor]:
+        return actions.value[env_index].detach()
+
+    def get_episode_loss(self,
+                         env_index: int,
+                         done: bool,
+                         bootstrap_value: Tensor = None) -> Optional[Loss]:
+        if not done and bootstrap_value is None:
             return None
 
-        # TODO: Add something like a 'num_steps_since_update' for each env? (it
-        # would actually be a num_steps_since_backward)
-        # if self.num_steps_since_update?
         n_stored_steps = self.num_stored_steps(env_index)
-        if n_stored_steps < 5:
+        if not done:
+            # Truncated rollout: All the stored steps can be used, since the returns
+            # are bootstrapped from the critic's value at the cut point.
+            if not n_stored_steps:
+                return None
+        elif n_stored_steps < (1 if self.hparams.max_steps_between_updates else 5):
             # For now, we only give back a loss at the end of the episode.
             # TODO: Test if giving back a loss at each step or every few steps
             # would work better!
@@ -159,7 +172,13 @@ class EpisodicA2C(PolicyHead):
         dones = torch.zeros(episode_length, dtype=torch.bool)
         dones[-1] = bool(done)
 
-        returns = self.get_returns(episode_rewards, gamma=self.hparams.gamma).type_as(values)
+        if done:
+            returns = self.get_returns(episode_rewards, gamma=self.hparams.gamma)
+        else:
+            returns = bootstrapped_returns(
+                episode_rewards.reshape([-1]), bootstrap_value, gamma=self.hparams.gamma
+            )
+        returns = returns.type_as(values).reshape(values.shape)
         advantages = returns - values
 
         # Normalize advantage (not present in the original implementation)
@@ -170,6 +189,7 @@ class EpisodicA2C(PolicyHead):
         loss = Loss(self.name)
 
         # Policy gradient loss (actor loss)
+        advantages = advantages.reshape(action_log_probs.shape)
         policy_gradient_loss = - (advantages.detach() * action_log_probs).mean()
         actor_loss = Loss("actor", policy_gradient_loss)
         loss += self.hparams.actor_loss_coef * actor_loss
@@ -184,13 +204,19 @@ class EpisodicA2C(PolicyHead):
         entropy_loss_tensor = - actions.action_dist.entropy().mean()
         entropy_loss = Loss("entropy", entropy_loss_tensor)
         loss += self.hparams.entropy_loss_coef * entropy_loss
+        episode_rewards_array = episode_rewards.reshape([-1])
+        # Add the rewards and steps of the previous truncated rollouts, if any.
+        reward_sum, n_steps = self._truncated_rollouts.pop(env_index, (0., 0))
+        reward_sum += float(episode_rewards_array.sum())
+        n_steps += len(episode_rewards_array)
         if done:
-            episode_rewards_array = episode_rewards.reshape([-1])
             loss.metric = EpisodeMetrics(
                 n_samples=1,
-                mean_episode_reward=float(episode_rewards_array.sum()),
-                mean_episode_length=len(episode_rewards_array),
+                mean_episode_reward=reward_sum,
+                mean_episode_length=n_steps,
             )
+        else:
+            self._truncated_rollouts[env_index] = (reward_sum, n_steps)
         loss.metrics["gradient_usage"] = self.get_gradient_usage_metrics(env_index)
         return loss
 
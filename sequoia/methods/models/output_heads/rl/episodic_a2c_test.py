@@ -495,3 +495,74 @@ def test_buffers_are_stacked_correctly(monkeypatch):
 
     # assert False, (obs, rewards, done, info)
     # loss: Loss = output_head.get_loss(forward_pass, actions=actions, rewards=rewards)
+
+
+@pytest.mark.parametrize("batch_size", [1, 3])
+def test_truncated_rollouts_are_bootstrapped(batch_size: int):
+    """ Test that with `max_steps_between_updates`, the output head produces a loss
+    every few steps, even though the episodes are much longer, and that (almost) none
+    of the stored steps are wasted.
+    """
+    max_steps_between_updates = 10
+    # NOTE: The FakeEnvironment samples the observations from the observation space,
+    # so using an env with bounded observations, otherwise the values of the critic
+    # (which are used to bootstrap the returns) can overflow.
+    env = FakeEnvironment(
+        partial(gym.make, "MountainCar-v0"),
+        batch_size=batch_size,
+        new_episode_length=lambda env_index: 100,
+    )
+    env = AddDoneToObservation(env)
+    env = ConvertToFromTensors(env)
+    env = EnvDataset(env)
+
+    obs_space = env.single_observation_space
+    x_dim = flatdim(obs_space["x"])
+    encoder = nn.Linear(x_dim, x_dim)
+
+    output_head = EpisodicA2C(
+        input_space=obs_space["x"],
+        action_space=env.single_action_space,
+        reward_space=env.single_reward_space,
+        hparams=EpisodicA2C.HParams(
+            max_episode_window_length=1000,
+            max_steps_between_updates=max_steps_between_updates,
+        ),
+    )
+    optimizer = torch.optim.SGD(
+        [*encoder.parameters(), *output_head.parameters()], lr=1e-3
+    )
+
+    obs = env.reset()
+    n_updates = 0
+    for step in range(50):
+        x, obs_done = obs["x"], obs["done"]
+        representations = encoder(x)
+        observations = ContinualRLSetting.Observations(x=x, done=obs_done)
+        actions_obj = output_head(observations, representations)
+        forward_pass = ForwardPass(
+            observations=observations,
+            representations=representations,
+            actions=actions_obj,
+        )
+        obs, rewards, step_done, info = env.step(actions_obj.y_pred)
+        loss = output_head.get_loss(
+            forward_pass=forward_pass,
+            actions=actions_obj,
+            rewards=ContinualRLSetting.Rewards(y=rewards),
+        )
+        if loss.requires_grad:
+            n_updates += 1
+            gradient_usage = loss.metrics["gradient_usage"]
+            # Only the step at the previous cut point has been detached.
+            assert gradient_usage.wasted_gradients <= batch_size
+            assert gradient_usage.used_gradients >= batch_size * (
+                max_steps_between_updates - 1
+            )
+            assert loss.metrics["update_frequency"].updates == 1
+            optimizer.zero_grad()
+            loss.loss.backward()
+            optimizer.step()
+
+    # No episode ended, but the model was still updated regularly.
+    assert n_updates == 50 // max_steps_between_updates
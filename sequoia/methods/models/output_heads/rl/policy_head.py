@@ -48,7 +48,8 @@ from torch.optim.optimizer import Optimizer
 
 from sequoia.common import Loss, Metrics
 from sequoia.common.layers import Lambda
-from sequoia.common.metrics.rl_metrics import EpisodeMetrics, GradientUsageMetric
+from sequoia.common.metrics.rl_metrics import (EpisodeMetrics, GradientUsageMetric,
+                                               UpdateFrequencyMetric)
 from sequoia.methods.models.forward_pass import ForwardPass
 from sequoia.settings.rl.continual import ContinualRLSetting
 from sequoia.settings.base.objects import Actions, Observations, Rewards
@@ -115,6 +116,10 @@ class PolicyHead(ClassificationHead):
 
     """
     name: ClassVar[str] = "policy"
+    # Wether this output head can get a loss for the steps of an in-progress episode,
+    # by bootstrapping from the value of the current state (see `get_bootstrap_value`).
+    # When False, `max_steps_between_updates` has no effect.
+    supports_bootstrap: ClassVar[bool] = False
 
     @dataclass
     class HParams(ClassificationHead.HParams):
@@ -131,8 +136,12 @@ class PolicyHead(ClassificationHead):
         # before we update the parameters of the output head.
         min_episodes_before_update: int = 1
 
-        # TODO: Add this mechanism, so that this method could work even when
-        # episodes are very long.
+        # Maximum number of steps between two updates of the output head. When set,
+        # the in-progress episodes are cut after that many steps, and output heads
+        # which have a critic (e.g. `EpisodicA2C`) get a loss for these truncated
+        # rollouts by bootstrapping from the value at the cut point. This way, the
+        # steps of unfinished episodes aren't 'wasted' by the update. Output heads
+        # without a critic ignore this, and wait for the end of the episodes.
         max_steps_between_updates: Optional[int] = None
 
         # NOTE: Here we have two options:
@@ -187,6 +196,7 @@ class PolicyHead(ClassificationHead):
 
         self.num_episodes_since_update: np.ndarray = np.zeros(1)
         self.num_steps_in_episode: np.ndarray = np.zeros(1)
+        self.num_steps_since_update: np.ndarray = np.zeros(1)
 
         self._training: bool = True
 
@@ -203,6 +213,7 @@ class PolicyHead(ClassificationHead):
 
         self.num_steps_in_episode = np.zeros(self.batch_size, dtype=int)
         self.num_episodes_since_update = np.zeros(self.batch_size, dtype=int)
+        self.num_steps_since_update = np.zeros(self.batch_size, dtype=int)
 
     def forward(self, observations: ContinualRLSetting.Observations, representations: Tensor) -> PolicyHeadOutput:
         """ Forward pass of a Policy head.
@@ -272,10 +283,31 @@ class PolicyHead(ClassificationHead):
         representations = forward_pass.representations
         assert observations.done is not None, "need the end-of-episode signal"
 
+        # Wether to cut the in-progress episodes, because it's been
+        # `max_steps_between_updates` steps since the last update, including this one.
+        # NOTE: `num_steps_since_update` only gets incremented for this step below.
+        truncate_rollouts = bool(
+            self.supports_bootstrap
+            and self.hparams.max_steps_between_updates
+            and self.batch_size == len(self.num_steps_since_update)
+            and all(
+                self.num_steps_since_update + 1 >= self.hparams.max_steps_between_updates
+            )
+        )
+
         # Calculate the loss for each environment.
         for env_index, done in enumerate(observations.done):
 
-            env_loss = self.get_episode_loss(env_index, done=done)
+            if truncate_rollouts and not done:
+                # Get a loss for the steps of the in-progress episode, bootstrapping
+                # from the value of the current state, if possible.
+                env_loss = self.get_episode_loss(
+                    env_index,
+                    done=False,
+                    bootstrap_value=self.get_bootstrap_value(actions, env_index),
+                )
+            else:
+                env_loss = self.get_episode_loss(env_index, done=done)
 
             if env_loss is not None:
                 self.loss += env_loss
@@ -288,6 +320,9 @@ class PolicyHead(ClassificationHead):
                     pass
 
                 self.on_episode_end(env_index)
+            elif env_loss is not None:
+                # The steps in the buffer were all used in the truncated rollout.
+                self.clear_buffers(env_index)
 
         if self.batch_size != forward_pass.batch_size:
             raise NotImplementedError(
@@ -327,33 +362,29 @@ class PolicyHead(ClassificationHead):
             self.rewards[env_index].append(env_rewards)
 
         self.num_steps_in_episode += 1
+        self.num_steps_since_update += 1
+        update_model = truncate_rollouts or all(
+            self.num_episodes_since_update >= self.hparams.min_episodes_before_update
+        )
         # TODO:
         # If we want to accumulate the losses before backward, then we just return self.loss
         # If we DONT want to accumulate the losses before backward, then we do the
         # 'small' backward pass, and return a detached loss.
         if self.hparams.accumulate_losses_before_backward:
-            if all(self.num_episodes_since_update >= self.hparams.min_episodes_before_update):
+            if update_model:
                 # Every environment has seen the required number of episodes.
                 # We return the accumulated loss, so that the model can do the backward
                 # pass and update the weights.
-                returned_loss = self.loss
-                self.loss = Loss(self.name)
-                self.detach_all_buffers()
-                self.num_episodes_since_update[:] = 0
-                return returned_loss
+                return self._get_loss_for_update()
             return Loss(self.name)
 
         # Perform the backward pass as soon as a loss is available (with
         # retain_graph=True).
-        if all(self.num_episodes_since_update >= self.hparams.min_episodes_before_update):
+        if update_model:
             # Every environment has seen the required number of episodes.
             # We return the loss for this step, with gradients, to indicate to the
             # Model that it can perform the backward pass and update the weights.
-            returned_loss = self.loss
-            self.loss = Loss(self.name)
-            self.detach_all_buffers()
-            self.num_episodes_since_update[:] = 0
-            return returned_loss
+            return self._get_loss_for_update()
 
         if self.loss.requires_grad:
             # Not all environments are done, but we have a Loss from one of them.
@@ -372,6 +403,29 @@ class PolicyHead(ClassificationHead):
             pass
         return self.loss
 
+    def _get_loss_for_update(self) -> Loss:
+        """ Returns the loss to use for an update of the model, and resets the loss
+        and the buffers.
+        """
+        returned_loss = self.loss
+        returned_loss.metrics["update_frequency"] = UpdateFrequencyMetric(
+            updates=1, env_steps=int(self.num_steps_since_update.sum()),
+        )
+        self.loss = Loss(self.name)
+        self.detach_all_buffers()
+        self.num_episodes_since_update[:] = 0
+        self.num_steps_since_update[:] = 0
+        return returned_loss
+
+    def get_bootstrap_value(self, actions: PolicyHeadOutput, env_index: int) -> Optional[Tensor]:
+        """ Returns the value estimate of the current state in the given environment,
+        used to bootstrap the returns of truncated rollouts.
+
+        The PolicyHead doesn't have a critic, so this returns None, which means that
+        the in-progress episodes can't produce a loss before they end.
+        """
+        return None
+
     def on_episode_end(self, env_index: int) -> None:
         self.num_episodes_since_update[env_index] += 1
         self.num_steps_in_episode[env_index] = 0
@@ -379,13 +433,15 @@ class PolicyHead(ClassificationHead):
 
     def get_episode_loss(self,
                          env_index: int,
-                         done: bool) -> Optional[Loss]:
+                         done: bool,
+                         bootstrap_value: Tensor = None) -> Optional[Loss]:
         """Calculate a loss to train with, given the last (up to
         max_episode_window_length) observations/actions/rewards of the current
         episode in the environment at the given index in the batch.
 
         If `done` is True, then this is for the end of an episode. If `done` is
-        False, the episode is still underway.
+        False, the episode is still underway, and `bootstrap_value` may be the
+        (detached) value estimate of the state that follows the stored steps.
 
         NOTE: While the Batch Observations/Actions/Rewards objects usually
         contain the "batches" of data coming from the N different environments,
@@ -497,6 +553,7 @@ class PolicyHead(ClassificationHead):
             self.clear_all_buffers()
             self.batch_size = None
             self.num_episodes_since_update[:] = 0
+            self.num_steps_since_update[:] = 0
         self._training = value
 
     def clear_all_buffers(self) -> None:
@@ -604,6 +661,20 @@ def discounted_sum_of_future_rewards(rewards: Union[Tensor, List[Tensor]], gamma
     return discounted_rewards.sum(-1)
 
 
+def bootstrapped_returns(rewards: Tensor, bootstrap_value: Tensor, gamma: float) -> Tensor:
+    """ Returns the discounted returns of a truncated rollout, where the value of the
+    state that follows the last step is `bootstrap_value`.
+
+    >>> bootstrapped_returns(torch.ones(3), torch.as_tensor(10.), gamma=0.5).tolist()
+    [3.0, 4.0, 6.0]
+    """
+    returns = discounted_sum_of_future_rewards(rewards, gamma=gamma)
+    T = len(rewards)
+    # The bootstrap value is discounted by gamma ** (T - t) at step t.
+    discounts = gamma ** torch.arange(T, 0, -1, device=returns.device, dtype=returns.dtype)
+    return returns + discounts * bootstrap_value.reshape(()).type_as(returns)
+
+
 def vanilla_policy_gradient(rewards: Sequence[float], log_probs: Union[Tensor, List[Tensor]], gamma: float=0.95):
     """Implementation of the REINFORCE algorithm.
 
@@ -539,3 +539,59 @@ def test_sanity_check_cartpole_done_vector():
             break
     else:
         assert False, "Should have had at least one done=True, over the 100 steps!"
+
+
+@pytest.mark.parametrize("batch_size", [1, 3])
+def test_max_steps_between_updates_is_ignored_without_critic(batch_size: int):
+    """ The PolicyHead can't bootstrap the returns of the in-progress episodes, so it
+    only updates the model at the end of the episodes, even when
+    `max_steps_between_updates` is set, and doesn't waste the steps of the episodes.
+    """
+    episode_length = 25
+    env = FakeEnvironment(
+        partial(gym.make, "MountainCar-v0"),
+        batch_size=batch_size,
+        new_episode_length=lambda env_index: episode_length,
+    )
+    env = AddDoneToObservation(env)
+    env = ConvertToFromTensors(env)
+    env = EnvDataset(env)
+
+    obs_space = env.single_observation_space
+    x_dim = flatdim(obs_space["x"])
+    encoder = nn.Linear(x_dim, x_dim)
+    head = PolicyHead(
+        input_space=obs_space["x"],
+        action_space=env.single_action_space,
+        reward_space=env.single_reward_space,
+        hparams=PolicyHead.HParams(max_steps_between_updates=10),
+    )
+
+    obs = env.reset()
+    update_steps = []
+    for step in range(2 * episode_length + 5):
+        x, obs_done = obs["x"], obs["done"]
+        representations = encoder(x)
+        observations = ContinualRLSetting.Observations(x=x, done=obs_done)
+        actions = head(observations, representations)
+        obs, rewards, _, _ = env.step(actions.y_pred)
+        loss = head.get_loss(
+            ForwardPass(
+                observations=observations,
+                representations=representations,
+                actions=actions,
+            ),
+            actions=actions,
+            rewards=ContinualRLSetting.Rewards(y=rewards),
+        )
+        if "update_frequency" in loss.metrics:
+            update_steps.append(step)
+            assert loss.requires_grad
+            gradient_usage = loss.metrics["gradient_usage"]
+            # NOTE: Same as without `max_steps_between_updates`: Only the step at
+            # which the previous update was done can be detached.
+            assert gradient_usage.wasted_gradients <= batch_size
+            assert gradient_usage.used_gradients >= batch_size * (episode_length - 1)
+
+    # The end of the episodes is seen in the observations of the next step.
+    assert update_steps == [episode_length, 2 * episode_length]
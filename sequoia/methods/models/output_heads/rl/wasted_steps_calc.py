@@ -7,7 +7,16 @@ def get_fraction_of_observations_with_grad(n_envs: int,
                                            new_episode_length: Callable[[], int],
                                            n_updates: int = 10,
                                            min_episodes_before_update: int = 1,
+                                           max_steps_between_updates: int = None,
                                            ):
+    """ Simulates the updates of the PolicyHead, and returns the number of steps
+    whose gradients were used vs 'wasted' (detached by an update before their episode
+    ended).
+
+    When `max_steps_between_updates` is set, the model is also updated after that
+    many steps, and the in-progress episodes are truncated and bootstrapped (as in
+    `EpisodicA2C`), so only the step at the cut point of each episode is wasted.
+    """
     n_used_steps = 0
     n_wasted_steps = 0
     # min_episode_length = 0
@@ -28,8 +37,12 @@ def get_fraction_of_observations_with_grad(n_envs: int,
         finished_episodes_since_last_update = np.zeros(n_envs)
         
         # Loop over all the envs, until all of them have produced a loss (reached
-        # the end of an episode).
+        # the end of an episode), or until the rollouts get truncated.
+        n_steps_since_update = 0
         while not all(finished_episodes_since_last_update >= min_episodes_before_update):
+            if max_steps_between_updates and n_steps_since_update >= max_steps_between_updates:
+                break
+            n_steps_since_update += 1
             # print(f"Episode lengths: {episode_lengths}")
             # print(f"Steps left: {steps_left_in_episode}")
             # print(f"Completed episodes: {num_finished_episodes}")
@@ -58,9 +71,15 @@ def get_fraction_of_observations_with_grad(n_envs: int,
                     steps_since_last_update[env] += 1
 
         # Perform the "optimizer step" for the model.
-        # This 'wastes' all the prediction tensors (actions) in unfinished episodes
-        # because it would detach them.
-        wasted_per_env = steps_since_last_update
+        if max_steps_between_updates:
+            # The unfinished episodes are truncated and bootstrapped from the value
+            # at the cut point, so only that last step is wasted.
+            wasted_per_env = np.minimum(steps_since_last_update, 1)
+            n_used_steps += int((steps_since_last_update - wasted_per_env).sum())
+        else:
+            # This 'wastes' all the prediction tensors (actions) in unfinished episodes
+            # because it would detach them.
+            wasted_per_env = steps_since_last_update
         n_wasted_steps += int(wasted_per_env.sum())
         # print(f"Updating model at step {step}, wasting {wasted_per_env} grads")
         # exit()
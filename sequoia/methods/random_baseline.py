@@ -4,6 +4,7 @@ Should be applicable to any Setting.
 """
 
 from argparse import Namespace
+from pathlib import Path
 from typing import Any, Dict, Mapping, Optional, Union
 
 import gym
@@ -84,6 +85,12 @@ class RandomBaselineMethod(Method, target_setting=Setting):
     ) -> Actions:
         return action_space.sample()
 
+    def save_checkpoint(self, path: Path) -> None:
+        """ Nothing to save, since this Method doesn't have any state. """
+
+    def load_checkpoint(self, path: Path) -> None:
+        """ Nothing to load, since this Method doesn't have any state. """
+
     def get_search_space(self, setting: Setting) -> Mapping[str, Union[str, Dict]]:
         """Returns the search space to use for HPO in the given Setting.
 
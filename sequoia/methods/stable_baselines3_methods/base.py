@@ -5,9 +5,23 @@ See https://stable-baselines3.readthedocs.io/en/master/guide/install.html
 import warnings
 from abc import ABC
 from dataclasses import dataclass
-from typing import Any, Callable, ClassVar, Dict, List, Mapping, Optional, Type, Union
+from functools import partial
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Type,
+    Union,
+)
 
 import gym
+import numpy as np
 import torch
 from gym import spaces
 from simple_parsing import choice, mutable_field
@@ -26,10 +40,16 @@ from stable_baselines3.common.base_class import (
 from stable_baselines3.common.vec_env.obs_dict_wrapper import ObsDictWrapper
 from wandb.wandb_run import Run
 
+from sequoia.common.gym_wrappers.batch_env import (
+    AsyncVectorEnv,
+    BatchedVectorEnv,
+    SyncVectorEnv,
+)
 from sequoia.common.gym_wrappers.batch_env.batched_vector_env import VectorEnv
 from sequoia.common.gym_wrappers.utils import has_wrapper
 from simple_parsing.helpers.hparams import HyperParameters, log_uniform, categorical
-from sequoia.common.spaces import Image
+from sequoia.common.spaces import Image, TypedDictSpace
+from sequoia.common.spaces.validation import SpaceChecker
 from sequoia.common.transforms.utils import is_image
 from sequoia.settings import Method, Setting
 from sequoia.settings.rl.continual import ContinualRLSetting
@@ -57,11 +77,12 @@ def _wrap_env(env: GymEnv, verbose: int = 0, monitor_wrapper: bool = True) -> Ve
     :return: The wrapped environment.
     """
 
-    # if not isinstance(env, VecEnv):
-    if not (
-        isinstance(env, (VecEnv, VectorEnv))
-        or isinstance(env.unwrapped, (VecEnv, VectorEnv))
-    ):
+    if not isinstance(env, VecEnv) and isinstance(env.unwrapped, VectorEnv):
+        if verbose >= 1:
+            print("Wrapping the vectorized env in a `VectorEnvAdapter`.")
+        env = VectorEnvAdapter(env)
+
+    if not (isinstance(env, VecEnv) or isinstance(env.unwrapped, VecEnv)):
         # if not is_wrapped(env, Monitor) and monitor_wrapper:
         if monitor_wrapper and not (
             is_wrapped(env, Monitor)
@@ -90,6 +111,179 @@ def _wrap_env(env: GymEnv, verbose: int = 0, monitor_wrapper: bool = True) -> Ve
 BaseAlgorithm._wrap_env = staticmethod(_wrap_env)
 
 
+def unbatch_space(space: gym.Space) -> gym.Space:
+    """ Returns the space of a single item from a batched space, as created by
+    `gym.vector.utils.batch_space`.
+
+    >>> unbatch_space(spaces.MultiDiscrete([3, 3, 3]))
+    Discrete(3)
+    >>> unbatch_space(spaces.Box(0, 1, shape=(4, 2), dtype=np.float32)).shape
+    (2,)
+    >>> space = TypedDictSpace(x=spaces.Box(0, 1, (4, 2)), t=spaces.MultiDiscrete([5] * 4))
+    >>> unbatch_space(space)["x"].shape, unbatch_space(space)["t"]
+    ((2,), Discrete(5))
+    """
+    if isinstance(space, TypedDictSpace):
+        return type(space)(
+            {key: unbatch_space(value) for key, value in space.spaces.items()},
+            dtype=space.dtype,
+        )
+    if isinstance(space, spaces.Dict):
+        return spaces.Dict(
+            {key: unbatch_space(value) for key, value in space.spaces.items()}
+        )
+    if isinstance(space, spaces.Box):
+        return type(space)(low=space.low[0], high=space.high[0], dtype=space.dtype)
+    if isinstance(space, spaces.MultiDiscrete):
+        if space.nvec.ndim == 1:
+            return spaces.Discrete(int(space.nvec[0]))
+        return spaces.MultiDiscrete(space.nvec[0])
+    if isinstance(space, spaces.Tuple) and all(
+        item_space == space.spaces[0] for item_space in space.spaces
+    ):
+        return space.spaces[0]
+    raise NotImplementedError(f"Don't know how to unbatch space {space}.")
+
+
+class VectorEnvAdapter(VecEnv):
+    """ Adapts a (possibly wrapped) vectorized env from gym, for example Sequoia's
+    `BatchedVectorEnv`, to the `VecEnv` API of stable-baselines3.
+
+    This makes it possible for the algorithms that support it (e.g. A2C and PPO) to
+    collect experience from all the envs of a batch at once.
+    """
+
+    def __init__(self, env: gym.Env):
+        self.env = env
+        super().__init__(
+            num_envs=env.num_envs,
+            observation_space=unbatch_space(env.observation_space),
+            action_space=unbatch_space(env.action_space),
+        )
+        self._actions: Optional[np.ndarray] = None
+
+    def reset(self) -> Union[np.ndarray, Dict[str, np.ndarray]]:
+        return _to_numpy(self.env.reset())
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._actions = actions
+
+    def step_wait(self):
+        observations, rewards, dones, infos = self.env.step(self._actions)
+        if isinstance(infos, dict):
+            # The info dicts were removed or batched by a wrapper.
+            infos = [{} for _ in range(self.num_envs)]
+        return (
+            _to_numpy(observations),
+            np.asarray(rewards, dtype=np.float32),
+            np.asarray(dones, dtype=bool),
+            list(infos),
+        )
+
+    def close(self) -> None:
+        self.env.close()
+
+    def seed(self, seed: Optional[int] = None) -> List[Optional[int]]:
+        seeds = self.env.seed(seed)
+        return list(seeds) if seeds is not None else [None] * self.num_envs
+
+    def render(self, mode: str = "human"):
+        return self.env.render(mode=mode)
+
+    def get_attr(self, attr_name: str, indices: Sequence[int] = None) -> List[Any]:
+        return self._apply(partial(_get_attr, attr_name=attr_name), indices)
+
+    def set_attr(self, attr_name: str, value: Any, indices: Sequence[int] = None) -> None:
+        self._apply(partial(_set_attr, attr_name=attr_name, value=value), indices)
+
+    def env_method(
+        self, method_name: str, *method_args, indices: Sequence[int] = None, **method_kwargs
+    ) -> List[Any]:
+        return self._apply(
+            partial(
+                _call_method,
+                method_name=method_name,
+                method_args=method_args,
+                method_kwargs=method_kwargs,
+            ),
+            indices,
+        )
+
+    def env_is_wrapped(
+        self, wrapper_class: Type[gym.Wrapper], indices: Sequence[int] = None
+    ) -> List[bool]:
+        is_wrapped = has_wrapper(self.env, wrapper_class)
+        return [is_wrapped for _ in self._get_indices(indices)]
+
+    def _get_indices(self, indices: Union[None, int, Sequence[int]]) -> Sequence[int]:
+        if indices is None:
+            return range(self.num_envs)
+        if isinstance(indices, int):
+            return [indices]
+        return indices
+
+    def _apply(
+        self, function: Callable[[gym.Env], Any], indices: Union[None, int, Sequence[int]]
+    ) -> List[Any]:
+        """ Applies `function` to each of the individual envs at `indices`, and returns
+        the results.
+
+        The functions are sent to the workers of the vectorized env when the envs live
+        in other processes, so `function` has to be picklable.
+        """
+        indices = list(self._get_indices(indices))
+        vector_env = self.env.unwrapped
+        if isinstance(vector_env, SyncVectorEnv):
+            return [function(vector_env.envs[index]) for index in indices]
+        if isinstance(vector_env, AsyncVectorEnv):
+            return vector_env.apply_at(function, indices)
+        if isinstance(vector_env, BatchedVectorEnv):
+            # Each worker of a BatchedVectorEnv has a chunk of envs in a SyncVectorEnv.
+            results: List[Any] = []
+            for index in indices:
+                async_env, chunk_length = vector_env.env_a, vector_env.chunk_length_a
+                if index >= vector_env.n_a:
+                    async_env, chunk_length = vector_env.env_b, vector_env.chunk_length_b
+                    index -= vector_env.n_a
+                worker_index, index_in_chunk = divmod(index, chunk_length)
+                results.append(
+                    async_env.apply_at(
+                        partial(_apply_in_chunk, function=function, index=index_in_chunk),
+                        worker_index,
+                    )
+                )
+            return results
+        raise NotImplementedError(
+            f"Can't access the individual envs of vectorized env {vector_env}."
+        )
+
+
+def _to_numpy(observations: Any) -> Union[np.ndarray, Dict[str, np.ndarray]]:
+    if isinstance(observations, Mapping):
+        return {key: np.asarray(value) for key, value in observations.items()}
+    return np.asarray(observations)
+
+
+def _get_attr(env: gym.Env, attr_name: str) -> Any:
+    return getattr(env, attr_name)
+
+
+def _set_attr(env: gym.Env, attr_name: str, value: Any) -> None:
+    setattr(env, attr_name, value)
+
+
+def _call_method(
+    env: gym.Env, method_name: str, method_args: Sequence, method_kwargs: Dict[str, Any]
+) -> Any:
+    return getattr(env, method_name)(*method_args, **method_kwargs)
+
+
+def _apply_in_chunk(
+    chunk_env: SyncVectorEnv, function: Callable[[gym.Env], Any], index: int
+) -> Any:
+    return function(chunk_env.envs[index])
+
+
 class RemoveInfoWrapper(gym.Wrapper):
     """ Wrapper used to remove the 'info' dict, since there seems to be a bug in sb3
     whenever there is something in the 'info' dict.
@@ -195,8 +389,17 @@ class StableBaselines3Method(Method, ABC, target_setting=ContinualRLSetting):
     # Path to a folder where the evaluations will be saved
     eval_log_path: Optional[str] = None
 
+    # Number of environments to collect experience from in parallel. Values greater
+    # than 1 are only used by the algorithms that support multiple environments.
+    n_envs: int = 1
+
+    # Wether the algorithm supports collecting experience from multiple envs.
+    supports_multi_env: ClassVar[bool] = False
+
     def __post_init__(self):
         self.model: Optional[BaseAlgorithm] = None
+        # Compiled check of the actions returned by `get_actions`.
+        self._action_checker = SpaceChecker()
         # Extra wrappers to add to the train_env and valid_env before passing
         # them to the `learn` method from stable-baselines3.
         from sequoia.common.gym_wrappers import (
@@ -227,12 +430,22 @@ class StableBaselines3Method(Method, ABC, target_setting=ContinualRLSetting):
     def configure(self, setting: ContinualRLSetting):
         # Delete the model, if present.
         self.model = None
-        # For now, we don't batch the space because stablebaselines3 will add an
-        # additional batch dimension if we do.
-        # TODO: Still need to debug the batching stuff with stablebaselines,
-        # some methods support it, some don't, and it doesn't recognize
-        # VectorEnvs from gym.
-        setting.batch_size = None
+        # The batched envs from the Setting get adapted to the `VecEnv` API of
+        # stable-baselines3 (see `VectorEnvAdapter`).
+        n_envs = self.n_envs
+        if n_envs > 1 and not self.supports_multi_env:
+            warnings.warn(
+                RuntimeWarning(
+                    f"{type(self).__name__} doesn't support multiple environments, "
+                    f"will use a single environment rather than {n_envs}."
+                )
+            )
+            n_envs = 1
+        setting.batch_size = n_envs if n_envs > 1 else None
+        if setting.config:
+            self._action_checker = SpaceChecker(
+                check_every=setting.config.space_check_every
+            )
 
         # BUG: Need to fix an issue when using the CnnPolicy and Atary envs, the
         # input shape isn't what they expect (only 2 channels instead of three
@@ -324,12 +537,17 @@ class StableBaselines3Method(Method, ABC, target_setting=ContinualRLSetting):
         # TODO: Get the max number of steps directly from the env, rather than from the
         # setting's fields.
         logger.info(f"Starting training, for a maximum of {total_timesteps} steps.")
+        eval_env = valid_env
+        if getattr(valid_env, "num_envs", 1) > 1:
+            # NOTE: stable-baselines3 can only evaluate the agent on a single env.
+            logger.info("Not evaluating on the (batched) validation environment.")
+            eval_env = None
         # todo: Customize the parametrers of the model and/or of this "learn"
         # method if needed.
         self.model = self.model.learn(
             # The total number of samples (env steps) to train on
             total_timesteps=total_timesteps,
-            eval_env=valid_env,
+            eval_env=eval_env,
             callback=self.callback,
             log_interval=self.log_interval,
             tb_log_name=self.tb_log_name,
@@ -346,7 +564,11 @@ class StableBaselines3Method(Method, ABC, target_setting=ContinualRLSetting):
         obs = observations.x
         predictions = self.model.predict(obs)
         action, _ = predictions
-        assert action in action_space, (observations, action, action_space)
+        assert self._action_checker(action, action_space), (
+            observations,
+            action,
+            action_space,
+        )
         return action
 
     def get_search_space(self, setting: Setting) -> Mapping[str, Union[str, Dict]]:
@@ -401,6 +623,19 @@ class StableBaselines3Method(Method, ABC, target_setting=ContinualRLSetting):
         """
         run.config["hparams"] = self.hparams.to_dict()
 
+    def save_checkpoint(self, path: Path) -> None:
+        """ Saves the SB3 model (without its replay buffer) in the directory `path`.
+        """
+        if self.model is not None:
+            self.model.save(path / "model.zip")
+
+    def load_checkpoint(self, path: Path) -> None:
+        """ Loads the SB3 model saved with `save_checkpoint`. The model is given the
+        environment of the next task in `fit`.
+        """
+        if (path / "model.zip").exists():
+            self.model = self.Model.load(path / "model.zip")
+
     def on_task_switch(self, task_id: Optional[int]) -> None:
         """ Called when switching tasks in a CL setting.
 
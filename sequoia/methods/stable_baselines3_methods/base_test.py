@@ -1,13 +1,20 @@
+from functools import partial
 from inspect import Parameter, Signature, getsourcefile, signature
 from pathlib import Path
-from typing import ClassVar, Dict, Type
+from typing import Callable, ClassVar, Dict, Type
 
+import gym
 import pytest
 from stable_baselines3 import A2C, DDPG, DQN, PPO, SAC, TD3
 from stable_baselines3.common.off_policy_algorithm import OffPolicyAlgorithm
 from stable_baselines3.common.on_policy_algorithm import OnPolicyAlgorithm
 
 from sequoia.common.config import Config
+from sequoia.common.gym_wrappers.batch_env import (
+    AsyncVectorEnv,
+    BatchedVectorEnv,
+    SyncVectorEnv,
+)
 from sequoia.conftest import monsterkong_required
 from sequoia.methods.method_test import MethodTests
 from sequoia.settings.base import Results
@@ -32,7 +39,7 @@ from . import (
     SACMethod,
     TD3Method,
 )
-from .base import BaseAlgorithm, StableBaselines3Method
+from .base import BaseAlgorithm, StableBaselines3Method, VectorEnvAdapter
 from .off_policy_method import OffPolicyMethod, OffPolicyModel
 
 # @pytest.mark.parametrize(
@@ -154,6 +161,25 @@ class StableBaselines3MethodTests(MethodTests):
         self.validate_results(setting=setting, method=method, results=results)
 
 
+    @pytest.mark.timeout(120)
+    def test_multiple_envs(self, config: Config):
+        """ Checks that the methods that support it can use a batched environment. """
+        if not self.Method.supports_multi_env:
+            pytest.skip(f"{self.Method.__name__} doesn't support multiple envs.")
+        setting = DiscreteTaskAgnosticRLSetting(
+            nb_tasks=2,
+            train_steps_per_task=1_000,
+            test_steps_per_task=1_000,
+            config=config,
+            **self.setting_kwargs,
+        )
+        method = self.Method(n_envs=2, **self.debug_kwargs)
+        results: Results = setting.apply(method, config=config)
+        assert setting.batch_size == 2
+        assert method.model.n_envs == 2
+        self.validate_results(setting=setting, method=method, results=results)
+
+
 class DiscreteActionSpaceMethodTests(StableBaselines3MethodTests):
     debug_kwargs: ClassVar[Dict] = {}
     expected_debug_mean_episode_reward: ClassVar[float] = 135
@@ -198,3 +224,31 @@ def _(algo: OnPolicyAlgorithm):
 
 class ContinuousActionSpaceMethodTests(StableBaselines3MethodTests):
     setting_kwargs: ClassVar[str] = {"dataset": "MountainCarContinuous-v0"}
+
+
+def _make_cartpole() -> gym.Env:
+    return gym.make("CartPole-v0")
+
+
+@pytest.mark.timeout(60)
+@pytest.mark.parametrize(
+    "make_vector_env",
+    [
+        SyncVectorEnv,
+        partial(AsyncVectorEnv, context="fork"),
+        partial(BatchedVectorEnv, n_workers=2, context="fork"),
+    ],
+)
+def test_vector_env_adapter_forwards_to_each_env(make_vector_env: Callable):
+    """ `get_attr`, `set_attr` and `env_method` of the `VectorEnvAdapter` apply to
+    each of the individual envs, rather than to the vectorized env.
+    """
+    env = VectorEnvAdapter(make_vector_env([_make_cartpole for _ in range(3)]))
+    try:
+        env.set_attr("foo", 123, indices=[1])
+        env.set_attr("foo", 456, indices=2)
+        assert env.get_attr("foo", indices=[1, 2]) == [123, 456]
+        assert [spec.id for spec in env.get_attr("spec")] == ["CartPole-v0"] * 3
+        assert env.env_method("__getattribute__", "foo", indices=[1, 2]) == [123, 456]
+    finally:
+        env.close()
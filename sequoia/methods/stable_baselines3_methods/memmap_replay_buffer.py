@@ -0,0 +1,117 @@
+""" Replay buffer for the off-policy algorithms of SB3, stored in memory-mapped files.
+
+The capacity of this buffer is bounded by the free disk space rather than by the RAM,
+which makes it possible to use the 'published' buffer sizes (e.g. 1M transitions) of
+algorithms like DQN or SAC on pixel-based environments.
+"""
+import shutil
+import tempfile
+import weakref
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import torch
+from gym import spaces
+from stable_baselines3.common.buffers import BaseBuffer, ReplayBuffer
+
+from sequoia.utils.logging_utils import get_logger
+
+logger = get_logger(__file__)
+
+
+class MemmapReplayBuffer(ReplayBuffer):
+    """ `ReplayBuffer` whose arrays are `np.memmap`s in a scratch directory on disk.
+
+    The observations are stored with the dtype of the observation space (e.g. uint8
+    for images), and the next observations aren't duplicated: the next observation of
+    transition `i` is the observation of transition `i + 1` (same as when using
+    `optimize_memory_usage=True` in SB3).
+
+    The files are deleted when the buffer is garbage-collected, or when `close` is
+    called.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int,
+        observation_space: spaces.Space,
+        action_space: spaces.Space,
+        device: Union[torch.device, str] = "cpu",
+        n_envs: int = 1,
+        optimize_memory_usage: bool = True,
+        directory: Optional[Union[str, Path]] = None,
+        **kwargs,
+    ):
+        # NOTE: Skipping `ReplayBuffer.__init__`, since it would allocate the arrays in
+        # RAM.
+        BaseBuffer.__init__(
+            self, buffer_size, observation_space, action_space, device, n_envs=n_envs
+        )
+        if not optimize_memory_usage:
+            logger.debug(
+                "The next observations are never duplicated in the memory-mapped "
+                "replay buffer, ignoring `optimize_memory_usage=False`."
+            )
+        self.optimize_memory_usage = True
+        self.handle_timeout_termination = False
+
+        self.directory = Path(tempfile.mkdtemp(prefix="replay_buffer_", dir=directory))
+        self._finalizer = weakref.finalize(
+            self, shutil.rmtree, str(self.directory), ignore_errors=True
+        )
+        batch_shape = (self.buffer_size, self.n_envs)
+        self.observations = self._create_array(
+            "observations", batch_shape + self.obs_shape, observation_space.dtype
+        )
+        # NOTE: Not used, since the next observations are read from `observations`.
+        self.next_observations = None
+        self.actions = self._create_array(
+            "actions", batch_shape + (self.action_dim,), action_space.dtype
+        )
+        self.rewards = self._create_array("rewards", batch_shape, np.float32)
+        self.dones = self._create_array("dones", batch_shape, np.float32)
+        # Used by the more recent versions of SB3 to ignore the 'done' of episodes that
+        # were truncated by a time limit.
+        self.timeouts = self._create_array("timeouts", batch_shape, np.float32)
+
+        total_bytes = sum(
+            array.nbytes
+            for array in [
+                self.observations,
+                self.actions,
+                self.rewards,
+                self.dones,
+                self.timeouts,
+            ]
+        )
+        logger.info(
+            f"Created a memory-mapped replay buffer of {total_bytes / 1024 ** 3:.3f}Gb "
+            f"in directory {self.directory}"
+        )
+
+    def _create_array(
+        self, name: str, shape: Tuple[int, ...], dtype: np.dtype
+    ) -> np.memmap:
+        path = self.directory / f"{name}.npy"
+        return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+
+    def close(self) -> None:
+        """ Deletes the files of the buffer. The buffer can't be used afterwards. """
+        self.observations = None
+        self.actions = None
+        self.rewards = None
+        self.dones = None
+        self.timeouts = None
+        self._finalizer()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # The finalizer of the original buffer is responsible for its files.
+        state.pop("_finalizer", None)
+        return state
+
+    def __setstate__(self, state):
+        # NOTE: When unpickled, the arrays are regular (in-memory) arrays.
+        self.__dict__.update(state)
+        self._finalizer = weakref.finalize(self, lambda: None)
@@ -0,0 +1,56 @@
+import inspect
+
+import numpy as np
+import pytest
+from gym import spaces
+from stable_baselines3.common.buffers import ReplayBuffer
+
+from .memmap_replay_buffer import MemmapReplayBuffer
+
+
+def add_transition(buffer: ReplayBuffer, obs, next_obs, action, reward, done) -> None:
+    # NOTE: More recent versions of SB3 also take the `infos` as an argument.
+    if "infos" in inspect.signature(buffer.add).parameters:
+        buffer.add(obs, next_obs, action, reward, done, [{}])
+    else:
+        buffer.add(obs, next_obs, action, reward, done)
+
+
+@pytest.mark.parametrize("buffer_size", [10, 100])
+def test_same_samples_as_in_memory_buffer(tmp_path, buffer_size: int):
+    observation_space = spaces.Box(0, 255, shape=(3, 8, 8), dtype=np.uint8)
+    action_space = spaces.Discrete(4)
+    in_memory_buffer = ReplayBuffer(
+        buffer_size, observation_space, action_space, optimize_memory_usage=True
+    )
+    memmap_buffer = MemmapReplayBuffer(
+        buffer_size, observation_space, action_space, directory=tmp_path
+    )
+    assert memmap_buffer.observations.dtype == np.uint8
+    assert memmap_buffer.next_observations is None
+
+    obs = observation_space.sample()[None]
+    for step in range(25):
+        next_obs = observation_space.sample()[None]
+        action = np.array([[action_space.sample()]])
+        reward = np.array([float(step)])
+        done = np.array([step % 7 == 6])
+        for buffer in [in_memory_buffer, memmap_buffer]:
+            add_transition(buffer, obs, next_obs, action, reward, done)
+        obs = next_obs
+
+    assert memmap_buffer.pos == in_memory_buffer.pos
+    assert memmap_buffer.full == in_memory_buffer.full
+
+    batch_inds = np.arange(min(buffer_size, 25) - 1)
+    expected = in_memory_buffer._get_samples(batch_inds)
+    samples = memmap_buffer._get_samples(batch_inds)
+    for expected_tensor, tensor in zip(expected, samples):
+        assert (expected_tensor == tensor).all()
+
+    assert len(memmap_buffer.sample(batch_size=5).observations) == 5
+
+    directory = memmap_buffer.directory
+    assert directory.exists()
+    memmap_buffer.close()
+    assert not directory.exists()
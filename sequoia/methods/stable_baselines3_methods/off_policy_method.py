@@ -1,8 +1,11 @@
 """ Base class used to not duplicate the tweaks made all the off-policy algos from SB3.
 """
 import math
+import shutil
+import tempfile
 import warnings
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Callable, ClassVar, Optional, Type, Union, Any
 from abc import ABC
 import gym
@@ -18,6 +21,7 @@ from sequoia.settings.rl import ContinualRLSetting
 from sequoia.utils.logging_utils import get_logger
 
 from .base import SB3BaseHParams, StableBaselines3Method
+from .memmap_replay_buffer import MemmapReplayBuffer
 
 logger = get_logger(__file__)
 
@@ -95,6 +99,13 @@ class OffPolicyMethod(StableBaselines3Method, ABC):
     hparams: OffPolicyModel.HParams = mutable_field(OffPolicyModel.HParams)
     # Approximate limit on the size of the replay buffer, in megabytes.
     max_buffer_size_megabytes: float = 2_048.0
+    # Wether to store the replay buffer in memory-mapped files on disk rather than in
+    # RAM. When set, the size of the buffer is limited by the free disk space rather
+    # than by `max_buffer_size_megabytes`.
+    memmap_buffer: bool = False
+    # Directory in which to create the files of the memory-mapped replay buffer.
+    # Defaults to the temporary directory of the system.
+    memmap_buffer_dir: Optional[Path] = None
 
     def __post_init__(self):
         super().__post_init__()
@@ -111,10 +122,16 @@ class OffPolicyMethod(StableBaselines3Method, ABC):
         flattened_observation_space = flatten_space(x_space)
         observation_size_bytes = flattened_observation_space.sample().nbytes
 
-        # IF there are more than a few dimensions per observation, then we
-        # should probably reduce the size of the replay buffer according to
-        # the size of the observations.
-        max_buffer_size_bytes = self.max_buffer_size_megabytes * 1024 * 1024
+        if self.memmap_buffer:
+            # The memory-mapped buffer is limited by the free disk space instead, and
+            # doesn't duplicate the next observations.
+            buffer_dir = self.memmap_buffer_dir or tempfile.gettempdir()
+            max_buffer_size_bytes = shutil.disk_usage(buffer_dir).free
+        else:
+            # IF there are more than a few dimensions per observation, then we
+            # should probably reduce the size of the replay buffer according to
+            # the size of the observations.
+            max_buffer_size_bytes = self.max_buffer_size_megabytes * 1024 * 1024
         max_buffer_length = max_buffer_size_bytes // observation_size_bytes
 
         if max_buffer_length == 0:
@@ -222,7 +239,26 @@ class OffPolicyMethod(StableBaselines3Method, ABC):
             )
 
     def create_model(self, train_env: gym.Env, valid_env: gym.Env) -> OffPolicyModel:
-        return self.Model(env=train_env, **self.hparams.to_dict())
+        if not self.memmap_buffer:
+            return self.Model(env=train_env, **self.hparams.to_dict())
+        # NOTE: `_setup_model` creates an in-memory replay buffer of size
+        # `buffer_size` (allocated with `np.zeros`), so we set up the model with a
+        # tiny buffer instead, and then replace it with the memory-mapped buffer.
+        model = self.Model(
+            env=train_env, _init_setup_model=False, **self.hparams.to_dict()
+        )
+        model.buffer_size = 1
+        model._setup_model()
+        model.buffer_size = self.hparams.buffer_size
+        model.replay_buffer = MemmapReplayBuffer(
+            self.hparams.buffer_size,
+            model.observation_space,
+            model.action_space,
+            device=model.device,
+            n_envs=model.n_envs,
+            directory=self.memmap_buffer_dir,
+        )
+        return model
 
     def fit(self, train_env: gym.Env, valid_env: gym.Env):
         super().fit(train_env=train_env, valid_env=valid_env)
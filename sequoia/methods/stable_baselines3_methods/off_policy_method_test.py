@@ -1,11 +1,15 @@
-from typing import ClassVar, Dict, Type
+from typing import ClassVar, Dict, List, Type
 
+import gym
 import pytest
+from stable_baselines3.common.buffers import ReplayBuffer
+
 from sequoia.common.config import Config
 from sequoia.settings.rl import DiscreteTaskAgnosticRLSetting
 
 from .base import BaseAlgorithm, StableBaselines3Method
 from .base_test import DiscreteActionSpaceMethodTests
+from .memmap_replay_buffer import MemmapReplayBuffer
 from .off_policy_method import OffPolicyAlgorithm, OffPolicyMethod
 
 
@@ -15,3 +19,35 @@ class OffPolicyMethodTests:
     debug_dataset: ClassVar[str]
     debug_kwargs: ClassVar[Dict] = {}
 
+    def test_memmap_buffer_doesnt_allocate_in_memory_buffer(
+        self, monkeypatch, tmp_path
+    ):
+        """ Check that the in-memory replay buffer of the model is never allocated
+        with the full buffer size when using the memory-mapped buffer.
+        """
+        allocated_sizes: List[int] = []
+        original_init = ReplayBuffer.__init__
+
+        def _init(buffer: ReplayBuffer, buffer_size: int, *args, **kwargs):
+            if not isinstance(buffer, MemmapReplayBuffer):
+                allocated_sizes.append(buffer_size)
+            original_init(buffer, buffer_size, *args, **kwargs)
+
+        monkeypatch.setattr(ReplayBuffer, "__init__", _init)
+
+        buffer_size = 100_000
+        method = self.Method(
+            hparams=self.Model.HParams(policy="MlpPolicy", buffer_size=buffer_size),
+            memmap_buffer=True,
+            memmap_buffer_dir=tmp_path,
+            **self.debug_kwargs,
+        )
+        env = gym.make("CartPole-v0")
+        model = method.create_model(train_env=env, valid_env=env)
+
+        assert isinstance(model.replay_buffer, MemmapReplayBuffer)
+        assert model.replay_buffer.buffer_size == buffer_size
+        assert model.buffer_size == buffer_size
+        assert all(size < buffer_size for size in allocated_sizes)
+        model.replay_buffer.close()
+        env.close()
@@ -103,14 +103,20 @@ class OnPolicyMethod(StableBaselines3Method, ABC):
     # Hyper-parameters of the model/algorithm.
     hparams: OnPolicyModel.HParams = mutable_field(OnPolicyModel.HParams)
 
+    # On-policy algorithms can collect their rollouts from multiple envs at once.
+    supports_multi_env: ClassVar[bool] = True
+
     def configure(self, setting: ContinualRLSetting):
         super().configure(setting=setting)
+        # Each update uses `n_steps` steps from each of the `n_envs` environments.
+        n_envs = setting.batch_size or 1
         if setting.steps_per_phase:
             min_model_updates = 20
-            if self.hparams.n_steps > setting.steps_per_phase // min_model_updates:
+            steps_per_env = setting.steps_per_phase // n_envs
+            if self.hparams.n_steps > steps_per_env // min_model_updates:
                 # Set the number of steps per update so that there are *at least*
                 # `min_model_updates` model updates during a single `fit` call.
-                new_n_steps = math.ceil(setting.steps_per_phase / min_model_updates)
+                new_n_steps = math.ceil(steps_per_env / min_model_updates)
                 warnings.warn(
                     RuntimeWarning(
                         f"Capping the number of steps per update to {new_n_steps}, in "
@@ -124,7 +130,7 @@ class OnPolicyMethod(StableBaselines3Method, ABC):
             # attempt to fill the buffer using more samples than the environment allows.
             self.train_steps_per_task = min(
                 self.train_steps_per_task,
-                setting.steps_per_phase - self.hparams.n_steps - 1,
+                setting.steps_per_phase - self.hparams.n_steps * n_envs - 1,
             )
             logger.info(
                 f"Limitting training steps per task to {self.train_steps_per_task}"
@@ -1,18 +1,21 @@
 """ 'Patch' for the Trainer of Pytorch Lightning so it can use gym environment as
 dataloaders (via the GymDataLoader class of Sequoia).
 """
+import copy
 import os
 from dataclasses import dataclass
 from functools import singledispatch
 from pathlib import Path
-from typing import Any, Callable, Iterable, List, Optional, Tuple, Union
+from typing import Any, Callable, ClassVar, Iterable, List, Optional, Tuple, Type, Union
 
 import pytorch_lightning as pl
 import torch
 import tqdm
 from pytorch_lightning import Callback
 from pytorch_lightning import Trainer as _Trainer
+from pytorch_lightning.callbacks import EarlyStopping, ModelCheckpoint
 from pytorch_lightning.loggers import LightningLoggerBase
+from pytorch_lightning.trainer.states import TrainerState
 from pytorch_lightning.utilities import rank_zero_warn
 from simple_parsing import choice, field
 
@@ -73,6 +76,12 @@ class TrainerConfig(HyperParameters, Parseable):
     # ModelCheckpoint in the `callbacks`.
     checkpoint_callback: bool = True
 
+    # Reuse the same Trainer for all the calls to `fit` (e.g. for each task), only
+    # resetting its per-task state (epoch and step counters, early stopping and
+    # checkpoints), rather than creating a new Trainer each time.
+    # NOTE: Changes to these options after the Trainer is created aren't picked up.
+    reuse_trainer: bool = False
+
     def make_trainer(
         self,
         config: Config,
@@ -115,8 +124,46 @@ class TrainerConfig(HyperParameters, Parseable):
 
 
 class Trainer(_Trainer):
+    # Callbacks whose state is specific to a call to `fit`, and which are replaced with
+    # a copy of their initial state in `reset`.
+    stateful_callbacks: ClassVar[Tuple[Type[Callback], ...]] = (
+        EarlyStopping,
+        ModelCheckpoint,
+    )
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self._initial_callbacks: List[Optional[Callback]] = [
+            copy.deepcopy(callback)
+            if isinstance(callback, self.stateful_callbacks)
+            else None
+            for callback in self.callbacks
+        ]
+
+    def reset(self) -> None:
+        """ Resets the state of the Trainer which is specific to a call to `fit`.
+
+        This makes it possible to reuse the same Trainer for each task, rather than
+        paying again for the creation of its loggers, callbacks and accelerator.
+        The epoch and step counters are reset, the dataloaders from the previous call
+        to `fit` are dropped, and the stateful callbacks (early stopping, checkpoints)
+        are replaced with copies of what they were when the Trainer was created.
+        """
+        self.global_step = 0
+        self.current_epoch = 0
+        self.should_stop = False
+        self.state = TrainerState()
+        self.total_batch_idx = 0
+        self.batch_idx = 0
+        self.num_training_batches = 0
+        self.train_dataloader = None
+        self.val_dataloaders = None
+        self.test_dataloaders = None
+        self.train_loop._teardown_already_run = False
+        self.callbacks = [
+            callback if initial is None else copy.deepcopy(initial)
+            for callback, initial in zip(self.callbacks, self._initial_callbacks)
+        ]
 
     def fit(self, model, train_dataloader=None, val_dataloaders=None, datamodule=None):
         # TODO: Figure out what method to overwrite to fix the problem of accessing two
@@ -0,0 +1,101 @@
+from pathlib import Path
+
+import torch
+from pytorch_lightning import LightningModule
+from pytorch_lightning.callbacks import EarlyStopping, ModelCheckpoint
+from torch import nn
+from torch.nn import functional as F
+from torch.utils.data import DataLoader, TensorDataset
+
+from sequoia.common.config import Config
+
+from .trainer import Trainer, TrainerConfig
+
+
+def make_trainer(tmp_path: Path) -> Trainer:
+    trainer_options = TrainerConfig(gpus=0, max_epochs=1, default_root_dir=tmp_path)
+    return trainer_options.make_trainer(
+        config=Config(debug=True), callbacks=[EarlyStopping(monitor="val/loss")]
+    )
+
+
+def test_reset_trainer(tmp_path: Path):
+    """ Resetting the Trainer brings back the per-task state to what it was when the
+    Trainer was created.
+    """
+    trainer = make_trainer(tmp_path)
+    early_stopping = trainer.early_stopping_callback
+    checkpoint = trainer.checkpoint_callback
+    assert isinstance(early_stopping, EarlyStopping)
+    assert isinstance(checkpoint, ModelCheckpoint)
+
+    # Simulate the end of training on a task.
+    trainer.current_epoch = 5
+    trainer.global_step = 123
+    trainer.should_stop = True
+    early_stopping.wait_count = 3
+    early_stopping.best_score = torch.tensor(0.5)
+    checkpoint.dirpath = str(tmp_path / "task_0")
+    checkpoint.best_model_path = str(tmp_path / "task_0" / "best.ckpt")
+
+    trainer.reset()
+    assert trainer.current_epoch == 0
+    assert trainer.global_step == 0
+    assert not trainer.should_stop
+    assert trainer.early_stopping_callback is not early_stopping
+    assert trainer.early_stopping_callback.wait_count == 0
+    assert trainer.early_stopping_callback.best_score != 0.5
+    assert trainer.checkpoint_callback.dirpath is None
+    assert trainer.checkpoint_callback.best_model_path == ""
+    # The other callbacks are the same.
+    assert len(trainer.callbacks) == len(trainer._initial_callbacks)
+    assert trainer.progress_bar_callback is not None
+
+
+class _TinyModel(LightningModule):
+    def __init__(self):
+        super().__init__()
+        self.layer = nn.Linear(4, 1)
+        torch.manual_seed(123)
+        self.dataset = TensorDataset(torch.rand(32, 4), torch.rand(32, 1))
+
+    def training_step(self, batch, batch_idx):
+        x, y = batch
+        return F.mse_loss(self.layer(x), y)
+
+    def validation_step(self, batch, batch_idx):
+        x, y = batch
+        self.log("val/loss", F.mse_loss(self.layer(x), y))
+
+    def configure_optimizers(self):
+        return torch.optim.SGD(self.parameters(), lr=0.1)
+
+    def train_dataloader(self):
+        return DataLoader(self.dataset, batch_size=8)
+
+    def val_dataloader(self):
+        return DataLoader(self.dataset, batch_size=8)
+
+
+def test_trainer_can_fit_again_after_reset(tmp_path: Path):
+    """ A Trainer that was reset trains a new model the same way a new Trainer would. """
+    trainer = make_trainer(tmp_path)
+    trainer.fit(_TinyModel())
+    assert trainer.global_step == 4
+    trained_callbacks = list(trainer.callbacks)
+
+    trainer.reset()
+    assert trainer.global_step == 0
+    assert trainer.current_epoch == 0
+    assert trainer.train_dataloader is None
+    assert all(
+        callback is not trained_callback
+        for callback, trained_callback in zip(trainer.callbacks, trained_callbacks)
+        if isinstance(callback, (EarlyStopping, ModelCheckpoint))
+    )
+
+    model = _TinyModel()
+    initial_weight = model.layer.weight.detach().clone()
+    trainer.fit(model)
+    assert trainer.global_step == 4
+    assert not torch.equal(model.layer.weight, initial_weight)
@@ -2,10 +2,11 @@ import itertools
 import json
 import time
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from io import StringIO
 from pathlib import Path
-from typing import ClassVar, Dict, Optional, Type
+from typing import ClassVar, Dict, Iterator, Optional, Type
 
 import gym
 import tqdm
@@ -20,6 +21,7 @@ from sequoia.common.metrics import Metrics, MetricsType
 from sequoia.settings.base import Actions, Method, Setting
 from sequoia.settings.base.results import Results
 from sequoia.utils import add_prefix, get_logger
+from sequoia.utils.tracing import StepTracer, trace, tracing
 from sequoia.utils.utils import flag
 from wandb.wandb_run import Run
 from .base import AssumptionBase
@@ -120,22 +122,27 @@ class ContinualAssumption(AssumptionBase):
             self.wandb_run = self.setup_wandb(method)
             method.setup_wandb(self.wandb_run)
 
-        train_env = self.train_dataloader()
-        valid_env = self.val_dataloader()
+        with self.trace_run(method):
+            # NOTE: The envs are created within the traced block, so that the wrappers
+            # which report to the tracer are added to them.
+            train_env = self.train_dataloader()
+            valid_env = self.val_dataloader()
 
-        logger.info(f"Starting training")
-        method.set_training()
-        self._start_time = time.process_time()
+            logger.info(f"Starting training")
+            method.set_training()
+            self._start_time = time.process_time()
 
-        method.fit(
-            train_env=train_env, valid_env=valid_env,
-        )
-        train_env.close()
-        valid_env.close()
+            with trace("method/fit"):
+                method.fit(
+                    train_env=train_env, valid_env=valid_env,
+                )
+            train_env.close()
+            valid_env.close()
 
-        logger.info(f"Finished Training.")
+            logger.info(f"Finished Training.")
 
-        results = self.test_loop(method)
+            with trace("test_loop"):
+                results = self.test_loop(method)
 
         if self.monitor_training_performance:
             results._online_training_performance = train_env.get_online_performance()
@@ -150,6 +157,34 @@ class ContinualAssumption(AssumptionBase):
         self.log_results(method, results)
         return results
 
+    @contextmanager
+    def trace_run(self, method: Method) -> Iterator[Optional[StepTracer]]:
+        """ Traces the time spent in the env, the wrappers, the Method and the metrics
+        at each step of the run, when `config.trace_dir` is set.
+
+        At the end of the run, a summary of the traced spans is logged, and the trace
+        is saved in `config.trace_dir`, along with the summary and histograms of the
+        duration of each span (see `sequoia.utils.tracing`).
+        """
+        trace_dir: Optional[Path] = self.config.trace_dir if self.config else None
+        if not trace_dir:
+            yield None
+            return
+        with tracing(StepTracer()) as tracer:
+            try:
+                yield tracer
+            finally:
+                name = (
+                    f"{self.get_name()}_{method.get_name()}_"
+                    f"{time.strftime('%Y%m%d-%H%M%S')}"
+                )
+                trace_path = tracer.save_chrome_trace(trace_dir / f"{name}.trace.json")
+                tracer.save_summary(trace_dir / f"{name}.summary.json")
+                logger.info(
+                    f"Time spent in each phase of the run (trace saved at "
+                    f"{trace_path}):\n" + tracer.format_summary()
+                )
+
     def test_loop(self, method: Method) -> "IncrementalAssumption.Results":
         """ WIP: Continual test loop.
         """
@@ -218,12 +253,14 @@ class ContinualAssumption(AssumptionBase):
                             test_env.single_action_space, obs_batch_size
                         )
 
-                action = method.get_actions(obs, action_space)
+                with trace("method/get_actions"):
+                    action = method.get_actions(obs, action_space)
 
                 if test_env.is_closed():
                     break
 
-                obs, reward, done, info = test_env.step(action)
+                with trace("test_env/step"):
+                    obs, reward, done, info = test_env.step(action)
 
                 if done and not test_env.is_closed():
                     # logger.debug(f"end of test episode {episode}")
@@ -415,12 +452,15 @@ class TestEnvironment(gym.wrappers.Monitor, IterableWrapper[EnvType], ABC):
         except NotImplementedError:
             pass
 
-        if isinstance(self.env.unwrapped, VectorEnv):
-            done = all(done)
-        else:
-            done = bool(done)
-
-        done = self._after_step(observation_for_stats, reward_for_stats, done, info)
+        with trace("metrics/test"):
+            if isinstance(self.env.unwrapped, VectorEnv):
+                done = self._after_batched_step(
+                    observation_for_stats, reward_for_stats, done, info
+                )
+            else:
+                done = self._after_step(
+                    observation_for_stats, reward_for_stats, bool(done), info
+                )
 
         if self.get_total_steps() >= self.step_limit:
             done = True
@@ -432,6 +472,13 @@ class TestEnvironment(gym.wrappers.Monitor, IterableWrapper[EnvType], ABC):
 
         return observation, reward, done, info
 
+    def _after_batched_step(self, observation, reward, done, info) -> bool:
+        """ Called after each step of a vectorized env, with the `done` of each env.
+
+        By default, the batch is considered 'done' once all the envs are done.
+        Subclasses can override this to keep track of the episodes of each env.
+        """
+        return self._after_step(observation, reward, all(done), info)
 
 
 TestEnvironment.__test__ = False
@@ -1,13 +1,159 @@
 """ Results for an IID experiment. """
-from dataclasses import dataclass, field
-from typing import TypeVar, List, Dict, ClassVar, Generic
+from dataclasses import dataclass, fields
+from functools import wraps
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+)
+
 import matplotlib.pyplot as plt
+import numpy as np
+import torch
+from simple_parsing import field
+from simple_parsing.helpers import encode
+from torch import Tensor
+
 from sequoia.common.metrics import Metrics, EpisodeMetrics
 from sequoia.settings.base.results import Results
 
 MetricType = TypeVar("MetricType", bound=Metrics)
 
 
+def _discards_total(list_method: Callable) -> Callable:
+    @wraps(list_method)
+    def _method(self: "MetricsList", *args, **kwargs):
+        self._total = None
+        return list_method(self, *args, **kwargs)
+
+    return _method
+
+
+class MetricsList(List[MetricType]):
+    """ List of Metrics which keeps a running total of its items.
+
+    The total is updated as items are appended, so getting it is O(1) rather than
+    having to sum all the items every time. Any other modification of the list
+    discards the total, which is then recomputed the next time it is needed.
+
+    >>> from sequoia.common.metrics import EpisodeMetrics
+    >>> metrics = MetricsList([EpisodeMetrics(mean_episode_reward=1.0)])
+    >>> metrics.append(EpisodeMetrics(mean_episode_reward=3.0))
+    >>> metrics.total
+    EpisodeMetrics(n_samples=2, mean_episode_reward=2.0, mean_episode_length=0.0)
+    """
+
+    # NOTE: Class attribute, so that it also exists when unpickling.
+    _total: Optional[MetricType] = None
+
+    @property
+    def total(self) -> MetricType:
+        """ Sum of all the Metrics in the list. """
+        if self._total is None:
+            self._total = sum(self, Metrics())
+        return self._total
+
+    def append(self, metrics: MetricType) -> None:
+        super().append(metrics)
+        if self._total is not None:
+            self._total = self._total + metrics
+
+    def extend(self, metrics: Iterable[MetricType]) -> None:
+        metrics = list(metrics)
+        super().extend(metrics)
+        if self._total is not None:
+            self._total = sum(metrics, self._total)
+
+    def __iadd__(self, metrics: Iterable[MetricType]) -> "MetricsList[MetricType]":
+        self.extend(metrics)
+        return self
+
+    __setitem__ = _discards_total(list.__setitem__)
+    __delitem__ = _discards_total(list.__delitem__)
+    insert = _discards_total(list.insert)
+    pop = _discards_total(list.pop)
+    remove = _discards_total(list.remove)
+    clear = _discards_total(list.clear)
+    sort = _discards_total(list.sort)
+    reverse = _discards_total(list.reverse)
+
+
+def _encode_column(values: List[Any]) -> List[Any]:
+    if all(isinstance(v, (bool, int, float, np.number)) for v in values):
+        return np.asarray(values).tolist()
+    try:
+        if all(isinstance(v, Tensor) for v in values):
+            return torch.stack(values).cpu().numpy().tolist()
+        if all(isinstance(v, np.ndarray) for v in values):
+            return np.stack(values).tolist()
+    except (RuntimeError, ValueError):
+        pass  # Arrays of different shapes.
+    return [encode(v) for v in values]
+
+
+def encode_metrics_columns(metrics: List[Metrics]) -> Union[Dict, List]:
+    """ Encodes a list of Metrics of the same type as columns, with one list of values
+    per field, rather than as a list of dicts.
+
+    This is a lot faster to produce, and much more compact once saved to a file.
+
+    >>> from sequoia.common.metrics import EpisodeMetrics
+    >>> encoded = encode_metrics_columns(
+    ...     [EpisodeMetrics(mean_episode_reward=1.0), EpisodeMetrics(n_samples=2)]
+    ... )
+    >>> encoded["type"]
+    'EpisodeMetrics'
+    >>> encoded["columns"]["n_samples"]
+    [1, 2]
+    >>> encoded["columns"]["mean_episode_reward"]
+    [1.0, 0.0]
+    """
+    metrics_types = set(map(type, metrics))
+    if len(metrics_types) != 1:
+        # Empty list, or different types of Metrics, so we can't use columns.
+        return [encode(m) for m in metrics]
+    metrics_type = metrics_types.pop()
+    columns: Dict[str, List] = {}
+    for f in fields(metrics_type):
+        if f.metadata.get("to_dict", True):
+            columns[f.name] = _encode_column([getattr(m, f.name) for m in metrics])
+    return {"type": metrics_type.__name__, "columns": columns}
+
+
+def _get_metrics_type(name: str) -> Type[Metrics]:
+    subclasses = [Metrics]
+    for metrics_type in subclasses:
+        if metrics_type.__name__ == name:
+            return metrics_type
+        subclasses.extend(metrics_type.__subclasses__())
+    return Metrics
+
+
+def decode_metrics_columns(value: Union[Dict, List]) -> MetricsList:
+    """ Decodes a list of Metrics, encoded either as columns (see
+    `encode_metrics_columns`) or as a list of dicts.
+    """
+    metrics_type: Type[Metrics] = Metrics
+    if isinstance(value, dict):
+        metrics_type = _get_metrics_type(value["type"])
+        columns: Dict[str, List] = value["columns"]
+        value = [dict(zip(columns, row)) for row in zip(*columns.values())]
+    return MetricsList(
+        metrics_type.from_dict(item, drop_extra_fields=False)
+        if isinstance(item, dict)
+        else item
+        for item in value
+    )
+
+
 @dataclass
 class TaskResults(Results, Generic[MetricType]):
     """ Results within a given Task.
@@ -18,14 +164,16 @@ class TaskResults(Results, Generic[MetricType]):
     # SL) have higher => better
     lower_is_better: ClassVar[bool] = False
 
-    metrics: List[MetricType] = field(default_factory=list)
+    metrics: MetricsList[MetricType] = field(
+        default_factory=MetricsList,
+        encoding_fn=encode_metrics_columns,
+        decoding_fn=decode_metrics_columns,
+    )
     plots_dict: Dict[str, plt.Figure] = field(default_factory=dict)
 
     def __post_init__(self):
-        if self.metrics and isinstance(self.metrics[0], dict):
-            self.metrics = [
-                Metrics.from_dict(metrics, drop_extra_fields=False) for metrics in self.metrics
-            ]
+        if not isinstance(self.metrics, MetricsList):
+            self.metrics = decode_metrics_columns(self.metrics)
 
 
     def __str__(self) -> str:
@@ -38,6 +186,8 @@ class TaskResults(Results, Generic[MetricType]):
     @property
     def average_metrics(self) -> MetricType:
         """ Returns the average 'Metrics' object for this task. """
+        if isinstance(self.metrics, MetricsList):
+            return self.metrics.total
         return sum(self.metrics, Metrics())
 
     @property
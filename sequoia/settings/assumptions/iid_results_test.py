@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+import pytest
+import torch
+
+from sequoia.common.metrics import ClassificationMetrics, EpisodeMetrics, Metrics
+
+from .iid_results import MetricsList, TaskResults
+
+
+def classification_metrics(n: int, seed: int = 123) -> MetricsList[ClassificationMetrics]:
+    rng = np.random.default_rng(seed)
+    return MetricsList(
+        ClassificationMetrics(
+            y_pred=torch.as_tensor(rng.integers(0, 3, size=8)),
+            y=torch.as_tensor(rng.integers(0, 3, size=8)),
+            num_classes=3,
+        )
+        for _ in range(n)
+    )
+
+
+def test_running_total():
+    metrics = classification_metrics(10)
+    assert metrics.total == sum(metrics, Metrics())
+    metrics.append(classification_metrics(1, seed=1)[0])
+    assert metrics.total == sum(metrics, Metrics())
+    metrics += classification_metrics(2, seed=2)
+    assert metrics.total.n_samples == 13 * 8
+    assert metrics.total == sum(metrics, Metrics())
+    # Other modifications discard the total.
+    del metrics[0]
+    assert metrics.total.n_samples == 12 * 8
+    metrics[0] = ClassificationMetrics()
+    assert metrics.total == sum(metrics, Metrics())
+
+
+@pytest.mark.parametrize(
+    "metrics",
+    [
+        classification_metrics(5),
+        [EpisodeMetrics(mean_episode_reward=i, mean_episode_length=2 * i) for i in range(5)],
+        [],
+    ],
+)
+def test_task_results_serialization(metrics):
+    results = TaskResults(metrics=list(metrics))
+    assert isinstance(results.metrics, MetricsList)
+
+    encoded = results.to_dict()
+    if metrics:
+        # The metrics are stored as columns.
+        assert isinstance(encoded["metrics"], dict)
+        assert len(encoded["metrics"]["columns"]["n_samples"]) == len(metrics)
+
+    decoded = TaskResults.from_dict(json.loads(json.dumps(encoded)))
+    assert isinstance(decoded.metrics, MetricsList)
+    assert len(decoded.metrics) == len(metrics)
+    assert decoded.metrics == results.metrics
+    assert decoded.objective == results.objective
+
+
+def test_decode_list_of_dicts():
+    """ Results saved with one dict per Metrics can still be loaded. """
+    metrics = classification_metrics(3)
+    results = TaskResults.from_dict({"metrics": [m.to_dict() for m in metrics]})
+    assert results.metrics == metrics
+    assert results.average_metrics == metrics.total
@@ -1,14 +1,19 @@
+import dataclasses
+import hashlib
 import itertools
 import json
 import math
+import pickle
+import shutil
 import time
+import warnings
 from abc import ABC, abstractmethod
 from contextlib import redirect_stdout
 from dataclasses import dataclass
 from io import StringIO
 from itertools import accumulate, chain
 from pathlib import Path
-from typing import ClassVar, Dict, List, Optional, Sequence, Tuple, Type, TypeVar, Union
+from typing import Any, ClassVar, Dict, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 
 import gym
 import matplotlib.pyplot as plt
@@ -39,7 +44,9 @@ from sequoia.settings.base import (
     SettingABC,
 )
 from sequoia.utils import constant, flag, mean
+from sequoia.utils.generic_functions import concatenate
 from sequoia.utils.logging_utils import get_logger
+from sequoia.utils.tracing import trace
 from sequoia.utils.utils import add_prefix
 from .continual import ContinualAssumption, TestEnvironment
 from .incremental_results import IncrementalResults, TaskResults, TaskSequenceResults
@@ -93,6 +100,14 @@ class IncrementalAssumption(ContinualAssumption):
     # depending on other fields in __post_init__, or eventually be just 1.
     nb_tasks: int = field(5, alias=["n_tasks", "num_tasks"])
 
+    # Number of tasks whose test data is evaluated at the same time during the test
+    # loop. When greater than 1, the observations from the test environments of these
+    # tasks are concatenated, so that the Method's `get_actions` is called once for all
+    # of them. This is only used when the Method doesn't implement `test`, when it
+    # doesn't need to be informed of the task boundaries at test time, and when the
+    # setting can create one test environment per task (see `test_dataloaders`).
+    test_concurrent_tasks: int = 1
+
     # Attributes (not parsed through the command-line):
     _current_task_id: int = field(default=0, init=False)
 
@@ -172,8 +187,16 @@ class IncrementalAssumption(ContinualAssumption):
                 method.on_task_switch(task_id)
 
     def main_loop(self, method: Method) -> IncrementalResults:
-        """ Runs an incremental training loop, wether in RL or CL. """
-        # TODO: Add ways of restoring state to continue a given run?
+        """ Runs an incremental training loop, wether in RL or CL.
+
+        When `config.checkpoint_dir` is set and the Method implements the
+        `save_checkpoint` and `load_checkpoint` hooks, the state of the run is saved
+        after each task, and a run with the same configuration resumes after the last
+        task that was completed (see `save_checkpoint` and `load_checkpoint`).
+
+        When `config.trace_dir` is set, the time spent in each phase of the run is
+        traced and saved in that directory (see `trace_run`).
+        """
         # For each training task, for each test task, a list of the Metrics obtained
         # during testing on that task.
         # NOTE: We could also just store a single metric for each test task, but then
@@ -198,42 +221,58 @@ class IncrementalAssumption(ContinualAssumption):
 
         self._start_time = time.process_time()
 
-        for task_id in range(self.phases):
-            logger.info(
-                f"Starting training"
-                + (f" on task {task_id}." if self.nb_tasks > 1 else ".")
-            )
-            self.current_task_id = task_id
-            self.task_boundary_reached(method, task_id=task_id, training=True)
-
-            # Creating the dataloaders ourselves (rather than passing 'self' as
-            # the datamodule):
-            task_train_env = self.train_dataloader()
-            task_valid_env = self.val_dataloader()
+        first_task_id = 0
+        checkpoint_dir = self.get_checkpoint_dir(method)
+        checkpoint = self.load_checkpoint(method, checkpoint_dir) if checkpoint_dir else None
+        if checkpoint:
+            results = checkpoint["results"]
+            first_task_id = checkpoint["task_id"] + 1
+            # Also count the time spent on the tasks before the run was interrupted.
+            self._start_time -= checkpoint["runtime"]
+
+        with self.trace_run(method):
+            for task_id in range(first_task_id, self.phases):
+                logger.info(
+                    f"Starting training"
+                    + (f" on task {task_id}." if self.nb_tasks > 1 else ".")
+                )
+                self.current_task_id = task_id
+                with trace("method/task_boundary"):
+                    self.task_boundary_reached(method, task_id=task_id, training=True)
+
+                # Creating the dataloaders ourselves (rather than passing 'self' as
+                # the datamodule):
+                task_train_env = self.train_dataloader()
+                task_valid_env = self.val_dataloader()
+
+                with trace("method/fit"):
+                    method.fit(
+                        train_env=task_train_env, valid_env=task_valid_env,
+                    )
+                task_train_env.close()
+                task_valid_env.close()
 
-            method.fit(
-                train_env=task_train_env, valid_env=task_valid_env,
-            )
-            task_train_env.close()
-            task_valid_env.close()
+                if self.monitor_training_performance:
+                    results._online_training_performance.append(
+                        task_train_env.get_online_performance()
+                    )
 
-            if self.monitor_training_performance:
-                results._online_training_performance.append(
-                    task_train_env.get_online_performance()
-                )
+                logger.info(f"Finished Training on task {task_id}.")
+                with trace("test_loop"):
+                    test_metrics: TaskSequenceResults = self.test_loop(method)
 
-            logger.info(f"Finished Training on task {task_id}.")
-            test_metrics: TaskSequenceResults = self.test_loop(method)
+                # Add a row to the transfer matrix.
+                results.task_sequence_results.append(test_metrics)
+                logger.info(f"Resulting objective of Test Loop: {test_metrics.objective}")
 
-            # Add a row to the transfer matrix.
-            results.task_sequence_results.append(test_metrics)
-            logger.info(f"Resulting objective of Test Loop: {test_metrics.objective}")
+                if wandb.run:
+                    d = add_prefix(test_metrics.to_log_dict(), prefix="Test", sep="/")
+                    # d = add_prefix(test_metrics.to_log_dict(), prefix="Test", sep="/")
+                    d["current_task"] = task_id
+                    wandb.log(d)
 
-            if wandb.run:
-                d = add_prefix(test_metrics.to_log_dict(), prefix="Test", sep="/")
-                # d = add_prefix(test_metrics.to_log_dict(), prefix="Test", sep="/")
-                d["current_task"] = task_id
-                wandb.log(d)
+                if checkpoint_dir:
+                    self.save_checkpoint(method, results, task_id, checkpoint_dir)
 
         self._end_time = time.process_time()
         runtime = self._end_time - self._start_time
@@ -242,6 +281,102 @@ class IncrementalAssumption(ContinualAssumption):
         self.log_results(method, results)
         return results
 
+    def get_checkpoint_dir(self, method: Method) -> Optional[Path]:
+        """ Returns the directory where the state of the run is saved after each task,
+        or None if `config.checkpoint_dir` isn't set.
+
+        The name of the directory depends on the options of the Setting and of the
+        Method and on the random seed, so that only a run with the same configuration
+        can be resumed.
+        """
+        if not (self.config and self.config.checkpoint_dir):
+            return None
+        options = {
+            "setting": _get_options(self),
+            "method": _get_options(method),
+            "seed": self.config.seed,
+        }
+        digest = hashlib.blake2b(
+            json.dumps(options, sort_keys=True).encode(), digest_size=8
+        ).hexdigest()
+        name = f"{self.get_name()}_{method.get_full_name()}_{digest}"
+        return self.config.checkpoint_dir / name
+
+    def save_checkpoint(
+        self,
+        method: Method,
+        results: IncrementalResults,
+        task_id: int,
+        checkpoint_dir: Path,
+    ) -> None:
+        """ Saves the state of the Method, the results so far and the state of the
+        random number generators, once the training and testing on task `task_id`
+        are done.
+        """
+        task_dir = checkpoint_dir / f"task_{task_id}"
+        try:
+            (task_dir / "method").mkdir(parents=True, exist_ok=True)
+            method.save_checkpoint(task_dir / "method")
+            state = {
+                "task_id": task_id,
+                "results": results,
+                "runtime": time.process_time() - self._start_time,
+                "rng_state": self.config.get_rng_state(),
+            }
+            # NOTE: Replacing the previous state only once the new one is fully
+            # written, so that an interruption while saving doesn't leave a corrupted
+            # checkpoint behind.
+            temp_path = checkpoint_dir / "state.pkl.tmp"
+            with open(temp_path, "wb") as f:
+                pickle.dump(state, f)
+            temp_path.replace(checkpoint_dir / "state.pkl")
+        except NotImplementedError as exc:
+            shutil.rmtree(task_dir)
+            warnings.warn(
+                RuntimeWarning(
+                    f"Not saving the state of the run, so it won't be possible to "
+                    f"resume it: {exc}"
+                )
+            )
+            return
+        except Exception as exc:
+            logger.error(f"Unable to save a checkpoint after task {task_id}: {exc}")
+            return
+        # Remove the checkpoints of the Method from the previous tasks.
+        for path in checkpoint_dir.glob("task_*"):
+            if path != task_dir:
+                shutil.rmtree(path)
+        logger.info(f"Saved a checkpoint after task {task_id} in {checkpoint_dir}")
+
+    def load_checkpoint(
+        self, method: Method, checkpoint_dir: Path
+    ) -> Optional[Dict[str, Any]]:
+        """ Restores the state saved with `save_checkpoint` in a previous run, and
+        returns it. Returns None if there is no checkpoint in `checkpoint_dir`.
+        """
+        state_path = checkpoint_dir / "state.pkl"
+        if not state_path.exists():
+            return None
+        try:
+            with open(state_path, "rb") as f:
+                state: Dict[str, Any] = pickle.load(f)
+        except Exception as exc:
+            logger.warning(
+                f"Unable to load the checkpoint at {state_path}, starting over: {exc}"
+            )
+            return None
+        task_id: int = state["task_id"]
+        try:
+            method.load_checkpoint(checkpoint_dir / f"task_{task_id}" / "method")
+        except Exception as exc:
+            raise RuntimeError(
+                f"Unable to restore the state of the Method from the checkpoint in "
+                f"{checkpoint_dir}. (Delete this directory to start over.)"
+            ) from exc
+        self.config.set_rng_state(state["rng_state"])
+        logger.info(f"Resuming after task {task_id}, from the checkpoint in {checkpoint_dir}")
+        return state
+
     def test_loop(self, method: Method) -> "IncrementalAssumption.Results":
         """ (WIP): Runs an incremental test loop and returns the Results.
 
@@ -256,7 +391,21 @@ class IncrementalAssumption(ContinualAssumption):
 
         This `on_task_switch` 'callback' wrapper gets added the same way for
         Supervised or Reinforcement learning settings.
+
+        NOTE: When `self.test_concurrent_tasks` is greater than 1, the test data of
+        multiple tasks may be evaluated at the same time (see `evaluate_concurrently`).
         """
+        if self._can_evaluate_concurrently(method):
+            try:
+                test_envs = self.test_dataloaders()
+            except NotImplementedError:
+                logger.debug(
+                    f"Can't evaluate multiple tasks at the same time, since the setting "
+                    f"doesn't implement `test_dataloaders`."
+                )
+            else:
+                return self._concurrent_test_loop(method, test_envs)
+
         test_env = self.test_dataloader()
 
         test_env: TestEnvironment
@@ -359,7 +508,8 @@ class IncrementalAssumption(ContinualAssumption):
                             test_env.single_action_space, obs_batch_size
                         )
 
-                action = method.get_actions(obs, action_space)
+                with trace("method/get_actions"):
+                    action = method.get_actions(obs, action_space)
 
                 # logger.debug(f"action: {action}")
                 # TODO: Remove this:
@@ -371,7 +521,8 @@ class IncrementalAssumption(ContinualAssumption):
                 if test_env.is_closed():
                     break
 
-                obs, reward, done, info = test_env.step(action)
+                with trace("test_env/step"):
+                    obs, reward, done, info = test_env.step(action)
 
                 if done and not test_env.is_closed():
                     # logger.debug(f"end of test episode {episode}")
@@ -391,6 +542,47 @@ class IncrementalAssumption(ContinualAssumption):
         #     # TODO: move this wrapper to common/wrappers.
         #     test_env = RemoveTaskLabelsWrapper(test_env)
 
+    def test_dataloaders(
+        self, batch_size: int = None, num_workers: int = None
+    ) -> List[TestEnvironment]:
+        """ Returns one test environment per task, in order.
+
+        Settings which can split their test data by task can implement this, so that
+        the test loop can evaluate multiple tasks at the same time.
+        """
+        raise NotImplementedError
+
+    def _can_evaluate_concurrently(self, method: Method) -> bool:
+        if self.test_concurrent_tasks <= 1 or self.nb_tasks <= 1:
+            return False
+        if type(method).test is not Method.test:
+            # The method wants to arrange the test env itself.
+            return False
+        if self.known_task_boundaries_at_test_time and hasattr(method, "on_task_switch"):
+            # The method expects to be informed of each task switch, in order.
+            return False
+        return True
+
+    def _concurrent_test_loop(
+        self, method: Method, test_envs: Sequence[TestEnvironment]
+    ) -> TaskSequenceResults:
+        """ Evaluates the method on groups of `self.test_concurrent_tasks` test
+        environments at a time, and joins the results of each task, in order.
+        """
+        was_training = method.training
+        method.set_testing()
+
+        task_results: List[TaskResults] = []
+        for start in range(0, len(test_envs), self.test_concurrent_tasks):
+            envs = test_envs[start : start + self.test_concurrent_tasks]
+            evaluate_concurrently(method, envs)
+            for test_env in envs:
+                task_results.extend(test_env.get_results().task_results)
+
+        if was_training:
+            method.set_training()
+        return TaskSequenceResults(task_results=task_results)
+
     @abstractmethod
     def train_dataloader(
         self, *args, **kwargs
@@ -416,3 +608,62 @@ class IncrementalAssumption(ContinualAssumption):
 
     def _get_objective_scaling_factor(self) -> float:
         return 1.0
+
+
+def evaluate_concurrently(method: Method, test_envs: Sequence[TestEnvironment]) -> None:
+    """ Evaluates the method on all the given test environments at the same time.
+
+    At each step, the observations from the environments which aren't done yet are
+    concatenated, and `method.get_actions` is called once with the resulting batch.
+    The actions are then split and sent back to their respective environment. Each
+    environment is closed once it is done.
+    """
+    observations = [test_env.reset() for test_env in test_envs]
+    pending: List[int] = [i for i, obs in enumerate(observations) if obs is not None]
+
+    pbar = tqdm.tqdm(desc=f"Test ({len(test_envs)} envs)")
+    while pending:
+        batches = [observations[i] for i in pending]
+        batch_sizes = [obs.x.shape[0] for obs in batches]
+        # NOTE: Need to pass an action space that reflects the total batch size.
+        single_action_space = test_envs[pending[0]].single_action_space
+        action_space = batch_space(single_action_space, sum(batch_sizes))
+
+        with trace("method/get_actions"):
+            actions = method.get_actions(concatenate(batches), action_space)
+        if isinstance(actions, Actions):
+            actions = actions.y_pred
+        if isinstance(actions, Tensor):
+            actions = actions.detach().cpu().numpy()
+
+        still_pending: List[int] = []
+        offsets = [0] + list(accumulate(batch_sizes))
+        for i, start, end in zip(pending, offsets, offsets[1:]):
+            test_env = test_envs[i]
+            if test_env.is_closed():
+                continue
+            with trace("test_env/step"):
+                obs, reward, done, info = test_env.step(actions[start:end])
+            if test_env.is_closed():
+                continue
+            if done or obs is None:
+                test_env.close()
+            else:
+                observations[i] = obs
+                still_pending.append(i)
+        pending = still_pending
+        pbar.update()
+    pbar.close()
+
+
+def _get_options(obj: Any) -> Dict[str, str]:
+    """ Returns the representation of the value of each (init) field of a dataclass,
+    except for the config-related fields, which don't affect the results.
+    """
+    if not dataclasses.is_dataclass(obj):
+        return {}
+    return {
+        f.name: repr(getattr(obj, f.name))
+        for f in dataclasses.fields(obj)
+        if f.init and f.name not in {"config", "wandb"}
+    }
@@ -1,9 +1,13 @@
+import json
+from pathlib import Path
 from typing import List, Optional
 
 import gym
 import numpy as np
+import pytest
 from gym import Space
 from gym.vector.utils.spaces import batch_space
+from sequoia.common.config import Config
 from sequoia.methods import Method
 from sequoia.settings import Actions, Environment, Observations, Setting
 
@@ -109,3 +113,185 @@ class OtherDummyMethod(Method, target_setting=IncrementalAssumption):
         else:
             self.batch_sizes.append(0)  # X isn't batched.
         return action_space.sample()
+
+
+class _FakeTestEnv:
+    """ Minimal stand-in for a test environment, which records the actions it gets. """
+
+    single_action_space = gym.spaces.Discrete(100)
+
+    def __init__(self, batches: List[np.ndarray]):
+        self.batches = batches
+        self.actions: List[np.ndarray] = []
+        self._closed = False
+
+    def reset(self) -> IncrementalAssumption.Observations:
+        return IncrementalAssumption.Observations(x=self.batches[0])
+
+    def step(self, actions: np.ndarray):
+        self.actions.append(actions)
+        done = len(self.actions) == len(self.batches)
+        obs = None if done else IncrementalAssumption.Observations(
+            x=self.batches[len(self.actions)]
+        )
+        return obs, None, done, {}
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        self._closed = True
+
+
+class IdentityMethod(Method, target_setting=IncrementalAssumption):
+    """ Method which predicts the first feature of each observation. """
+
+    def __init__(self):
+        self.batch_sizes: List[int] = []
+
+    def fit(self, train_env: Environment, valid_env: Environment):
+        pass
+
+    def get_actions(self, observations: Observations, action_space: Space):
+        assert observations.x.shape[0] == action_space.shape[0]
+        self.batch_sizes.append(observations.x.shape[0])
+        return observations.x[:, 0].astype(int)
+
+
+def test_evaluate_concurrently():
+    """ The observations of the test envs are batched together, and each env gets the
+    actions corresponding to its own observations.
+    """
+    from .incremental import evaluate_concurrently
+
+    envs = [
+        _FakeTestEnv([np.full((4, 2), 10 * i + step) for step in range(n_steps)])
+        for i, n_steps in enumerate([3, 1, 2])
+    ]
+    method = IdentityMethod()
+    evaluate_concurrently(method, envs)
+
+    assert method.batch_sizes == [12, 8, 4]
+    for i, env in enumerate(envs):
+        assert env.is_closed()
+        assert [actions.tolist() for actions in env.actions] == [
+            [10 * i + step] * 4 for step in range(len(env.batches))
+        ]
+
+
+class InterruptedMethod(DummyMethod):
+    """ DummyMethod which raises an error when it starts training on a given task. """
+
+    def __init__(self, interrupt_on_task: int = None):
+        super().__init__()
+        self.interrupt_on_task = interrupt_on_task
+
+    def fit(self, train_env: gym.Env = None, valid_env: gym.Env = None):
+        if self.n_fit_calls == self.interrupt_on_task:
+            raise RuntimeError("Interrupted!")
+        super().fit(train_env=train_env, valid_env=valid_env)
+
+    def save_checkpoint(self, path: Path) -> None:
+        pass
+
+    def load_checkpoint(self, path: Path) -> None:
+        pass
+
+
+@pytest.mark.timeout(120)
+def test_resume_from_checkpoint(tmp_path: Path):
+    """ When `config.checkpoint_dir` is set, a run that was interrupted resumes after
+    the last task that was completed.
+    """
+    from sequoia.settings import IncrementalRLSetting
+
+    def make_setting() -> IncrementalRLSetting:
+        return IncrementalRLSetting(
+            dataset="cartpole", nb_tasks=3, train_max_steps=300, test_max_steps=300
+        )
+
+    config = Config(debug=True, seed=123, checkpoint_dir=tmp_path)
+    method = InterruptedMethod(interrupt_on_task=2)
+    with pytest.raises(RuntimeError, match="Interrupted!"):
+        make_setting().apply(method, config=config)
+    assert method.n_fit_calls == 2
+
+    method = InterruptedMethod()
+    results = make_setting().apply(method, config=config)
+    # Only the last task is trained on, and the results of the first two are kept.
+    assert method.n_fit_calls == 1
+    assert method.received_task_ids[0] == 2
+    assert len(results.objective_matrix) == 3
+    assert all(len(row) == 3 for row in results.objective_matrix)
+
+    # With a different configuration, the run starts over.
+    method = InterruptedMethod()
+    make_setting().apply(method, config=Config(debug=True, seed=456, checkpoint_dir=tmp_path))
+    assert method.n_fit_calls == 3
+
+
+@pytest.mark.timeout(120)
+def test_no_checkpoint_without_method_hooks(tmp_path: Path):
+    """ The state of the run isn't saved when the Method doesn't implement the
+    `save_checkpoint` and `load_checkpoint` hooks, so the run starts over.
+    """
+    from sequoia.settings import IncrementalRLSetting
+
+    def make_setting() -> IncrementalRLSetting:
+        return IncrementalRLSetting(
+            dataset="cartpole", nb_tasks=2, train_max_steps=200, test_max_steps=200
+        )
+
+    config = Config(debug=True, seed=123, checkpoint_dir=tmp_path)
+    with pytest.warns(RuntimeWarning, match="doesn't implement `save_checkpoint`"):
+        make_setting().apply(DummyMethod(), config=config)
+    assert not list(tmp_path.rglob("state.pkl"))
+    assert not list(tmp_path.rglob("task_*"))
+
+    method = DummyMethod()
+    make_setting().apply(method, config=config)
+    assert method.n_fit_calls == 2
+
+
+@pytest.mark.timeout(120)
+@pytest.mark.parametrize("setting_type, n_fit_calls", [("continual", 1), ("incremental", 2)])
+def test_trace_run(tmp_path: Path, setting_type: str, n_fit_calls: int):
+    """ When `config.trace_dir` is set, the time spent in the env, the wrappers, the
+    Method and the metrics is traced, and the trace is saved in that directory.
+    """
+    from sequoia.methods.random_baseline import RandomBaselineMethod
+    from sequoia.settings import ContinualRLSetting, IncrementalRLSetting
+
+    setting_class = {
+        "continual": ContinualRLSetting, "incremental": IncrementalRLSetting
+    }[setting_type]
+    setting = setting_class(
+        dataset="cartpole",
+        nb_tasks=2,
+        train_max_steps=200,
+        test_max_steps=200,
+        batch_size=2,
+    )
+    setting.apply(RandomBaselineMethod(), config=Config(debug=True, seed=123, trace_dir=tmp_path))
+
+    [trace_path] = tmp_path.glob("*.trace.json")
+    [summary_path] = tmp_path.glob("*.summary.json")
+    events = json.loads(trace_path.read_text())["traceEvents"]
+    summary = json.loads(summary_path.read_text())["summary"]
+    assert len(events) == sum(stats["count"] for stats in summary.values())
+    assert summary["method/fit"]["count"] == n_fit_calls
+    assert summary["test_loop"]["count"] == n_fit_calls
+    for name in [
+        "env/step",
+        "env_wrappers/step",
+        "method/get_actions",
+        "test_env/step",
+        "metrics/test",
+    ]:
+        assert summary[name]["count"] > 0
+    # The steps in the train env are traced, as well as those in the test env.
+    assert summary["env/step"]["count"] == (
+        setting.train_max_steps // setting.batch_size + summary["test_env/step"]["count"]
+    )
+    # The time spent in the env is part of the time spent in the wrappers around it.
+    assert summary["env/step"]["total_s"] <= summary["env_wrappers/step"]["total_s"]
@@ -473,6 +473,27 @@ class Method(Generic[SettingType], Parseable, ABC):
                 f"Unable to call `eval()` on nn.Modules of the Method: {exc}"
             )
 
+    def save_checkpoint(self, path: Path) -> None:
+        """Called by the Setting after each task when `config.checkpoint_dir` is set,
+        to save the state of the Method in the (existing) directory at `path`.
+
+        Methods have to override this (as well as `load_checkpoint`) for their runs to
+        be resumable. By default, this raises a NotImplementedError, in which case the
+        Setting doesn't save the state of the run.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} doesn't implement `save_checkpoint`."
+        )
+
+    def load_checkpoint(self, path: Path) -> None:
+        """Restores the state of the Method saved with `save_checkpoint`.
+
+        This is called by the Setting when resuming a run, after `configure`.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} doesn't implement `load_checkpoint`."
+        )
+
     @property
     def training(self) -> bool:
         """Wether we're currently in the 'training' phase.
@@ -52,6 +52,7 @@ from sequoia.common.batch import Batch
 from sequoia.common.gym_wrappers.batch_env import AsyncVectorEnv, BatchedVectorEnv
 from sequoia.common.gym_wrappers.utils import StepResult, has_wrapper
 from sequoia.common.gym_wrappers.policy_env import PolicyEnv
+from sequoia.common.spaces.validation import SpaceChecker
 from sequoia.common.gym_wrappers.convert_tensors import (
     has_tensor_support,
     add_tensor_support,
@@ -128,6 +129,7 @@ class GymDataLoader(
         dataset: Union[EnvDataset, PolicyEnv] = None,
         batch_size: int = None,
         num_workers: int = None,
+        space_check_every: int = 1,
         **kwargs,
     ):
         assert not (
@@ -169,6 +171,8 @@ class GymDataLoader(
         # that pytorch-lightning stops warning us that the num_workers is too low.
         self._batch_size = batch_size
         self._num_workers = num_workers
+        # Only checks one out of every `space_check_every` actions, when greater than 1.
+        self._action_checker = SpaceChecker(check_every=space_check_every)
         super().__init__(
             dataset=self.env,
             # The batch size is None, because the VecEnv takes care of
@@ -348,7 +352,10 @@ class GymDataLoader(
             action, np.ndarray
         ):
             action = action.tolist()
-        assert action in self.env.action_space, (action, self.env.action_space)
+        assert self._action_checker(action, self.env.action_space), (
+            action,
+            self.env.action_space,
+        )
         return super().send(action)
         # self.action_ = action
         # self.observation_, self.reward_, self.done_, self.info_ = su(action)
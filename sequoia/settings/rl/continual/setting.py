@@ -38,6 +38,8 @@ from sequoia.common.gym_wrappers.batch_env.tile_images import tile_images
 from sequoia.common.gym_wrappers.convert_tensors import add_tensor_support
 from sequoia.common.gym_wrappers.env_dataset import EnvDataset
 from sequoia.common.gym_wrappers.episode_limit import EpisodeLimit
+from sequoia.common.gym_wrappers.fused import fuse_wrappers
+from sequoia.common.gym_wrappers.trace import add_trace_wrapper
 from sequoia.common.gym_wrappers.pixel_observation import (
     ImageObservations,
     PixelObservationWrapper,
@@ -240,6 +242,12 @@ class ContinualRLSetting(RLSetting, ContinualAssumption):
     # (as does the baseline method).
     add_done_to_observations: bool = False
 
+    # Wether to 'fuse' the wrappers that only transform the observations, actions or
+    # rewards of the environments, so that their transforms get applied by a single
+    # wrapper at each step. The wrappers are still present, which reduces the per-step
+    # overhead of the wrappers without changing the resulting environments.
+    fuse_env_wrappers: bool = False
+
     # The maximum number of steps per episode. When None, there is no limit.
     max_episode_steps: Optional[int] = None
 
@@ -931,7 +939,9 @@ class ContinualRLSetting(RLSetting, ContinualAssumption):
         env_factory = partial(
             self._make_env,
             base_env=self.train_dataset,
-            wrappers=self.train_wrappers,
+            wrappers=_split_task_schedule_between_envs(
+                self.train_wrappers, batch_size, base_env=self.train_dataset
+            ),
             **self.base_env_kwargs,
         )
         env_dataloader = self._make_env_dataloader(
@@ -990,15 +1000,18 @@ class ContinualRLSetting(RLSetting, ContinualAssumption):
         self._has_setup_validate = False
         self.setup("validate")
 
+        batch_size = batch_size or self.batch_size
         env_factory = partial(
             self._make_env,
             base_env=self.val_dataset,
-            wrappers=self.valid_wrappers,
+            wrappers=_split_task_schedule_between_envs(
+                self.valid_wrappers, batch_size, base_env=self.val_dataset
+            ),
             **self.base_env_kwargs,
         )
         env_dataloader = self._make_env_dataloader(
             env_factory,
-            batch_size=batch_size or self.batch_size,
+            batch_size=batch_size,
             num_workers=num_workers if num_workers is not None else self.num_workers,
             max_steps=self.steps_per_phase,
             # TODO: Create a new property to limit validation episodes?
@@ -1058,30 +1071,14 @@ class ContinualRLSetting(RLSetting, ContinualAssumption):
         # between tasks.
         self._has_setup_test = False
         self.setup("test")
-        # BUG: gym.wrappers.Monitor doesn't want to play nice when applied to
-        # Vectorized env, it seems..
-        # FIXME: Remove this when the Monitor class works correctly with
-        # batched environments.
         batch_size = batch_size or self.batch_size
-        if batch_size is not None:
-            logger.warning(
-                UserWarning(
-                    colorize(
-                        f"WIP: Only support batch size of `None` (i.e., a single env) "
-                        f"for the test environments of RL Settings at the moment, "
-                        f"because the Monitor class from gym doesn't work with "
-                        f"VectorEnvs. (batch size was {batch_size})",
-                        "yellow",
-                    )
-                )
-            )
-            batch_size = None
-
         num_workers = num_workers if num_workers is not None else self.num_workers
         env_factory = partial(
             self._make_env,
             base_env=self.test_dataset,
-            wrappers=self.test_wrappers,
+            wrappers=_split_task_schedule_between_envs(
+                self.test_wrappers, batch_size, base_env=self.test_dataset
+            ),
             **self.base_env_kwargs,
         )
         # TODO: Pass the max_steps argument to this `_make_env_dataloader` method,
@@ -1183,6 +1180,9 @@ class ContinualRLSetting(RLSetting, ContinualAssumption):
             f"batch_size: {batch_size}, num_workers: {num_workers}, seed: {seed}"
         )
 
+        if self.fuse_env_wrappers:
+            env_factory = partial(_make_fused_env, env_factory)
+
         env: Union[gym.Env, gym.vector.VectorEnv]
         if batch_size is None:
             env = env_factory()
@@ -1194,6 +1194,9 @@ class ContinualRLSetting(RLSetting, ContinualAssumption):
                 # TODO: Still debugging shared memory + custom spaces (e.g. Sparse).
                 shared_memory=False,
             )
+        # When tracing, record the time spent in the (possibly vectorized) env itself,
+        # so that it can be compared with the time spent in all the wrappers below.
+        env = add_trace_wrapper(env, name="env")
         if max_steps:
             env = ActionLimit(env, max_steps=max_steps)
         if max_episodes:
@@ -1221,11 +1224,16 @@ class ContinualRLSetting(RLSetting, ContinualAssumption):
             rewards_type=self.Rewards,
             actions_type=self.Actions,
         )
+        if self.fuse_env_wrappers:
+            env = fuse_wrappers(env)
+        env = add_trace_wrapper(env, name="env_wrappers")
         # Create an IterableDataset from the env using the EnvDataset wrapper.
         dataset = EnvDataset(env)
 
         # Create a GymDataLoader for the EnvDataset.
-        env_dataloader = GymDataLoader(dataset)
+        env_dataloader = GymDataLoader(
+            dataset, space_check_every=self.config.space_check_every
+        )
 
         if batch_size and seed:
             # Seed each environment with its own seed (based on the base seed).
@@ -1550,3 +1558,80 @@ def find_matching_dataset(
     )
     # assert False, (dataset, closest_matches)
 
+
+def _split_task_schedule_between_envs(
+    wrappers: List[Callable[[gym.Env], gym.Env]],
+    batch_size: Optional[int],
+    base_env: Any = None,
+) -> List[Callable[[gym.Env], gym.Env]]:
+    """ Rescales the task schedules of the `MultiTaskEnvironment` wrappers, so that
+    each of the `batch_size` envs of a vectorized env goes through all the tasks,
+    while the total number of steps across all the envs stays the same.
+
+    Other wrappers are returned unchanged. Raises a RuntimeError if two tasks of a
+    schedule would start at the same step once rescaled, since one of them would then
+    be dropped.
+
+    NOTE: The envs of a `MultiEnvWrapper` (the `base_env` in multi-env Incremental RL)
+    switch tasks when they are done, rather than after a given number of steps, so
+    there is nothing to split. A warning is shown, since each env of the batch goes
+    through those tasks on its own.
+    """
+    if not batch_size:
+        return wrappers
+    from sequoia.settings.rl.discrete.multienv_wrappers import MultiEnvWrapper
+
+    if isinstance(base_env, MultiEnvWrapper):
+        warnings.warn(
+            RuntimeWarning(
+                f"The envs of each task aren't split between the {batch_size} envs of "
+                f"the batch: each env goes through the tasks of {base_env} on its own."
+            )
+        )
+    new_wrappers: List[Callable[[gym.Env], gym.Env]] = []
+    for wrapper in wrappers:
+        if (
+            isinstance(wrapper, partial)
+            and isinstance(wrapper.func, type)
+            and issubclass(wrapper.func, MultiTaskEnvironment)
+        ):
+            kwargs = wrapper.keywords.copy()
+            if kwargs.get("task_schedule"):
+                kwargs["task_schedule"] = _rescale_task_schedule(
+                    kwargs["task_schedule"], batch_size
+                )
+            for key in ["starting_step", "max_steps"]:
+                if kwargs.get(key):
+                    kwargs[key] = kwargs[key] // batch_size
+            wrapper = partial(wrapper.func, *wrapper.args, **kwargs)
+        new_wrappers.append(wrapper)
+    return new_wrappers
+
+
+def _rescale_task_schedule(task_schedule: Dict[int, Any], batch_size: int) -> Dict[int, Any]:
+    """ Divides the steps of the task schedule by `batch_size`.
+
+    Raises a RuntimeError if two tasks end up starting at the same step.
+    """
+    new_task_schedule: Dict[int, Any] = {}
+    old_steps: Dict[int, int] = {}
+    for step, task in task_schedule.items():
+        new_step = step // batch_size
+        if new_step in new_task_schedule:
+            raise RuntimeError(
+                f"Can't split the task schedule between {batch_size} envs: the tasks "
+                f"at steps {old_steps[new_step]} and {step} would both start at step "
+                f"{new_step} of each env. Use a smaller batch size, or tasks that are "
+                f"at least {batch_size} steps long."
+            )
+        new_task_schedule[new_step] = task
+        old_steps[new_step] = step
+    return new_task_schedule
+
+
+def _make_fused_env(env_factory: Callable[[], gym.Env]) -> gym.Env:
+    """ Creates an env with `env_factory` and fuses its wrappers (see `fuse_wrappers`).
+
+    NOTE: This is a module-level function so that the env factory stays pickleable.
+    """
+    return fuse_wrappers(env_factory())
@@ -32,7 +32,12 @@ from sequoia.settings.assumptions.incremental_test import DummyMethod as _DummyM
 from sequoia.settings.rl.setting_test import CheckAttributesWrapper, DummyMethod
 from sequoia.utils.utils import pairwise, take
 
-from .setting import ContinualRLSetting, TaskSchedule, make_continuous_task
+from .setting import (
+    ContinualRLSetting,
+    TaskSchedule,
+    _split_task_schedule_between_envs,
+    make_continuous_task,
+)
 
 
 @pytest.mark.parametrize(
@@ -480,18 +485,12 @@ class TestContinualRLSetting:
                 check_obs(iter_obs)
                 _ = env.send(env.action_space.sample())
 
-        # NOTE: Limitting the batch size at test time to None (i.e. a single env)
-        # because of how the Monitor class works atm.
-        batch_size = None
-        expected_batched_x_space = expected_x_space
-        expected_batched_action_space = expected_action_space
-
         # NOTE: Need to make sure that the 'directory' passed to the Monitor
         # wrapper is a temp dir. Should be the case, but just checking.
         assert setting.config.log_dir != Path("results")
 
         with setting.test_dataloader(batch_size=batch_size, num_workers=0) as env:
-            assert env.batch_size is None
+            assert env.batch_size == batch_size
             check_env_spaces(env)
 
             reset_obs = env.reset()
@@ -643,6 +642,90 @@ def test_passing_task_schedule_sets_other_attributes_correctly():
     # assert setting.test_steps_per_task == 100
 
 
+def test_split_task_schedule_between_envs():
+    from sequoia.common.gym_wrappers import MultiTaskEnvironment
+
+    task_schedule = {0: {"gravity": 5.0}, 100: {"gravity": 10.0}, 200: {"gravity": 20.0}}
+    wrappers = [
+        partial(MultiTaskEnvironment, task_schedule=task_schedule, max_steps=300),
+        TransformObservation,
+    ]
+    new_wrappers = _split_task_schedule_between_envs(wrappers, batch_size=4)
+    assert new_wrappers[0].keywords["task_schedule"] == {
+        0: {"gravity": 5.0},
+        25: {"gravity": 10.0},
+        50: {"gravity": 20.0},
+    }
+    assert new_wrappers[0].keywords["max_steps"] == 75
+    assert new_wrappers[1] is TransformObservation
+    assert _split_task_schedule_between_envs(wrappers, batch_size=None) is wrappers
+
+    # Two tasks that would start at the same step: one of them would be dropped.
+    with pytest.raises(RuntimeError, match="Can't split the task schedule"):
+        _split_task_schedule_between_envs(wrappers, batch_size=150)
+
+
+def test_split_task_schedule_warns_with_multienv_base_env():
+    from sequoia.settings.rl.discrete.multienv_wrappers import ConcatEnvsWrapper
+
+    base_env = ConcatEnvsWrapper([gym.make("CartPole-v0"), gym.make("CartPole-v0")])
+    with pytest.warns(RuntimeWarning, match="aren't split between the 2 envs"):
+        _split_task_schedule_between_envs([], batch_size=2, base_env=base_env)
+
+
+def test_batched_train_env_goes_through_all_tasks():
+    """ With a batched train env, each env of the batch goes through the whole task
+    schedule, in `train_max_steps // batch_size` steps.
+    """
+    from sequoia.common.gym_wrappers import MultiTaskEnvironment
+
+    batch_size = 2
+    setting = ContinualRLSetting(
+        dataset="CartPole-v0",
+        train_max_steps=200,
+        test_max_steps=200,
+        batch_size=batch_size,
+        num_workers=0,
+    )
+    setting.setup()
+    train_env = setting.train_dataloader()
+    task_envs: List[MultiTaskEnvironment] = []
+    for env in train_env.unwrapped.envs:
+        while not isinstance(env, MultiTaskEnvironment):
+            env = env.env
+        task_envs.append(env)
+
+    expected_schedule = {
+        step // batch_size: task for step, task in setting.train_task_schedule.items()
+    }
+    for task_env in task_envs:
+        assert task_env.task_schedule == expected_schedule
+
+    train_env.reset()
+    for _ in range(setting.train_max_steps // batch_size):
+        train_env.step(train_env.action_space.sample())
+    # Each env reached the start of the last task.
+    assert all(task_env.steps == max(expected_schedule) for task_env in task_envs)
+    train_env.close()
+
+
+def test_space_check_every_is_passed_to_the_env():
+    from sequoia.settings.rl.continual.environment import GymDataLoader
+
+    setting = ContinualRLSetting(
+        dataset="CartPole-v0",
+        train_max_steps=200,
+        test_max_steps=200,
+        config=Config(space_check_every=3),
+    )
+    setting.setup()
+    env = setting.train_dataloader()
+    while not isinstance(env, GymDataLoader):
+        env = env.env
+    assert env._action_checker.check_every == 3
+    env.close()
+
+
 def test_fit_and_on_task_switch_calls():
     setting = ContinualRLSetting(
         dataset="CartPole-v0",
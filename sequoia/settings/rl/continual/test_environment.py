@@ -1,8 +1,9 @@
 from sequoia.settings.assumptions.continual import TestEnvironment, ContinualResults
-from typing import Dict
+from typing import Dict, List
 import math
 from sequoia.common.metrics.rl_metrics import EpisodeMetrics
 import itertools
+import numpy as np
 from sequoia.common.gym_wrappers.batch_env.tile_images import tile_images
 
 # TODO: Refactor those so they are based on the MeasureRLPerformanceWrapper, which works
@@ -15,9 +16,62 @@ class ContinualRLTestEnvironment(TestEnvironment):
         self.boundary_steps = [
             step // (self.batch_size or 1) for step in self.task_schedule.keys()
         ]
+        # When the env is vectorized, the Monitor's stats recorder can't be used, so we
+        # keep track of the episodes of each env here instead.
+        self.num_envs = self.env.unwrapped.num_envs if self.is_vectorized else 1
+        self._batched_steps = 0
+        self._current_episode_rewards = np.zeros(self.num_envs)
+        self._current_episode_lengths = np.zeros(self.num_envs, dtype=int)
+        self._episode_rewards: List[float] = []
+        self._episode_lengths: List[int] = []
+        self._episode_end_steps: List[int] = []
 
     def __len__(self):
-        return math.ceil(self.step_limit / (getattr(self.env, "batch_size", 1) or 1))
+        # NOTE: When the env is batched, the `step_limit` is already a number of
+        # batched steps.
+        return self.step_limit
+
+    def get_total_steps(self) -> int:
+        if self.is_vectorized:
+            return self._batched_steps
+        return super().get_total_steps()
+
+    def get_episode_rewards(self) -> List[float]:
+        if self.is_vectorized:
+            return self._episode_rewards
+        return super().get_episode_rewards()
+
+    def get_episode_lengths(self) -> List[int]:
+        if self.is_vectorized:
+            return self._episode_lengths
+        return super().get_episode_lengths()
+
+    def get_episode_end_steps(self) -> List[int]:
+        """ Returns the step at which each episode ended, in the same units as the keys
+        of the task schedule (i.e. the total number of steps across all the envs).
+        """
+        if self.is_vectorized:
+            return self._episode_end_steps
+        return list(itertools.accumulate(self.get_episode_lengths()))
+
+    def _after_batched_step(self, observation, reward, done, info) -> bool:
+        done = np.asarray(done, dtype=bool)
+        if not self.enabled:
+            return bool(done.all())
+        self._batched_steps += 1
+        self._current_episode_rewards += np.asarray(reward, dtype=float)
+        self._current_episode_lengths += 1
+        # The envs within the batch each go through the (scaled) task schedule, so the
+        # `i`-th batched step corresponds to step `i * num_envs` of the task schedule.
+        end_step = self._batched_steps * self.num_envs
+        for env_index in np.flatnonzero(done):
+            self._episode_rewards.append(float(self._current_episode_rewards[env_index]))
+            self._episode_lengths.append(int(self._current_episode_lengths[env_index]))
+            self._episode_end_steps.append(end_step)
+        self._current_episode_rewards[done] = 0
+        self._current_episode_lengths[done] = 0
+        self.video_recorder.capture_frame()
+        return bool(done.all())
 
     def get_results(self) -> ContinualResults[EpisodeMetrics]:
         # TODO: Place the metrics in the right 'bin' at the end of each episode during
@@ -36,7 +90,7 @@ class ContinualRLTestEnvironment(TestEnvironment):
 
         test_results = ContinualResults()
         for step, episode_reward, episode_length in zip(
-            itertools.accumulate(lengths), rewards, lengths
+            self.get_episode_end_steps(), rewards, lengths
         ):
             # Given the step, find the task id.
             episode_metric = EpisodeMetrics(
@@ -55,5 +109,7 @@ class ContinualRLTestEnvironment(TestEnvironment):
         return image_batch
 
     def _after_reset(self, observation):
-        # Is this going to work fine when the observations are batched though?
+        # Episodes that were in progress in the vectorized env are discarded.
+        self._current_episode_rewards[:] = 0
+        self._current_episode_lengths[:] = 0
         return super()._after_reset(observation)
@@ -4,7 +4,8 @@ These wrappers can be used to get different kinds of multi-task environments, or
 concatenate environments.
 """
 from abc import ABC, abstractmethod
-from typing import Any, Callable, List, Optional, Sequence, Union
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
 
 import gym
 import numpy as np
@@ -32,26 +33,101 @@ class MultiEnvWrapper(IterableWrapper, ABC):
 
     Could look a little bit like this:
     https://github.com/rlworkgroup/garage/blob/master/src/garage/envs/multi_env_wrapper.py
+
+    The envs that are passed as a string or as a callable are only created when their
+    task is first used, and are seeded at that point with a seed derived from the one
+    passed to `seed`. When `max_live_envs` is set, at most that many of these envs are
+    kept alive at any given time: the least recently used ones get closed, and will be
+    re-created (and re-seeded) if their task is used again.
+    NOTE: Any state in the wrappers of an env that gets closed this way is lost, so
+    this should only be used with envs that can be re-created from scratch.
     """
 
-    def __init__(self, envs: List[gym.Env], add_task_ids: bool = False):
+    def __init__(
+        self,
+        envs: List[Union[str, gym.Env, Callable[[], gym.Env]]],
+        add_task_ids: bool = False,
+        max_live_envs: Optional[int] = None,
+    ):
         self._envs = envs.copy()
+        # The env (or the env constructor) passed for each task.
+        self._env_fns = envs.copy()
         self._current_task_id = 0
         self.nb_tasks = len(envs)
         self._envs_is_closed: Sequence[bool] = np.zeros([self.nb_tasks], dtype=bool)
         self._add_task_labels = add_task_ids
         self.rng: np.random.Generator = np.random.default_rng()
+        self.max_live_envs = max_live_envs
+        # Indices of the envs created by this wrapper that are still open, from the
+        # least to the most recently used.
+        self._live_envs: "OrderedDict[int, None]" = OrderedDict()
+        # Seed of each env, set in `seed`, and how many times each env was created.
+        self._env_seeds: Optional[List[int]] = None
+        self._n_instantiations: List[int] = [0 for _ in range(self.nb_tasks)]
+        # Observation space of each env, with the task labels added if needed.
+        self._observation_spaces: Dict[int, gym.Space] = {}
 
         self._instantiate_env(self._current_task_id)
         super().__init__(env=self._envs[self._current_task_id])
         self.task_label_space = spaces.Discrete(self.nb_tasks)
-        if self._add_task_labels:
-            self.observation_space = add_task_labels(
-                self.env.observation_space, self.task_label_space
-            )
+        self.observation_space = self._get_observation_space(self._current_task_id)
+
+    def _is_instantiated(self, index: int) -> bool:
+        return isinstance(self._envs[index], gym.Env)
 
     def _instantiate_env(self, index: int) -> None:
-        self._envs[index] = instantiate_env(self._envs[index])
+        if self._is_instantiated(index):
+            if index in self._live_envs:
+                self._live_envs.move_to_end(index)
+            return
+        env = instantiate_env(self._env_fns[index])
+        if self._env_seeds is not None:
+            env.seed(self._get_env_seed(index))
+        self._n_instantiations[index] += 1
+        self._envs[index] = env
+        self._live_envs[index] = None
+        self._close_idle_envs(keep=index)
+
+    def _get_env_seed(self, index: int) -> int:
+        """ Returns the seed to use for the env at index `index`, which only depends on
+        the seed passed to `seed` and on how many times that env was created.
+        """
+        assert self._env_seeds is not None
+        if self._n_instantiations[index] == 0:
+            return self._env_seeds[index]
+        rng = np.random.default_rng(
+            [self._env_seeds[index], self._n_instantiations[index]]
+        )
+        return int(rng.integers(0, 1e8))
+
+    def _close_idle_envs(self, keep: int) -> None:
+        """ Closes the least recently used envs, until there are at most
+        `max_live_envs` of them.
+        """
+        if self.max_live_envs is None:
+            return
+        idle_envs = [index for index in self._live_envs if index != keep]
+        while len(self._live_envs) > self.max_live_envs and idle_envs:
+            index = idle_envs.pop(0)
+            env = self._envs[index]
+            if isinstance(env, MayCloseEarly) and env.is_closed():
+                # The env is done, rather than idle: It won't be re-created.
+                self._envs_is_closed[index] = True
+            logger.debug(f"Closing the idle env at index {index}.")
+            self._live_envs.pop(index)
+            env.close()
+            # NOTE: The env will be re-created if its task is used again.
+            self._envs[index] = self._env_fns[index]
+
+    def _get_observation_space(self, index: int) -> gym.Space:
+        if index not in self._observation_spaces:
+            observation_space = self._envs[index].observation_space
+            if self._add_task_labels:
+                observation_space = add_task_labels(
+                    observation_space, self.task_label_space
+                )
+            self._observation_spaces[index] = observation_space
+        return self._observation_spaces[index]
 
     def set_task(self, task_id: int) -> None:
         if self.is_closed(env_index=None):
@@ -59,16 +135,18 @@ class MultiEnvWrapper(IterableWrapper, ABC):
                 f"Can't call set_task on the env, since it's already closed."
             )
         self._current_task_id = task_id
-        # Use super().__init__() to reset the `self.env` attribute in gym.Wrapper.
-        # TODO: This also resets the '_is_closed' on self.
-        # TODO: This resets the 'observation_' and 'action_' etc objects that are saved
-        # in the constructor of the 'IterableWrapper'
-        self._instantiate_env(self._current_task_id)
-        gym.Wrapper.__init__(self, env=self._envs[self._current_task_id])
-        if self._add_task_labels:
-            self.observation_space = add_task_labels(
-                self.env.observation_space, self.task_label_space
-            )
+        self._instantiate_env(task_id)
+        env = self._envs[task_id]
+        if env is self.env:
+            return
+        # NOTE: Only swapping the wrapped env and its spaces, rather than calling
+        # `gym.Wrapper.__init__` again, so the other attributes of this wrapper (e.g.
+        # `_is_closed`) are preserved.
+        self.env = env
+        self.action_space = env.action_space
+        self.reward_range = env.reward_range
+        self.metadata = env.metadata
+        self.observation_space = self._get_observation_space(task_id)
 
     @abstractmethod
     def next_task(self) -> int:
@@ -123,7 +201,9 @@ class MultiEnvWrapper(IterableWrapper, ABC):
             ):
                 if not env_is_closed:
                     self._envs_is_closed[env_index] = True
-                    env.close()
+                    if self._is_instantiated(env_index):
+                        env.close()
+            self._live_envs.clear()
             # BUG: Not sure why this is actually causing a recursion error.. The idea
             # was to call `MayCloseEarly.close()`.
             # super().close()
@@ -132,7 +212,9 @@ class MultiEnvWrapper(IterableWrapper, ABC):
             if self._envs_is_closed[env_index]:
                 raise RuntimeError(f"Env at index {env_index} is already closed...")
             self._envs_is_closed[env_index] = True
-            self._envs[env_index].close()
+            self._live_envs.pop(env_index, None)
+            if self._is_instantiated(env_index):
+                self._envs[env_index].close()
 
     def seed(self, seed: Optional[int] = None) -> List[int]:
         """Sets the seed for this env's random number generator(s).
@@ -148,18 +230,22 @@ class MultiEnvWrapper(IterableWrapper, ABC):
             "main" seed, or the value which a reproducer should pass to
             'seed'. Often, the main seed equals the provided 'seed', but
             this won't be true if seed=None, for example.
+
+        NOTE: The envs which haven't been created yet aren't created here. They are
+        seeded when they get created, hence only the seeds of the envs which are
+        currently instantiated are included (after the seed of each env).
         """
         self.rng = np.random.default_rng(seed)
-        env_seeds = self.rng.integers(0, 1e8, size=len(self._envs)).tolist()
-        seeds = env_seeds.copy()
-        for index, env_seed in enumerate(env_seeds):
-            # NOTE: Would be nice to be able to NOT instantiate all the envs and just
-            # seed them when they get created, but then we wouldn't be able to return
-            # the seeds from all envs here (which I'm not 100% sure its thaaat useful..)
-            self._instantiate_env(index)
-            env = self._envs[index]
-            env_seeds: Optional[List[int]] = env.seed(env_seed)
-            seeds.extend(env_seeds or [])
+        self._env_seeds = self.rng.integers(0, 1e8, size=len(self._envs)).tolist()
+        self._n_instantiations = [0 for _ in range(self.nb_tasks)]
+        seeds = self._env_seeds.copy()
+        for index in range(self.nb_tasks):
+            if self._is_instantiated(index) and not self._envs_is_closed[index]:
+                env_seeds: Optional[List[int]] = self._envs[index].seed(
+                    self._get_env_seed(index)
+                )
+                self._n_instantiations[index] = 1
+                seeds.extend(env_seeds or [])
         return seeds
 
     def observation(self, observation):
@@ -180,8 +266,9 @@ class ConcatEnvsWrapper(MultiEnvWrapper):
         envs: List[gym.Env],
         add_task_ids: bool = False,
         on_task_switch_callback: Callable[[Optional[int]], Any] = None,
+        max_live_envs: Optional[int] = None,
     ):
-        super().__init__(envs, add_task_ids=add_task_ids)
+        super().__init__(envs, add_task_ids=add_task_ids, max_live_envs=max_live_envs)
         self.on_task_switch_callback = on_task_switch_callback
 
     def set_task(self, task_id: int) -> None:
@@ -226,8 +313,8 @@ class RoundRobinWrapper(MultiEnvWrapper):
     round-robin fashion.
     """
 
-    def __init__(self, envs, add_task_ids=False):
-        super().__init__(envs, add_task_ids=add_task_ids)
+    def __init__(self, envs, add_task_ids=False, max_live_envs=None):
+        super().__init__(envs, add_task_ids=add_task_ids, max_live_envs=max_live_envs)
         self._current_task_id = -1
 
     def next_task(self) -> int:
@@ -255,8 +342,9 @@ class CustomMultiEnvWrapper(MultiEnvWrapper):
         envs: List[gym.Env],
         add_task_ids: bool = False,
         custom_new_task_fn: Callable[[MultiEnvWrapper], int] = None,
+        max_live_envs: Optional[int] = None,
     ):
-        super().__init__(envs, add_task_ids=add_task_ids)
+        super().__init__(envs, add_task_ids=add_task_ids, max_live_envs=max_live_envs)
         assert custom_new_task_fn, "Must pass a custom function to this wrapper."
         self._custom_new_task_fn = custom_new_task_fn
 
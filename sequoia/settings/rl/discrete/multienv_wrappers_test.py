@@ -282,6 +282,60 @@ class TestMultiEnvWrappers:
         else:
             assert on_task_switch_received_task_ids == [None] * (nb_tasks - 1)
 
+    def test_envs_are_created_lazily(self):
+        created_envs: List[int] = []
+
+        def make_env(index: int) -> gym.Env:
+            created_envs.append(index)
+            return TimeLimit(gym.make("CartPole-v0"), max_episode_steps=10)
+
+        nb_tasks = 4
+        envs = [partial(make_env, i) for i in range(nb_tasks)]
+        env = RoundRobinWrapper(envs)
+        assert created_envs == [0]
+        seeds = env.seed(123)
+        # Only the env that exists is seeded, the others are seeded when created.
+        assert created_envs == [0]
+        assert len(seeds) >= nb_tasks
+
+        first_observations = []
+        for episode in range(nb_tasks):
+            first_observations.append(env.reset())
+            assert env._current_task_id == episode
+        assert created_envs == list(range(nb_tasks))
+
+        # The seed of each env is determined by the seed of the wrapper, regardless of
+        # when the env is created.
+        other_env = RoundRobinWrapper(envs)
+        other_env.seed(123)
+        for episode in range(nb_tasks):
+            assert (other_env.reset() == first_observations[episode]).all()
+
+    @pytest.mark.parametrize("max_live_envs", [1, 2])
+    def test_max_live_envs(self, max_live_envs: int):
+        created_envs: List[int] = []
+
+        def make_env(index: int) -> gym.Env:
+            created_envs.append(index)
+            return TimeLimit(gym.make("CartPole-v0"), max_episode_steps=10)
+
+        nb_tasks = 3
+        envs = [partial(make_env, i) for i in range(nb_tasks)]
+        env = RoundRobinWrapper(envs, max_live_envs=max_live_envs)
+        env.seed(123)
+        for episode in range(2 * nb_tasks):
+            env.reset()
+            assert len(env._live_envs) <= max_live_envs
+            assert env._current_task_id in env._live_envs
+            done = False
+            while not done:
+                _, _, done, _ = env.step(env.action_space.sample())
+        # The envs were closed when idle, and re-created when needed.
+        assert created_envs == [0, 1, 2, 0, 1, 2]
+        assert not env.is_closed()
+        env.close()
+        assert env.is_closed()
+
     def test_adding_envs(self):
         from sequoia.common.gym_wrappers.env_dataset import EnvDataset
 
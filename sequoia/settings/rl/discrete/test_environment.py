@@ -18,9 +18,6 @@ class DiscreteTaskAgnosticRLTestEnvironment(ContinualRLTestEnvironment):
         # TODO: Removing the last entry since it's the terminal state.
         self.boundary_steps.pop(-1)
 
-    def __len__(self):
-        return math.ceil(self.step_limit / (getattr(self.env, "batch_size", 1) or 1))
-
     def get_results(self) -> TaskSequenceResults[EpisodeMetrics]:
         # TODO: Place the metrics in the right 'bin' at the end of each episode during
         # testing depending on the task at that time, rather than what's happening here,
@@ -45,7 +42,7 @@ class DiscreteTaskAgnosticRLTestEnvironment(ContinualRLTestEnvironment):
         test_results = TaskSequenceResults([TaskResults() for _ in range(nb_tasks)])
         # TODO: Fix this, since the task id might not be related to the steps!
         for step, episode_reward, episode_length in zip(
-            itertools.accumulate(lengths), rewards, lengths
+            self.get_episode_end_steps(), rewards, lengths
         ):
             # Given the step, find the task id.
             task_id = bisect.bisect_right(task_steps, step) - 1
@@ -66,8 +63,3 @@ class DiscreteTaskAgnosticRLTestEnvironment(ContinualRLTestEnvironment):
         if mode == "rgb_array" and self.batch_size:
             return tile_images(image_batch)
         return image_batch
-
-    def _after_reset(self, observation):
-        # Is this going to work fine when the observations are batched though?
-        return super()._after_reset(observation)
-
@@ -17,6 +17,7 @@ from sequoia.settings.base import Observations, Actions, Rewards
 import wandb
 from torch import Tensor
 from sequoia.utils import add_prefix
+from sequoia.utils.tracing import traced
 
 
 class MeasureRLPerformanceWrapper(
@@ -24,12 +25,24 @@ class MeasureRLPerformanceWrapper(
     # MeasurePerformanceWrapper[ActiveEnvironment]  # python 3.7
     # MeasurePerformanceWrapper[ActiveEnvironment, EpisodeMetrics] # python 3.8+
 ):
+    """ Measures the online performance on an RL environment (vectorized or not).
+
+    The return and length of the current episode of each env are kept in arrays, which
+    are updated for all the envs at once at each step. The metrics of the episodes that
+    end at a given step are stored in `self._metrics` at that step.
+
+    When wandb is enabled, the metrics of the episodes are accumulated, and are logged
+    every `log_interval` steps (and when the env is closed), rather than at every step
+    where an episode ends.
+    """
+
     def __init__(
         self,
         env: ActiveEnvironment,
         eval_episodes: int = None,
         eval_steps: int = None,
         wandb_prefix: str = None,
+        log_interval: int = 100,
     ):
         super().__init__(env)
         self._metrics: Dict[int, EpisodeMetrics] = {}
@@ -46,6 +59,11 @@ class MeasureRLPerformanceWrapper(
         self._current_episode_reward = np.zeros([self._batch_size], dtype=float)
         self._current_episode_steps = np.zeros([self._batch_size], dtype=int)
 
+        self.log_interval = log_interval
+        # Metrics of the episodes that ended since the last time we logged to wandb.
+        self._unlogged_metrics: Optional[EpisodeMetrics] = None
+        self._last_log_step: int = 0
+
     @property
     def in_evaluation_period(self) -> bool:
         """Returns wether the performance is currently being monitored.
@@ -70,33 +88,28 @@ class MeasureRLPerformanceWrapper(
         observation, rewards_, done, info = super().step(action)
         self._steps += 1
         reward = rewards_.y if isinstance(rewards_, Rewards) else rewards_
-
-        if isinstance(done, bool):
-            self._episodes += int(done)
-        elif isinstance(done, np.ndarray):
-            self._episodes += sum(done)
-        else:
-            self._episodes += done.int().sum()
+        dones = _as_array(done, dtype=bool)
+        n_done = int(np.count_nonzero(dones))
+        self._episodes += n_done
 
         if self.in_evaluation_period:
-            if self.is_vectorized:
-                for env_index, (env_is_done, env_reward) in enumerate(
-                    zip(done, reward)
-                ):
-                    self._current_episode_reward[env_index] += env_reward
-                    self._current_episode_steps[env_index] += 1
-            else:
-                self._current_episode_reward[0] += reward
-                self._current_episode_steps[0] += 1
-
-            metrics = self.get_metrics(action, reward, done)
-
-            if metrics is not None:
+            if isinstance(reward, Tensor):
+                reward = reward.detach().cpu().numpy()
+            # NOTE: Updates the return and length of the episode of all the envs at once.
+            self._current_episode_reward += reward
+            self._current_episode_steps += 1
+
+            if n_done:
+                metrics = self.get_metrics(action, reward, dones)
                 assert self._steps not in self._metrics, "two metrics at same step?"
                 self._metrics[self._steps] = metrics
 
         return observation, rewards_, done, info
 
+    def close(self) -> None:
+        self._log_metrics()
+        super().close()
+
     # def send(self, action: Actions) -> Rewards:
         # self.action_ = action
         # rewards_ = super().send(action)
@@ -132,51 +145,56 @@ class MeasureRLPerformanceWrapper(
 
         # return rewards_
 
+    @traced("metrics/train")
     def get_metrics(
         self,
         action: Union[Actions, Any],
         reward: Union[Rewards, Any],
         done: Union[bool, Sequence[bool]],
     ) -> Optional[EpisodeMetrics]:
+        """ Returns the metrics of the episodes that ended at this step (if any), and
+        resets the return and length of the corresponding envs.
+        """
         # TODO: Add some metric about the entropy of the policy's distribution?
-        rewards = reward.y if isinstance(reward, Rewards) else reward
-        actions = action.y_pred if isinstance(action, Actions) else action
-        dones: Sequence[bool]
-        if not self.is_vectorized:
-            rewards = [rewards]
-            actions = [actions]
-            assert isinstance(done, bool)
-            dones = [done]
-        else:
-            assert isinstance(done, (np.ndarray, Tensor))
-            dones = done
-
-        metrics: List[EpisodeMetrics] = []
-        for env_index, (env_is_done, reward) in enumerate(zip(dones, rewards)):
-            if env_is_done:
-                metrics.append(
-                    EpisodeMetrics(
-                        n_samples=1,
-                        # The average reward per episode.
-                        mean_episode_reward=self._current_episode_reward[env_index],
-                        # The average length of each episode.
-                        mean_episode_length=self._current_episode_steps[env_index],
-                    )
-                )
-                self._current_episode_reward[env_index] = 0
-                self._current_episode_steps[env_index] = 0
-
-        if not metrics:
+        dones = _as_array(done, dtype=bool)
+        n_episodes = int(np.count_nonzero(dones))
+        if not n_episodes:
             return None
+        metric = EpisodeMetrics(
+            n_samples=n_episodes,
+            # The average reward per episode.
+            mean_episode_reward=self._current_episode_reward[dones].sum() / n_episodes,
+            # The average length of each episode.
+            mean_episode_length=self._current_episode_steps[dones].sum() / n_episodes,
+        )
+        self._current_episode_reward[dones] = 0
+        self._current_episode_steps[dones] = 0
 
-        metric = sum(metrics, Metrics())
         if wandb.run:
-            log_dict = metric.to_log_dict()
-            if self.wandb_prefix:
-                log_dict = add_prefix(log_dict, prefix=self.wandb_prefix, sep="/")
-            log_dict["steps"] = self._steps
-            log_dict["episode"] = self._episodes
-            wandb.log(log_dict)
-
+            if self._unlogged_metrics is None:
+                self._unlogged_metrics = metric
+            else:
+                self._unlogged_metrics += metric
+            if self._steps - self._last_log_step >= self.log_interval:
+                self._log_metrics()
         return metric
 
+    def _log_metrics(self) -> None:
+        """ Logs the metrics of the episodes that ended since the last call to wandb. """
+        if self._unlogged_metrics is None or not wandb.run:
+            return
+        log_dict = self._unlogged_metrics.to_log_dict()
+        if self.wandb_prefix:
+            log_dict = add_prefix(log_dict, prefix=self.wandb_prefix, sep="/")
+        log_dict["steps"] = self._steps
+        log_dict["episode"] = self._episodes
+        wandb.log(log_dict)
+        self._unlogged_metrics = None
+        self._last_log_step = self._steps
+
+
+def _as_array(value: Union[bool, float, np.ndarray, Tensor], dtype: np.dtype) -> np.ndarray:
+    """ Returns `value` (a scalar, or the values of each env in a batch) as a 1-d array. """
+    if isinstance(value, Tensor):
+        value = value.detach().cpu().numpy()
+    return np.asarray(value, dtype=dtype).reshape(-1)
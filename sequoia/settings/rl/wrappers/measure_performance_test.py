@@ -139,3 +139,72 @@ def test_measure_RL_performance_batched_env():
             #     )
 
     assert env.get_online_performance() == expected_metrics
+
+
+def test_measure_RL_performance_vectorized_env():
+    """ The metrics of the episodes of each env in a vectorized env are the same as
+    when keeping track of each env separately.
+    """
+    from sequoia.common.metrics import Metrics
+
+    batch_size = 4
+    env = SyncVectorEnv([
+        partial(DummyEnvironment, start=i, target=5, max_value=10)
+        for i in range(batch_size)
+    ])
+    env = MeasureRLPerformanceWrapper(env)
+    env.seed(123)
+    env.action_space.seed(123)
+
+    expected_metrics = {}
+    episode_rewards = np.zeros(batch_size)
+    episode_lengths = np.zeros(batch_size, dtype=int)
+    env.reset()
+    for step in range(1, 201):
+        obs, rewards, dones, info = env.step(env.action_space.sample())
+        metrics = []
+        for env_index in range(batch_size):
+            episode_rewards[env_index] += rewards[env_index]
+            episode_lengths[env_index] += 1
+            if dones[env_index]:
+                metrics.append(EpisodeMetrics(
+                    n_samples=1,
+                    mean_episode_reward=episode_rewards[env_index],
+                    mean_episode_length=episode_lengths[env_index],
+                ))
+                episode_rewards[env_index] = 0
+                episode_lengths[env_index] = 0
+        if metrics:
+            expected_metrics[step] = sum(metrics, Metrics())
+
+    online_performance = env.get_online_performance()
+    assert online_performance.keys() == expected_metrics.keys()
+    for step, expected in expected_metrics.items():
+        metrics = online_performance[step]
+        assert metrics.n_samples == expected.n_samples
+        assert metrics.mean_episode_reward == pytest.approx(expected.mean_episode_reward)
+        assert metrics.mean_episode_length == pytest.approx(expected.mean_episode_length)
+
+
+def test_measure_RL_performance_logs_every_log_interval(monkeypatch):
+    import wandb
+
+    logs = []
+    monkeypatch.setattr(wandb, "run", object())
+    monkeypatch.setattr(wandb, "log", logs.append)
+
+    env = DummyEnvironment(start=0, target=2, max_value=4)
+    env = MeasureRLPerformanceWrapper(env, wandb_prefix="Train", log_interval=10)
+    env.reset()
+    for step in range(25):
+        obs, reward, done, info = env.step(1)
+        if done:
+            env.reset()
+    # Episodes end every 2 steps, but the metrics are only logged every 10 steps.
+    assert [log["steps"] for log in logs] == [10, 20]
+    assert [log["Train/Episodes"] for log in logs] == [5, 5]
+    # The remaining episodes are logged when the env is closed.
+    env.close()
+    assert [log["steps"] for log in logs] == [10, 20, 25]
+    assert logs[-1]["Train/Episodes"] == 2
+    assert logs[-1]["episode"] == 12
@@ -10,6 +10,7 @@ from gym import Space, spaces
 from sequoia.common import Batch
 from sequoia.common.gym_wrappers import IterableWrapper, TransformObservation
 from sequoia.common.gym_wrappers.convert_tensors import supports_tensors
+from sequoia.common.gym_wrappers.fused import register_fusible_step
 from sequoia.common.spaces import Sparse, TypedDictSpace
 from sequoia.common.spaces.named_tuple import NamedTuple, NamedTupleSpace
 from sequoia.settings.base.environment import Environment
@@ -92,9 +93,12 @@ class TypedObjectsWrapper(IterableWrapper, Environment[ObservationType, ActionTy
             action = action.y_pred
         if isinstance(action, Tensor) and not supports_tensors(self.env.action_space):
             action = action.detach().cpu().numpy()
-        if action not in self.env.action_space:
-            if isinstance(self.env.action_space, spaces.Tuple):
-                action = tuple(action)
+        # NOTE: Only the Tuple spaces need the actions to be converted, so we don't
+        # need to check if the action is in the space at each step.
+        if isinstance(self.env.action_space, spaces.Tuple) and not isinstance(
+            action, tuple
+        ):
+            action = tuple(action)
         return action
 
     def reward(self, reward: Any) -> RewardType:
@@ -119,6 +123,15 @@ class TypedObjectsWrapper(IterableWrapper, Environment[ObservationType, ActionTy
         return self.reward(reward)
 
 
+register_fusible_step(
+    TypedObjectsWrapper.step,
+    TypedObjectsWrapper.reset,
+    action=True,
+    observation=True,
+    reward=True,
+)
+
+
 # TODO: turn unwrap into a single-dispatch callable.
 # TODO: Atm 'unwrap' basically means "get rid of everything apart from the first
 # item", which is a bit ugly.
@@ -0,0 +1,125 @@
+""" Lazy 'views' over the rows of one or more arrays, given by int indices.
+
+These are used to take subsets of (and to concatenate) the TaskSets from continuum
+without copying their data: A subset or a concatenation only creates new arrays of
+indices, and the samples are only read from the original arrays when indexed.
+"""
+from collections.abc import Sequence
+from typing import Any, Dict, List, Optional, Sequence as SequenceType, Tuple, Union
+
+import numpy as np
+
+
+class IndexedArray(Sequence):
+    """ Read-only view of the rows of some source arrays, given by indices.
+
+    Row `i` of this array is the row `local_indices[i]` of the source array
+    `arrays[array_ids[i]]`. This can be used as the `_x` of a `TaskSet`, since it has
+    a `shape`, a `dtype`, and supports the same kind of indexing as numpy arrays.
+
+    >>> import numpy as np
+    >>> a = np.arange(10) * 10
+    >>> b = np.arange(5) * -1
+    >>> view = IndexedArray.concatenate([a, b])
+    >>> view.shape
+    (15,)
+    >>> subset = view.take_view([9, 10, 14])
+    >>> int(subset[0]), int(subset[-1])
+    (90, -4)
+    >>> subset[[0, 1]]
+    array([90,  0])
+    >>> np.asarray(subset)
+    array([90,  0, -4])
+    """
+
+    def __init__(
+        self,
+        arrays: SequenceType[np.ndarray],
+        array_ids: np.ndarray,
+        local_indices: np.ndarray,
+    ):
+        self.arrays: List[np.ndarray] = list(arrays)
+        self.array_ids = np.asarray(array_ids, dtype=np.intp)
+        self.local_indices = np.asarray(local_indices, dtype=np.intp)
+        assert self.array_ids.shape == self.local_indices.shape
+        assert self.arrays, "Need at least one source array."
+
+    @classmethod
+    def concatenate(cls, arrays: SequenceType[Union[np.ndarray, "IndexedArray"]]) -> "IndexedArray":
+        """ Creates a view of the concatenation of `arrays`, without copying them.
+
+        When some of the arrays are themselves `IndexedArray`s, their sources are
+        reused, so that views are never nested.
+        """
+        sources: List[np.ndarray] = []
+        source_positions: Dict[int, int] = {}
+
+        def source_id(array: np.ndarray) -> int:
+            if id(array) not in source_positions:
+                source_positions[id(array)] = len(sources)
+                sources.append(array)
+            return source_positions[id(array)]
+
+        array_ids: List[np.ndarray] = []
+        local_indices: List[np.ndarray] = []
+        for array in arrays:
+            if isinstance(array, IndexedArray):
+                id_map = np.array([source_id(source) for source in array.arrays], dtype=np.intp)
+                array_ids.append(id_map[array.array_ids])
+                local_indices.append(array.local_indices)
+            else:
+                array_ids.append(np.full(len(array), source_id(array), dtype=np.intp))
+                local_indices.append(np.arange(len(array), dtype=np.intp))
+        return cls(sources, np.concatenate(array_ids), np.concatenate(local_indices))
+
+    @classmethod
+    def subset(cls, array: Union[np.ndarray, "IndexedArray"], indices: SequenceType[int]) -> "IndexedArray":
+        """ Creates a view of the rows `array[indices]`, without copying them. """
+        if not isinstance(array, IndexedArray):
+            array = cls.concatenate([array])
+        return array.take_view(indices)
+
+    def take_view(self, indices: SequenceType[int]) -> "IndexedArray":
+        """ Returns a view of the rows `self[indices]`, without copying them. """
+        indices = np.asarray(indices, dtype=np.intp)
+        return type(self)(self.arrays, self.array_ids[indices], self.local_indices[indices])
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return (len(self.local_indices),) + tuple(self.arrays[0].shape[1:])
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.result_type(*[array.dtype for array in self.arrays])
+
+    def __len__(self) -> int:
+        return len(self.local_indices)
+
+    def __getitem__(self, index: Any) -> Any:
+        array_ids = self.array_ids[index]
+        local_indices = self.local_indices[index]
+        if np.ndim(array_ids) == 0:
+            # Indexing a single row.
+            return self.arrays[array_ids][local_indices]
+        if len(self.arrays) == 1:
+            return self.arrays[0][local_indices]
+        # Gather the rows from each of the source arrays.
+        result = np.empty((len(local_indices),) + self.shape[1:], dtype=self.dtype)
+        for array_id, array in enumerate(self.arrays):
+            mask = array_ids == array_id
+            if mask.any():
+                result[mask] = array[local_indices[mask]]
+        return result
+
+    def __array__(self, dtype: Optional[np.dtype] = None, copy: Optional[bool] = None) -> np.ndarray:
+        # NOTE: This materializes the rows, for example when a continuum function
+        # calls `np.concatenate` on the `_x` of TaskSets.
+        result = self[np.arange(len(self))]
+        return result if dtype is None else result.astype(dtype)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(shape={self.shape}, dtype={self.dtype}, n_sources={len(self.arrays)})"
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from .indexed_array import IndexedArray
+
+
+@pytest.mark.parametrize("indices", [[0, 3, 5, 1], np.arange(6)[::-1], [2], []])
+def test_subset_matches_numpy(indices):
+    array = np.random.default_rng(123).random([6, 3, 2])
+    view = IndexedArray.subset(array, indices)
+    expected = array[np.asarray(indices, dtype=int)]
+    assert view.shape == expected.shape
+    assert len(view) == len(expected)
+    np.testing.assert_array_equal(np.asarray(view), expected)
+    for i in range(len(view)):
+        np.testing.assert_array_equal(view[i], expected[i])
+
+
+def test_concatenate_matches_numpy():
+    rng = np.random.default_rng(123)
+    arrays = [rng.random([n, 4]) for n in [3, 5, 2]]
+    expected = np.concatenate(arrays)
+    view = IndexedArray.concatenate(arrays)
+    np.testing.assert_array_equal(np.asarray(view), expected)
+    np.testing.assert_array_equal(view[2:7], expected[2:7])
+
+    perm = rng.permutation(len(expected))
+    np.testing.assert_array_equal(view[perm], expected[perm])
+
+
+def test_views_are_not_nested():
+    """ Taking views of views (or concatenating views) reuses the source arrays. """
+    a = np.arange(10)
+    b = np.arange(10, 20)
+    view_a = IndexedArray.subset(a, [1, 3, 5])
+    view_b = IndexedArray.subset(b, [0, 2])
+    joined = IndexedArray.concatenate([view_a, view_b, a])
+    assert len(joined.arrays) == 2
+    assert joined.arrays[0] is a
+    assert joined.arrays[1] is b
+    np.testing.assert_array_equal(
+        np.asarray(joined), np.concatenate([a[[1, 3, 5]], b[[0, 2]], a])
+    )
+    sub = joined.take_view([0, 3, 4])
+    assert sub.arrays == joined.arrays
+    np.testing.assert_array_equal(np.asarray(sub), [1, 10, 12])
+
+
+def test_no_copy_of_source():
+    """ The view reflects the values of the source arrays (no copy is made). """
+    a = np.zeros([4, 2])
+    view = IndexedArray.subset(a, [3, 1])
+    a[3] = 1.0
+    np.testing.assert_array_equal(view[0], [1.0, 1.0])
@@ -2,7 +2,7 @@ import itertools
 from dataclasses import dataclass
 from functools import partial
 from pathlib import Path
-from typing import ClassVar, Dict, List, Optional, Type, TypeVar, Union
+from typing import ClassVar, Dict, List, Optional, Tuple, Type, TypeVar, Union
 
 import gym
 import numpy as np
@@ -23,7 +23,7 @@ from continuum.datasets import (
     _ContinuumDataset,
 )
 from continuum.scenarios import ClassIncremental, _BaseScenario
-from continuum.tasks import TaskSet, concat, split_train_val
+from continuum.tasks import TaskSet
 from gym import Space, spaces
 from simple_parsing import choice, field, list_field
 from torch import Tensor
@@ -35,6 +35,7 @@ from sequoia.common.gym_wrappers.convert_tensors import add_tensor_support
 from sequoia.common.gym_wrappers.convert_tensors import (
     add_tensor_support as tensor_space,
 )
+from sequoia.common.gym_wrappers.trace import add_trace_wrapper
 from sequoia.common.spaces import Image, Sparse, TypedDictSpace, TensorMultiDiscrete
 from sequoia.common.transforms import Compose, Transforms
 from sequoia.settings.assumptions.continual import ContinualAssumption
@@ -296,6 +297,7 @@ class ContinualSLSetting(SLSetting, ContinualAssumption):
             shuffle=False,
             one_epoch_only=(not self.known_task_boundaries_at_train_time),
         )
+        env = add_trace_wrapper(env, name="env")
 
         if self.config.render:
             # Add a wrapper that calls 'env.render' at each step?
@@ -310,9 +312,14 @@ class ContinualSLSetting(SLSetting, ContinualAssumption):
         if self.config.device:
             # TODO: Put this before or after the image transforms?
             from sequoia.common.gym_wrappers.convert_tensors import ConvertToFromTensors
-            env = ConvertToFromTensors(env, device=self.config.device)
+            env = ConvertToFromTensors(
+                env,
+                device=self.config.device,
+                space_check_every=self.config.space_check_every,
+            )
             # env = TransformObservation(env, f=partial(move, device=self.config.device))
             # env = TransformReward(env, f=partial(move, device=self.config.device))
+        env = add_trace_wrapper(env, name="env_wrappers")
         
         if self.monitor_training_performance:
             env = MeasureSLPerformanceWrapper(
@@ -357,6 +364,7 @@ class ContinualSLSetting(SLSetting, ContinualAssumption):
             num_workers=num_workers,
             one_epoch_only=(not self.known_task_boundaries_at_train_time),
         )
+        env = add_trace_wrapper(env, name="env")
 
         # TODO: If wandb is enabled, then add customized Monitor wrapper (with
         # IterableWrapper as an additional subclass). There would then be a lot of
@@ -374,9 +382,14 @@ class ContinualSLSetting(SLSetting, ContinualAssumption):
         if self.config.device:
             # TODO: Put this before or after the image transforms?
             from sequoia.common.gym_wrappers.convert_tensors import ConvertToFromTensors
-            env = ConvertToFromTensors(env, device=self.config.device)
+            env = ConvertToFromTensors(
+                env,
+                device=self.config.device,
+                space_check_every=self.config.space_check_every,
+            )
             # env = TransformObservation(env, f=partial(move, device=self.config.device))
             # env = TransformReward(env, f=partial(move, device=self.config.device))
+        env = add_trace_wrapper(env, name="env_wrappers")
 
         # NOTE: We don't measure online performance on the validation set.
         # if self.monitor_training_performance:
@@ -421,6 +434,7 @@ class ContinualSLSetting(SLSetting, ContinualAssumption):
             shuffle=False,
             one_epoch_only=True,
         )
+        env = add_trace_wrapper(env, name="env")
 
         # NOTE: The transforms from `self.transforms` (the 'base' transforms) were
         # already added when creating the datasets and the CL scenario.
@@ -431,9 +445,14 @@ class ContinualSLSetting(SLSetting, ContinualAssumption):
         if self.config.device:
             # TODO: Put this before or after the image transforms?
             from sequoia.common.gym_wrappers.convert_tensors import ConvertToFromTensors
-            env = ConvertToFromTensors(env, device=self.config.device)
+            env = ConvertToFromTensors(
+                env,
+                device=self.config.device,
+                space_check_every=self.config.space_check_every,
+            )
             # env = TransformObservation(env, f=partial(move, device=self.config.device))
             # env = TransformReward(env, f=partial(move, device=self.config.device))
+        env = add_trace_wrapper(env, name="env_wrappers")
 
         # FIXME: Instead of trying to create a 'fake' task schedule for the test
         # environment, instead let the test environment see the task ids, (and then hide
@@ -799,7 +818,16 @@ def smooth_task_boundaries_concat(
             rng.shuffle(shuffled_indices[start_index : start_index + window_length])
         return shuffled_indices
 
-    shuffled_indices = option3()
+    # IDEA #4: Vectorized version of option3: Shuffle all the non-overlapping windows
+    # at once, alternating between windows starting at 0 and at `window_length // 2`.
+    def option4():
+        shuffled_indices = np.arange(total_length)
+        half_window = window_length // 2
+        for offset in [0, half_window, 0, half_window]:
+            shuffle_windows(shuffled_indices, window_length, offset=offset, rng=rng)
+        return shuffled_indices
+
+    shuffled_indices = option4()
 
     if all(isinstance(dataset, TaskSet) for dataset in datasets):
         # Use the 'concat' from continuum, just to preserve the field/methods of a
@@ -816,6 +844,7 @@ def smooth_task_boundaries_concat(
 from functools import singledispatch
 from typing import Sequence, overload
 
+from .indexed_array import IndexedArray
 from .wrappers import replace_taskset_attributes
 
 DatasetType = TypeVar("DatasetType", bound=Dataset)
@@ -834,8 +863,16 @@ def subset(dataset: DatasetType, indices: Sequence[int]) -> Union[Subset, Datase
 
 @subset.register
 def taskset_subset(taskset: TaskSet, indices: np.ndarray) -> TaskSet:
-    # x, y, t = taskset.get_raw_samples(indices)
-    x, y, t = taskset.get_raw_samples(indices)
+    """ Returns a TaskSet with the given samples from `taskset`.
+
+    NOTE: The samples aren't copied: the `x` of the returned TaskSet is a view of the
+    rows of the original `x` (see `IndexedArray`). Only the (int) indices, labels and
+    task ids are stored.
+    """
+    indices = np.asarray(indices, dtype=int)
+    x = IndexedArray.subset(taskset._x, indices)
+    y = taskset._y[indices]
+    t = taskset._t[indices]
     # TODO: Not sure if/how to handle the `bounding_boxes` attribute here.
     bounding_boxes = taskset.bounding_boxes
     if bounding_boxes is not None:
@@ -845,6 +882,65 @@ def taskset_subset(taskset: TaskSet, indices: np.ndarray) -> TaskSet:
     )
 
 
+def concat(task_sets: List[TaskSet]) -> TaskSet:
+    """ Concatenates the given TaskSets, without copying their samples.
+
+    Same as `continuum.tasks.concat`, but the `x` of the resulting TaskSet is a view
+    over the `x` of each TaskSet (see `IndexedArray`).
+    The transforms will be those of the first TaskSet.
+    """
+    data_type = task_sets[0].data_type
+    for task_set in task_sets:
+        if task_set.data_type != data_type:
+            raise RuntimeError(f"Invalid data type {task_set.data_type} != {data_type}")
+    return TaskSet(
+        IndexedArray.concatenate([task_set._x for task_set in task_sets]),
+        np.concatenate([task_set._y for task_set in task_sets]),
+        np.concatenate([task_set._t for task_set in task_sets]),
+        trsf=task_sets[0].trsf,
+        data_type=data_type,
+    )
+
+
+def split_train_val(dataset: TaskSet, val_split: float = 0.1) -> Tuple[TaskSet, TaskSet]:
+    """ Splits the dataset into a training and a validation dataset.
+
+    Same as `continuum.tasks.split_train_val` (including the seeding), but the samples
+    aren't copied (see `taskset_subset`).
+    """
+    random_state = np.random.RandomState(seed=1)
+    indices = np.arange(len(dataset))
+    random_state.shuffle(indices)
+    n_val = int(val_split * len(indices))
+    train_indices = indices[n_val:]
+    val_indices = indices[:n_val]
+    return subset(dataset, train_indices), subset(dataset, val_indices)
+
+
+def shuffle_windows(
+    indices: np.ndarray, window_length: int, offset: int = 0, rng: np.random.Generator = None
+) -> None:
+    """ Shuffles (in-place) the entries of `indices` within each of the consecutive,
+    non-overlapping windows of length `window_length` that start at `offset`.
+
+    All the windows are shuffled at once. Entries that aren't inside a full window
+    are left in place.
+
+    >>> indices = np.arange(10)
+    >>> shuffle_windows(indices, 4, offset=1, rng=np.random.default_rng(123))
+    >>> indices[[0, 9]].tolist(), sorted(indices[1:5].tolist()), sorted(indices[5:9].tolist())
+    ([0, 9], [1, 2, 3, 4], [5, 6, 7, 8])
+    """
+    rng = rng or np.random.default_rng()
+    n_windows = (len(indices) - offset) // window_length
+    if n_windows <= 0:
+        return
+    end = offset + n_windows * window_length
+    windows = indices[offset:end].reshape(n_windows, window_length)
+    permutations = rng.random(windows.shape).argsort(axis=1)
+    indices[offset:end] = np.take_along_axis(windows, permutations, axis=1).reshape(-1)
+
+
 def random_subset(
     taskset: TaskSet, n_samples: int, seed: int = None, ordered: bool = True
 ) -> TaskSet:
@@ -3,10 +3,10 @@ from functools import singledispatch
 import gym
 from torch import Tensor
 from continuum import TaskSet
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Optional, Tuple
 import numpy as np
 import torch
-from functools import partial
+from functools import lru_cache, partial
 import matplotlib.pyplot as plt
 from sequoia.common.gym_wrappers import IterableWrapper
 from torch import Tensor
@@ -22,33 +22,114 @@ def relabel(data: Any, mapping: Dict[int, int] = None) -> Any:
 
 @relabel.register
 def relabel_ndarray(y: np.ndarray, mapping: Dict[int, int]=None) -> np.ndarray:
-    new_y = y.copy()
-    mapping = mapping or {
-        c: i for i, c in enumerate(np.unique(y))
-    }
-    for old_label, new_label in mapping.items():
-        new_y[y == old_label] = new_label
-    return new_y
+    """ Relabels `y` using the given mapping. Labels that aren't in the mapping are left
+    unchanged. When `mapping` isn't passed, the labels are mapped to their index in the
+    sorted unique labels of `y`.
+
+    >>> y = np.array([3, 7, 7, 3, 5])
+    >>> relabel(y, {3: 0, 7: 1})
+    array([0, 1, 1, 0, 5])
+    >>> relabel(y)
+    array([0, 2, 2, 0, 1])
+    """
+    if mapping is None:
+        _, new_y = np.unique(y, return_inverse=True)
+        return new_y.reshape(y.shape).astype(y.dtype, copy=False)
+    lookup = _label_lookup(_mapping_key(mapping))
+    return lookup.apply_ndarray(y)
 
 
 @relabel.register
 def relabel_tensor(y: Tensor, mapping: Dict[int, int]=None) -> Tensor:
-    new_y = y.copy()
-    mapping = mapping or {
-        c: i for i, c in enumerate(torch.unique(y))
-    }
-    for old_label, new_label in mapping.items():
-        new_y[y == old_label] = new_label
-    return new_y
+    """ Same as `relabel_ndarray`, for tensors (on any device).
+
+    >>> y = torch.as_tensor([3, 7, 7, 3, 5])
+    >>> relabel(y, {3: 0, 7: 1})
+    tensor([0, 1, 1, 0, 5])
+    >>> relabel(y)
+    tensor([0, 2, 2, 0, 1])
+    """
+    if mapping is None:
+        _, new_y = torch.unique(y, return_inverse=True)
+        return new_y.reshape(y.shape).to(y.dtype)
+    lookup = _label_lookup(_mapping_key(mapping))
+    return lookup.apply_tensor(y)
 
 
+def _mapping_key(mapping: Dict[int, int]) -> Tuple[Tuple[int, int], ...]:
+    return tuple(sorted((int(k), int(v)) for k, v in mapping.items()))
+
+
+@lru_cache(maxsize=None)
+def _label_lookup(mapping: Tuple[Tuple[int, int], ...]) -> "_LabelLookup":
+    return _LabelLookup(mapping)
+
+
+class _LabelLookup:
+    """ Precomputed lookup table for a label mapping, used to relabel all the labels
+    at once with a single gather, rather than with one masked assignment per class.
+
+    When the labels of the mapping are small non-negative integers (the usual case),
+    a dense table indexed by the old labels is used. Otherwise, the new labels are
+    found with a binary search in the sorted old labels.
+    """
+    def __init__(self, mapping: Tuple[Tuple[int, int], ...]):
+        self.keys = np.array([k for k, _ in mapping], dtype=np.int64)
+        self.values = np.array([v for _, v in mapping], dtype=np.int64)
+        self.dense = bool(
+            len(self.keys)
+            and self.keys[0] >= 0
+            and self.keys[-1] < max(4 * len(self.keys), 1024)
+        )
+        if self.dense:
+            # Labels which aren't in the mapping are mapped to themselves.
+            self.table = np.arange(self.keys[-1] + 1, dtype=np.int64)
+            self.table[self.keys] = self.values
+        self._tensors: Dict[torch.device, Tuple[Tensor, Tensor, Optional[Tensor]]] = {}
+
+    def apply_ndarray(self, y: np.ndarray) -> np.ndarray:
+        if not len(self.keys) or not y.size:
+            return y.copy()
+        if self.dense:
+            table = self.table
+            if y.min() >= 0 and y.max() < len(table):
+                return table[y].astype(y.dtype, copy=False)
+            in_table = (y >= 0) & (y < len(table))
+            new_y = np.where(in_table, table[np.clip(y, 0, len(table) - 1)], y)
+        else:
+            indices = np.searchsorted(self.keys, y).clip(max=len(self.keys) - 1)
+            new_y = np.where(self.keys[indices] == y, self.values[indices], y)
+        return new_y.astype(y.dtype, copy=False)
+
+    def apply_tensor(self, y: Tensor) -> Tensor:
+        if not len(self.keys) or not y.numel():
+            return y.clone()
+        keys, values, table = self._get_tensors(y.device)
+        y_long = y.long()
+        # NOTE: Not checking if all the labels are in the table first, since that would
+        # require a device-to-host sync.
+        if table is not None:
+            in_table = (y_long >= 0) & (y_long < len(table))
+            new_y = torch.where(in_table, table[y_long.clamp(0, len(table) - 1)], y_long)
+        else:
+            indices = torch.searchsorted(keys, y_long).clamp(max=len(keys) - 1)
+            new_y = torch.where(keys[indices] == y_long, values[indices], y_long)
+        return new_y.to(y.dtype)
+
+    def _get_tensors(self, device: torch.device) -> Tuple[Tensor, Tensor, Optional[Tensor]]:
+        if device not in self._tensors:
+            self._tensors[device] = (
+                torch.as_tensor(self.keys, device=device),
+                torch.as_tensor(self.values, device=device),
+                torch.as_tensor(self.table, device=device) if self.dense else None,
+            )
+        return self._tensors[device]
+
 
 @relabel.register
 def relabel_taskset(task_set: TaskSet, mapping: Dict[int, int]=None) -> TaskSet:
     # if mapping:
     #     assert False, mapping
-    if len(task_set.get_classes()) > 2:
-        assert False, f"debugging: {task_set.get_classes()}"
     mapping = mapping or {
         c: i for i, c in enumerate(task_set.get_classes())
     }
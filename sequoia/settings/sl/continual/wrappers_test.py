@@ -0,0 +1,55 @@
+from typing import Dict
+
+import numpy as np
+import pytest
+import torch
+from continuum import TaskSet
+
+from .wrappers import relabel
+
+
+def relabel_with_loop(y: np.ndarray, mapping: Dict[int, int]) -> np.ndarray:
+    new_y = y.copy()
+    for old_label, new_label in mapping.items():
+        new_y[y == old_label] = new_label
+    return new_y
+
+
+@pytest.mark.parametrize("max_label", [10, 100, 10_000_000])
+@pytest.mark.parametrize("dtype", [np.int64, np.int32, np.uint8])
+def test_relabel_ndarray(max_label: int, dtype: np.dtype):
+    rng = np.random.default_rng(123)
+    max_label = min(max_label, np.iinfo(dtype).max)
+    classes = rng.choice(max_label, size=min(10, max_label), replace=False)
+    mapping = {int(c): i for i, c in enumerate(classes[:-2])}
+    # Two of the classes aren't in the mapping, and are left unchanged.
+    y = rng.choice(classes, size=1000).astype(dtype)
+
+    new_y = relabel(y, mapping)
+    assert new_y.dtype == y.dtype
+    np.testing.assert_array_equal(new_y, relabel_with_loop(y, mapping))
+    # The labels are relabeled the same way as tensors.
+    new_y_tensor = relabel(torch.as_tensor(y), mapping)
+    np.testing.assert_array_equal(new_y_tensor.numpy(), new_y)
+
+
+def test_relabel_default_mapping():
+    y = np.array([13, 11, 12, 13, 11])
+    np.testing.assert_array_equal(relabel(y), [2, 0, 1, 2, 0])
+    assert relabel(torch.as_tensor(y)).tolist() == [2, 0, 1, 2, 0]
+
+
+def test_relabel_tensor_doesnt_modify_input():
+    y = torch.as_tensor([3, 7, 5])
+    new_y = relabel(y, {3: 0, 5: 1, 7: 2})
+    assert new_y.tolist() == [0, 2, 1]
+    assert y.tolist() == [3, 7, 5]
+    assert relabel(y, {}) is not y
+
+
+def test_relabel_taskset():
+    y = np.array([4, 5, 6, 4, 6])
+    task_set = TaskSet(np.zeros([5, 2]), y, np.zeros_like(y), trsf=None, data_type="tensor")
+    new_task_set = relabel(task_set)
+    np.testing.assert_array_equal(new_task_set._y, [0, 1, 2, 0, 2])
+    np.testing.assert_array_equal(task_set._y, y)
@@ -19,6 +19,7 @@ Class-Incremental definition from [iCaRL](https://arxiv.org/abs/1611.07725):
         seen so far."
 """
 import itertools
+import math
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Callable, ClassVar, Dict, List, Optional, Tuple, Type, Union
@@ -47,7 +48,7 @@ from continuum.tasks import split_train_val
 from gym import Space, spaces
 from simple_parsing import choice, field, list_field
 from torch import Tensor
-from torch.utils.data import ConcatDataset, Dataset
+from torch.utils.data import ConcatDataset, Dataset, Subset
 
 from sequoia.common.config import Config
 from sequoia.common.gym_wrappers import TransformObservation
@@ -228,40 +229,7 @@ class IncrementalSLSetting(IncrementalAssumption, DiscreteTaskAgnosticSLSetting)
 
         # Join all the test datasets.
         dataset = self._make_test_dataset()
-
-        batch_size = batch_size if batch_size is not None else self.batch_size
-        num_workers = num_workers if num_workers is not None else self.num_workers
-
-        env = self.Environment(
-            dataset,
-            batch_size=batch_size,
-            num_workers=num_workers,
-            hide_task_labels=(not self.task_labels_at_test_time),
-            observation_space=self.observation_space,
-            action_space=self.action_space,
-            reward_space=self.reward_space,
-            Observations=self.Observations,
-            Actions=self.Actions,
-            Rewards=self.Rewards,
-            pretend_to_be_active=True,
-            shuffle=False,
-        )
-
-        # NOTE: The transforms from `self.transforms` (the 'base' transforms) were
-        # already added when creating the datasets and the CL scenario.
-        test_specific_transforms = self.additional_transforms(self.test_transforms)
-        if test_specific_transforms:
-            env = TransformObservation(env, f=test_specific_transforms)
-
-        if self.config.device:
-            # TODO: Put this before or after the image transforms?
-            from sequoia.common.gym_wrappers.convert_tensors import ConvertToFromTensors
-            env = ConvertToFromTensors(env, device=self.config.device)
-
-        # TODO: Remove this, I don't think it's used anymore, since `hide_task_labels`
-        # is an argument to self.Environment now.
-        if not self.task_labels_at_test_time:
-            env = HideTaskLabelsWrapper(env)
+        env = self._make_test_env(dataset, batch_size=batch_size, num_workers=num_workers)
 
         # TODO: Remove this once that stuff with the 'fake' task schedule is fixed below,
         # base it on the equivalent in ContinualSLSetting instead (which should actually
@@ -302,6 +270,102 @@ class IncrementalSLSetting(IncrementalAssumption, DiscreteTaskAgnosticSLSetting)
         self.test_env = test_env
         return self.test_env
 
+    def test_dataloaders(
+        self, batch_size: int = None, num_workers: int = None
+    ) -> List[IncrementalSLTestEnvironment]:
+        """ Returns one test environment per task, each one using the test dataset of a
+        single task.
+
+        Used in the test loop to evaluate the Method on the test data of multiple tasks
+        at the same time (see `test_concurrent_tasks`).
+        """
+        if not self.has_prepared_data:
+            self.prepare_data()
+        if not self.has_setup_test:
+            self.setup("test")
+        batch_size = batch_size if batch_size is not None else self.batch_size
+
+        # TODO: Configure the 'monitoring' dir properly.
+        if wandb.run:
+            test_dir = Path(wandb.run.dir)
+        else:
+            test_dir = Path(self.config.log_dir)
+
+        # NOTE: The test env only gets the action for the last batch of its dataset
+        # when it is already done, so that batch is never evaluated. The env of each
+        # task therefore also holds the first batch of the next task, so that, like in
+        # `test_dataloader`, only the last batch of the last task is left out.
+        joined_dataset = self._make_test_dataset()
+        task_ends = list(itertools.accumulate(map(len, self.test_datasets)))
+        task_starts = [0] + task_ends[:-1]
+
+        test_envs: List[IncrementalSLTestEnvironment] = []
+        for task_id, (start, end) in enumerate(zip(task_starts, task_ends)):
+            end_with_next_batch = min(end + (batch_size or 1), len(joined_dataset))
+            dataset = Subset(joined_dataset, range(start, end_with_next_batch))
+            env = self._make_test_env(
+                dataset, batch_size=batch_size, num_workers=num_workers
+            )
+            # NOTE: The step limit is set after the last batch, so that the env is only
+            # closed once all the batches of the task have been seen.
+            n_batches = math.ceil((end - start) / (batch_size or 1))
+            test_envs.append(
+                IncrementalSLTestEnvironment(
+                    env,
+                    directory=test_dir / f"task_{task_id}",
+                    step_limit=n_batches + 1,
+                    task_schedule={0: task_id},
+                    force=True,
+                    config=self.config,
+                    video_callable=None if (wandb.run or self.config.render) else False,
+                )
+            )
+        return test_envs
+
+    def _make_test_env(
+        self, dataset: Dataset, batch_size: int = None, num_workers: int = None
+    ) -> gym.Env:
+        """ Creates the (not yet monitored) environment for the given test dataset. """
+        batch_size = batch_size if batch_size is not None else self.batch_size
+        num_workers = num_workers if num_workers is not None else self.num_workers
+
+        env = self.Environment(
+            dataset,
+            batch_size=batch_size,
+            num_workers=num_workers,
+            hide_task_labels=(not self.task_labels_at_test_time),
+            observation_space=self.observation_space,
+            action_space=self.action_space,
+            reward_space=self.reward_space,
+            Observations=self.Observations,
+            Actions=self.Actions,
+            Rewards=self.Rewards,
+            pretend_to_be_active=True,
+            shuffle=False,
+        )
+
+        # NOTE: The transforms from `self.transforms` (the 'base' transforms) were
+        # already added when creating the datasets and the CL scenario.
+        test_specific_transforms = self.additional_transforms(self.test_transforms)
+        if test_specific_transforms:
+            env = TransformObservation(env, f=test_specific_transforms)
+
+        if self.config.device:
+            # TODO: Put this before or after the image transforms?
+            from sequoia.common.gym_wrappers.convert_tensors import ConvertToFromTensors
+            env = ConvertToFromTensors(
+                env,
+                device=self.config.device,
+                space_check_every=self.config.space_check_every,
+            )
+
+        # TODO: Remove this, I don't think it's used anymore, since `hide_task_labels`
+        # is an argument to self.Environment now.
+        if not self.task_labels_at_test_time:
+            env = HideTaskLabelsWrapper(env)
+
+        return env
+
     def split_batch_function(
         self, training: bool
     ) -> Callable[[Tuple[Tensor, ...]], Tuple[Observations, Rewards]]:
@@ -10,7 +10,7 @@ from sequoia.common.metrics import ClassificationMetrics
 from sequoia.common.spaces import Sparse
 from sequoia.conftest import skip_param, xfail_param
 from sequoia.settings.assumptions.incremental_test import OtherDummyMethod
-from sequoia.settings.base import Setting
+from sequoia.settings.base import Method, Setting
 from sequoia.settings.base.setting_test import SettingTests
 
 from ..discrete.setting_test import (
@@ -226,3 +226,54 @@ def test_render(config: Config):
 
 def test_class_incremental_random_baseline():
     pass
+
+
+class _DeterministicMethod(Method, target_setting=IncrementalSLSetting):
+    """ Method which doesn't train, and whose predictions only depend on the inputs. """
+
+    def configure(self, setting: IncrementalSLSetting):
+        self.n_classes = setting.action_space.n
+
+    def fit(self, train_env, valid_env):
+        pass
+
+    def get_actions(
+        self, observations: IncrementalSLSetting.Observations, action_space: Space
+    ) -> IncrementalSLSetting.Actions:
+        y_pred = (observations.x.flatten(1).sum(1) * 10).long() % self.n_classes
+        return IncrementalSLSetting.Actions(y_pred=y_pred)
+
+
+@pytest.mark.timeout(300)
+@pytest.mark.parametrize("test_concurrent_tasks", [2, 5])
+def test_concurrent_tasks_same_results(config: Config, test_concurrent_tasks: int):
+    """ Evaluating the test data of multiple tasks at the same time gives the same
+    transfer matrix as evaluating the tasks one after the other.
+    """
+    results = {}
+    for concurrent_tasks in [1, test_concurrent_tasks]:
+        # NOTE: The test set of FashionMNIST has the same number of samples (1000) for
+        # each class, so the batch size divides the number of test samples of each
+        # task. Otherwise, the sequential test loop would give the metrics of the
+        # batches which contain samples from two tasks to one of them.
+        setting = IncrementalSLSetting(
+            dataset="fashionmnist",
+            nb_tasks=5,
+            batch_size=100,
+            num_workers=0,
+            test_concurrent_tasks=concurrent_tasks,
+            config=config,
+        )
+        results[concurrent_tasks] = setting.apply(_DeterministicMethod())
+
+    sequential_results = results[1]
+    concurrent_results = results[test_concurrent_tasks]
+    assert concurrent_results.objective_matrix == sequential_results.objective_matrix
+    for sequential_row, concurrent_row in zip(
+        sequential_results.transfer_matrix, concurrent_results.transfer_matrix
+    ):
+        assert [
+            task_results.average_metrics.n_samples for task_results in concurrent_row
+        ] == [
+            task_results.average_metrics.n_samples for task_results in sequential_row
+        ]
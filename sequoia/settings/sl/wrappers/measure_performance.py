@@ -25,6 +25,7 @@ from sequoia.common.metrics.rl_metrics import EpisodeMetrics
 from sequoia.settings.base import Actions, Environment, Observations, Rewards
 from sequoia.settings.sl.environment import PassiveEnvironment
 from sequoia.utils.utils import add_prefix
+from sequoia.utils.tracing import traced
 from torch import Tensor
 from sequoia.common.gym_wrappers.batch_env.tile_images import tile_images
 
@@ -127,6 +128,7 @@ class MeasureSLPerformanceWrapper(
         self._steps += 1
         return reward
 
+    @traced("metrics/train")
     def get_metrics(self, action: Actions, reward: Rewards) -> Metrics:
         assert action.y_pred.shape == reward.y.shape, (action.shapes, reward.shapes)
         metric = ClassificationMetrics(
@@ -0,0 +1,50 @@
+""" Utility script used to measure the per-step overhead of the wrappers added to the
+environments of the `ContinualRLSetting`, compared with the raw environment, with and
+without fusing the wrappers (see `sequoia.common.gym_wrappers.fused`).
+"""
+import json
+import time
+from typing import Dict
+
+import gym
+
+from sequoia.settings.rl.continual import ContinualRLSetting
+
+
+def time_per_step(env: gym.Env, n_steps: int = 5_000) -> float:
+    """ Returns the average duration of a step, in microseconds. """
+    env.seed(123)
+    env.reset()
+    action = env.action_space.sample()
+    start_time = time.perf_counter()
+    for _ in range(n_steps):
+        _, _, done, _ = env.step(action)
+        if done:
+            env.reset()
+    return (time.perf_counter() - start_time) / n_steps * 1e6
+
+
+def main(dataset: str = "CartPole-v0", n_steps: int = 5_000):
+    results: Dict[str, float] = {}
+    results["raw env"] = time_per_step(gym.make(dataset), n_steps=n_steps)
+
+    for fuse_env_wrappers in [False, True]:
+        setting = ContinualRLSetting(
+            dataset=dataset,
+            train_max_steps=10 * n_steps,
+            monitor_training_performance=False,
+            fuse_env_wrappers=fuse_env_wrappers,
+        )
+        train_env = setting.train_dataloader(batch_size=None)
+        name = "fused wrappers" if fuse_env_wrappers else "wrappers"
+        results[name] = time_per_step(train_env, n_steps=n_steps)
+        train_env.close()
+
+    for name, step_time in results.items():
+        overhead = step_time - results["raw env"]
+        print(f"{name}: \t{step_time:.1f}μs/step \t(overhead: {overhead:.1f}μs/step)")
+    print(json.dumps({k: round(v, 1) for k, v in results.items()}, indent="\t"))
+
+
+if __name__ == "__main__":
+    main()
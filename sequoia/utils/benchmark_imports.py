@@ -0,0 +1,48 @@
+""" Utility script used to measure how long it takes to import Sequoia and to get a
+single Method, each in a new python process (as when launching a run, or a worker of a
+sweep).
+
+Pass `--eager` to also measure the time taken to import all the Methods, which is what
+`import sequoia.methods` used to do.
+"""
+import json
+import subprocess
+import sys
+import time
+from typing import Dict
+
+
+def time_to_run(code: str, n_repeats: int = 5) -> float:
+    """ Returns the smallest time it took to run `code` in a new process, in seconds. """
+    times = []
+    for _ in range(n_repeats):
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        times.append(time.perf_counter() - start_time)
+    return min(times)
+
+
+def main(n_repeats: int = 5, eager: bool = False):
+    statements = {
+        "python": "pass",
+        "import sequoia": "import sequoia",
+        "import sequoia.methods": "import sequoia.methods",
+        "get one method": (
+            "from sequoia.methods import get_method; get_method('base')"
+        ),
+    }
+    if eager:
+        statements["get all methods"] = (
+            "from sequoia.methods import get_all_methods; get_all_methods()"
+        )
+    results: Dict[str, float] = {
+        name: time_to_run(code, n_repeats=n_repeats)
+        for name, code in statements.items()
+    }
+    for name, duration in results.items():
+        print(f"{name}: \t{duration:.2f}s")
+    print(json.dumps({k: round(v, 2) for k, v in results.items()}, indent="\t"))
+
+
+if __name__ == "__main__":
+    main(eager="--eager" in sys.argv)
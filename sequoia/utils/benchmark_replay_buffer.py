@@ -0,0 +1,72 @@
+""" Utility script used to compare the sampling throughput of the memory-mapped replay
+buffer with that of the in-memory replay buffer from SB3, depending on the size of the
+buffer and of the minibatches.
+"""
+import inspect
+import time
+from typing import Dict
+
+import numpy as np
+from gym import spaces
+from stable_baselines3.common.buffers import ReplayBuffer
+
+from sequoia.methods.stable_baselines3_methods.memmap_replay_buffer import (
+    MemmapReplayBuffer,
+)
+
+
+def fill(buffer: ReplayBuffer, observation_space: spaces.Box, n_steps: int) -> None:
+    takes_infos = "infos" in inspect.signature(buffer.add).parameters
+    obs = observation_space.sample()[None]
+    for _ in range(n_steps):
+        next_obs = observation_space.sample()[None]
+        args = (obs, next_obs, np.zeros((1, 1)), np.zeros(1), np.zeros(1))
+        if takes_infos:
+            buffer.add(*args, [{}])
+        else:
+            buffer.add(*args)
+        obs = next_obs
+
+
+def benchmark(buffer: ReplayBuffer, batch_size: int, n_samples: int = 100) -> float:
+    """ Returns the number of transitions sampled per second. """
+    start_time = time.time()
+    for _ in range(n_samples):
+        buffer.sample(batch_size)
+    return n_samples * batch_size / (time.time() - start_time)
+
+
+def main():
+    # Same shape as the Atari observations after the usual preprocessing.
+    observation_space = spaces.Box(0, 255, shape=(4, 84, 84), dtype=np.uint8)
+    action_space = spaces.Discrete(4)
+
+    results: Dict[str, float] = {}
+    for buffer_size in [10_000, 100_000]:
+        for buffer_type in [ReplayBuffer, MemmapReplayBuffer]:
+            buffer = buffer_type(
+                buffer_size,
+                observation_space,
+                action_space,
+                optimize_memory_usage=True,
+            )
+            fill(buffer, observation_space, n_steps=buffer_size)
+            for batch_size in [32, 256]:
+                transitions_per_sec = benchmark(buffer, batch_size)
+                results[f"{buffer_type.__name__}-{buffer_size}-{batch_size}"] = round(
+                    transitions_per_sec
+                )
+                print(
+                    f"{buffer_type.__name__}, "
+                    f"\tbuffer size: {buffer_size}, "
+                    f"\tbatch size: {batch_size}, "
+                    f"\ttransitions/s: {transitions_per_sec:.1f}"
+                )
+            del buffer
+    import json
+
+    print(json.dumps(results, indent="\t"))
+
+
+if __name__ == "__main__":
+    main()
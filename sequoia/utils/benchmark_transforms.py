@@ -0,0 +1,42 @@
+""" Utility script used to compare the time it takes to apply the transforms on a
+batch of images one item at a time (as is done for each sample) with applying them on
+the whole batch at once.
+"""
+import json
+import time
+from typing import Callable, Dict
+
+import numpy as np
+
+from sequoia.common.transforms import Compose, Transforms
+
+
+def time_per_batch(function: Callable, batch: np.ndarray, n_repeats: int = 100) -> float:
+    """ Returns the average time it takes to call `function` on `batch`, in μs. """
+    function(batch)
+    start_time = time.perf_counter()
+    for _ in range(n_repeats):
+        function(batch)
+    return (time.perf_counter() - start_time) / n_repeats * 1e6
+
+
+def main(batch_size: int = 64, n_repeats: int = 100):
+    transforms = Compose(
+        [Transforms.to_tensor, Transforms.three_channels, Transforms.resize_32x32]
+    )
+    rng = np.random.default_rng(123)
+    batch = rng.integers(0, 256, size=[batch_size, 28, 28, 1], dtype=np.uint8)
+
+    results: Dict[str, float] = {}
+    results["per item"] = time_per_batch(
+        lambda x: [transforms(item) for item in x], batch, n_repeats=n_repeats
+    )
+    results["whole batch"] = time_per_batch(transforms, batch, n_repeats=n_repeats)
+
+    for name, batch_time in results.items():
+        print(f"{name}: \t{batch_time:.1f}μs/batch")
+    print(json.dumps({k: round(v, 1) for k, v in results.items()}, indent="\t"))
+
+
+if __name__ == "__main__":
+    main()
@@ -51,6 +51,17 @@ def concatenate(
     return np.asarray([first_item, *others], **kwargs)
 
 
+@concatenate.register(type(None))
+def _concatenate_none(
+    first_item: None, *others: None, **kwargs
+) -> Union[None, np.ndarray]:
+    # Same as in `stack`: Concatenating 'None' items (e.g. the missing task labels of
+    # some batches of Observations) returns None.
+    if all(v is None for v in others):
+        return None
+    return np.array([first_item, *others])
+
+
 @concatenate.register(np.ndarray)
 def _concatenate_ndarrays(
     first_item: np.ndarray, *others: np.ndarray, **kwargs
@@ -19,6 +19,7 @@ def detach(value: T) -> T:
     #     return value
 
 @detach.register(np.ndarray)
+@detach.register(np.generic)
 @detach.register(type(None))
 @detach.register(str)
 @detach.register(int)
@@ -44,10 +45,11 @@ def _detach_namedtuple(x: NamedTuple) -> NamedTuple:
 def _detach_dict(d: Dict[str, Any]) -> Dict[str, Any]:
     """ Detaches all the keys and tensors in a dict, as well as all nested dicts.
     """
-    return type(d)(**{
-        detach(k): detach(v)
-        for k, v in d.items()
-    })
+    # NOTE: Passing the items rather than keyword arguments, since the keys might not
+    # be strings.
+    return type(d)(
+        (detach(k), detach(v)) for k, v in d.items()
+    )
 
 @detach.register
 def _detach_categorical(v: Categorical) -> Categorical:
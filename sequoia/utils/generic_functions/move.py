@@ -22,9 +22,9 @@ def move(x: T, device: Union[str, torch.device]) -> T:
 
 @move.register(dict)
 def move_dict(x: Dict[K, V], device: Union[str, torch.device]) -> Dict[K, V]:
-    return type(x)(**{
-        move(k, device): move(v, device) for k, v in x.items()
-    })
+    return type(x)(
+        (move(k, device), move(v, device)) for k, v in x.items()
+    )
 
 
 @move.register(list)
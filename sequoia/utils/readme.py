@@ -181,8 +181,8 @@ def get_tree_string_markdown(
 
 
 def print_methods():
-    from sequoia.methods import all_methods
-    for method in all_methods:
+    from sequoia.methods import get_all_methods
+    for method in get_all_methods():
         source_file = get_relative_path_to(method)
         target_setting: Type["Setting"] = method.target_setting
         setting_file = get_relative_path_to(target_setting)
@@ -0,0 +1,302 @@
+""" Low-overhead tracer used to measure how the time of each step of a run is split
+between the env, the wrappers, the Method and the metrics.
+
+The settings' train and test loops, as well as the main wrappers, report into the
+tracer that is currently active (if any) with `trace(name)`. When no tracer is active,
+`trace` returns a shared no-op context manager, so the instrumentation costs close to
+nothing.
+
+The names of the spans are of the form "<category>/<phase>", e.g. "env/step" or
+"method/get_actions".
+
+>>> tracer = StepTracer()
+>>> with tracing(tracer):
+...     for i in range(3):
+...         with trace("env/step"):
+...             pass
+>>> with trace("env/step"):  # Not recorded: the tracer isn't active anymore.
+...     pass
+>>> tracer.summary()["env/step"]["count"]
+3
+>>> len(tracer.to_chrome_trace()["traceEvents"])
+3
+"""
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import (Any, Callable, ContextManager, Deque, Dict, Iterator, List,
+                    Optional, Tuple, TypeVar, Union)
+
+import numpy as np
+
+C = TypeVar("C", bound=Callable)
+
+_null_span = contextlib.nullcontext()
+_active_tracer: Optional["StepTracer"] = None
+
+
+class _Span:
+    """ Context manager that records the duration of a block into a `StepTracer`. """
+
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer: "StepTracer", name: str):
+        self.tracer = tracer
+        self.name = name
+        self.start = 0
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.tracer.add(self.name, self.start, time.perf_counter_ns() - self.start)
+
+
+# Number of sub-buckets per power of two in the histograms of the durations. The
+# percentiles computed from the histograms are within ~6% of the exact values.
+_SUB_BUCKET_BITS = 3
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+_N_BUCKETS = (64 - _SUB_BUCKET_BITS) * _SUB_BUCKETS
+
+
+def _bucket(duration: int) -> int:
+    """ Returns the index of the histogram bucket of a duration (in ns).
+
+    Durations smaller than `_SUB_BUCKETS` get their own bucket, and each larger power
+    of two is split into `_SUB_BUCKETS` buckets of equal width, using the bits that
+    follow the leading bit of the duration.
+    """
+    if duration < _SUB_BUCKETS:
+        return max(duration, 0)
+    exponent = duration.bit_length() - _SUB_BUCKET_BITS - 1
+    return (exponent + 1) * _SUB_BUCKETS + ((duration >> exponent) & (_SUB_BUCKETS - 1))
+
+
+def _bucket_edges() -> np.ndarray:
+    """ Returns the lower bound of each bucket (and the upper bound of the last), in ns.
+    """
+    buckets = np.arange(_N_BUCKETS + 1)
+    exponents = np.maximum(buckets // _SUB_BUCKETS - 1, 0)
+    mantissas = np.where(
+        buckets < _SUB_BUCKETS, buckets, buckets % _SUB_BUCKETS + _SUB_BUCKETS
+    )
+    return mantissas.astype(float) * 2.0 ** exponents
+
+
+class _SpanStats:
+    """ Running statistics of the durations (in ns) of the spans with a given name. """
+
+    __slots__ = ("name_id", "count", "total", "max", "counts")
+
+    def __init__(self, name_id: int):
+        self.name_id = name_id
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.counts: List[int] = [0] * _N_BUCKETS
+
+    def add(self, duration: int) -> None:
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        self.counts[_bucket(duration)] += 1
+
+    def percentiles(self, qs: List[float]) -> List[float]:
+        """ Returns the (approximate) percentiles of the durations, in ns. """
+        cumulative_counts = np.cumsum(self.counts)
+        edges = _bucket_edges()
+        results: List[float] = []
+        for q in qs:
+            rank = max(int(np.ceil(q / 100 * self.count)), 1)
+            bucket = int(np.searchsorted(cumulative_counts, rank))
+            # Use the middle of the bucket, without going over the largest duration.
+            middle = (edges[bucket] + edges[bucket + 1]) / 2
+            results.append(float(min(middle, self.max)))
+        return results
+
+
+class StepTracer:
+    """ Records the start time and duration of named spans (in nanoseconds).
+
+    The spans can be summarized with `summary` and `histograms`, or exported in the
+    Chrome trace event format with `save_chrome_trace`.
+
+    The memory used by the tracer is bounded: The statistics and histograms of the
+    durations of the spans with each name are updated as the spans are added, and
+    only the last `max_events` spans are kept for the Chrome trace.
+    """
+
+    def __init__(self, max_events: int = 100_000):
+        self.max_events = max_events
+        # Last `max_events` spans, as tuples of (name id, start, duration, thread id).
+        self.events: Deque[Tuple[int, int, int, int]] = deque(maxlen=max_events)
+        self.stats: Dict[str, _SpanStats] = {}
+        self.n_spans = 0
+        self._origin = time.perf_counter_ns()
+
+    def span(self, name: str) -> _Span:
+        """ Returns a context manager that records the time spent in a block. """
+        return _Span(self, name)
+
+    def add(self, name: str, start: int, duration: int) -> None:
+        """ Records a span that started at `start` and lasted `duration` ns. """
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = _SpanStats(name_id=len(self.stats))
+        stats.add(duration)
+        self.events.append((stats.name_id, start, duration, threading.get_ident()))
+        self.n_spans += 1
+
+    def __len__(self) -> int:
+        return self.n_spans
+
+    @property
+    def n_dropped_events(self) -> int:
+        """ Number of spans that were left out of the Chrome trace. """
+        return self.n_spans - len(self.events)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """ Returns the number of spans, the total time (in seconds) and the
+        statistics of the durations (in μs) of the spans with each name.
+
+        NOTE: The percentiles are estimated from the histograms of the durations.
+        """
+        summary: Dict[str, Dict[str, float]] = {}
+        for name, stats in sorted(self.stats.items()):
+            p50, p90, p99 = stats.percentiles([50, 90, 99])
+            summary[name] = {
+                "count": stats.count,
+                "total_s": stats.total / 1e9,
+                "mean_us": stats.total / stats.count / 1e3,
+                "p50_us": p50 / 1e3,
+                "p90_us": p90 / 1e3,
+                "p99_us": p99 / 1e3,
+                "max_us": stats.max / 1e3,
+            }
+        return summary
+
+    def histograms(self) -> Dict[str, Dict[str, List[float]]]:
+        """ Returns a histogram of the durations of the spans with each name, with
+        log-spaced bins (in μs), from the smallest to the largest duration.
+        """
+        edges = _bucket_edges() / 1e3
+        histograms: Dict[str, Dict[str, List[float]]] = {}
+        for name, stats in sorted(self.stats.items()):
+            non_empty = np.flatnonzero(stats.counts)
+            first, last = non_empty[0], non_empty[-1]
+            histograms[name] = {
+                "bins_us": edges[first:last + 2].tolist(),
+                "counts": stats.counts[first:last + 1],
+            }
+        return histograms
+
+    def format_summary(self) -> str:
+        """ Returns the summary as a table, with one line per span name. """
+        lines = [
+            f"{'name':<32} {'count':>8} {'total (s)':>10} {'mean (μs)':>10} "
+            f"{'p50 (μs)':>10} {'p99 (μs)':>10}"
+        ]
+        for name, stats in self.summary().items():
+            lines.append(
+                f"{name:<32} {stats['count']:>8} {stats['total_s']:>10.3f} "
+                f"{stats['mean_us']:>10.1f} {stats['p50_us']:>10.1f} "
+                f"{stats['p99_us']:>10.1f}"
+            )
+        return "\n".join(lines)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """ Returns the spans as 'complete' events of the Chrome trace event format.
+
+        Only the last `max_events` spans are included.
+        """
+        pid = os.getpid()
+        names = {stats.name_id: name for name, stats in self.stats.items()}
+        events = [
+            {
+                "name": names[name_id],
+                "cat": names[name_id].split("/", 1)[0],
+                "ph": "X",
+                "ts": (start - self._origin) / 1e3,
+                "dur": duration / 1e3,
+                "pid": pid,
+                "tid": thread_id,
+            }
+            for name_id, start, duration, thread_id in self.events
+        ]
+        return {
+            "traceEvents": events,
+            "otherData": {"dropped_events": self.n_dropped_events},
+        }
+
+    def save_chrome_trace(self, path: Union[str, Path]) -> Path:
+        """ Saves the trace at `path`. It can be opened with chrome://tracing or
+        https://ui.perfetto.dev
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+        return path
+
+    def save_summary(self, path: Union[str, Path]) -> Path:
+        """ Saves the summary and the histograms of the spans at `path`, as json. """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(
+                {"summary": self.summary(), "histograms": self.histograms()},
+                f,
+                indent="\t",
+            )
+        return path
+
+
+def get_tracer() -> Optional[StepTracer]:
+    """ Returns the tracer that is currently active, if any. """
+    return _active_tracer
+
+
+@contextlib.contextmanager
+def tracing(tracer: StepTracer = None) -> Iterator[StepTracer]:
+    """ Makes `tracer` (or a new tracer) the active tracer within the block. """
+    global _active_tracer
+    tracer = tracer if tracer is not None else StepTracer()
+    previous_tracer = _active_tracer
+    _active_tracer = tracer
+    try:
+        yield tracer
+    finally:
+        _active_tracer = previous_tracer
+
+
+def trace(name: str) -> ContextManager:
+    """ Records the time spent in a block as a span named `name` in the active tracer.
+
+    Does nothing when there is no active tracer.
+    """
+    if _active_tracer is None:
+        return _null_span
+    return _active_tracer.span(name)
+
+
+def traced(name: str) -> Callable[[C], C]:
+    """ Decorator that records the time spent in each call to a function. """
+
+    def _decorator(function: C) -> C:
+        @functools.wraps(function)
+        def _wrapped(*args, **kwargs):
+            if _active_tracer is None:
+                return function(*args, **kwargs)
+            with _active_tracer.span(name):
+                return function(*args, **kwargs)
+
+        return _wrapped
+
+    return _decorator
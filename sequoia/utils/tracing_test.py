@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from .tracing import StepTracer, _bucket, _bucket_edges
+
+
+@pytest.mark.parametrize("duration", [0, 1, 7, 8, 9, 15, 16, 17, 1_000, 123_456_789])
+def test_duration_is_within_its_bucket(duration: int):
+    edges = _bucket_edges()
+    bucket = _bucket(duration)
+    assert edges[bucket] <= duration < edges[bucket + 1]
+
+
+def test_only_last_events_are_kept():
+    tracer = StepTracer(max_events=10)
+    for i in range(100):
+        tracer.add("env/step", start=i, duration=1_000)
+    assert len(tracer) == 100
+    assert len(tracer.events) == 10
+    assert tracer.n_dropped_events == 90
+
+    trace = tracer.to_chrome_trace()
+    assert [event["ts"] for event in trace["traceEvents"]] == [
+        (i - tracer._origin) / 1e3 for i in range(90, 100)
+    ]
+    assert trace["otherData"] == {"dropped_events": 90}
+    # The statistics still include all the spans.
+    assert tracer.summary()["env/step"]["count"] == 100
+    assert sum(tracer.histograms()["env/step"]["counts"]) == 100
+
+
+def test_summary_matches_exact_statistics():
+    rng = np.random.default_rng(123)
+    durations = rng.lognormal(mean=10, sigma=1, size=10_000).astype(int)
+    tracer = StepTracer(max_events=100)
+    for duration in durations:
+        tracer.add("method/get_actions", start=0, duration=int(duration))
+
+    summary = tracer.summary()["method/get_actions"]
+    durations_us = durations / 1e3
+    assert summary["count"] == len(durations)
+    assert summary["total_s"] == pytest.approx(durations.sum() / 1e9)
+    assert summary["mean_us"] == pytest.approx(durations_us.mean())
+    assert summary["max_us"] == pytest.approx(durations_us.max())
+    for q in [50, 90, 99]:
+        assert summary[f"p{q}_us"] == pytest.approx(
+            np.percentile(durations_us, q), rel=0.07
+        )